@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from data_store import RATE_PREFIX, snapshot_columns
+
+# 대시보드용 집계 큐브
+# 대학명 × 전형구분 × 추천전형 별로 스냅샷 경쟁률의 합계/개수와 모집인원 가중 합계/가중치를 한 번의 groupby 로 구해 두고,
+# 필요한 평균은 큐브의 레벨을 다시 합쳐서 만든다 (원본 행 평균과 같은 값, NaN 제외).
+# 가중치는 그 스냅샷에 경쟁률이 있는 행의 모집인원이다 (모집인원이 비어 있는 행은 가중 통계에서 빠짐).
+
+CUBE_LEVELS = ['대학명', '전형구분', '추천전형']
+WEIGHT_COLUMN = '모집인원'
+
+
+def build_aggregate_cube(df):
+    rate_columns = snapshot_columns(df, RATE_PREFIX)
+    rates = df[rate_columns].to_numpy(dtype=float)
+    recruits = df[WEIGHT_COLUMN].to_numpy(dtype=float)[:, None]
+    present = ~np.isnan(rates)
+    weights = np.where(present & ~np.isnan(recruits), recruits, 0.0)
+    values = np.nan_to_num(rates)
+    # 네 부분을 한 배열로 붙여 groupby 한 번에 합계를 구한다
+    parts = pd.DataFrame(np.hstack([values, present, values * weights, weights]), index=df.index,
+                         columns=pd.MultiIndex.from_product([['sum', 'count', 'weighted_sum', 'weight'], rate_columns]))
+    cube = parts.groupby([df[level] for level in CUBE_LEVELS], dropna=False, observed=True).sum()
+    cube['count'] = cube['count'].astype(int)
+    # categorical 컬럼에서 온 레벨은 일반 Index 로 바꿔 둔다 (대학마다 reindex/.loc 할 때 categorical 조회가 느림)
+    cube.index = cube.index.set_levels([level.astype(object) if isinstance(level, pd.CategoricalIndex) else level
+                                        for level in cube.index.levels])
+    return cube
+
+
+def cube_mean(cube, by, where=None):
+    # by: 남길 레벨 목록, where: {레벨: 값} 필터 -> 인덱스 by, 컬럼 경쟁률_* 인 평균 테이블
+    if where:
+        mask = np.ones(len(cube), dtype=bool)
+        for level, value in where.items():
+            mask &= (cube.index.get_level_values(level) == value)
+        cube = cube[mask]
+
+    totals = cube.groupby(level=by, dropna=False, observed=True).sum()
+    counts = totals['count']
+    return totals['sum'].where(counts > 0) / counts.where(counts > 0)
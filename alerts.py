@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from data_store import APPLICANT_PREFIX, KEY_COLUMNS, snapshot_columns, snapshot_label
+
+# 급상승/급하락 탐지
+# 인접한 두 스냅샷 사이의 지원인원 증가를 로그 비율 log((현재+1)/(이전+1)) 로 전체 행에 대해 한 번에 구하고,
+# 같은 대학·전형의 모집단위들(너무 적으면 같은 전형구분 전체)과 비교한 robust z-score
+# (중앙값과 MAD 기준) 로 튀는 모집단위를 찾는다. 구간마다 피어 간격이 같으므로 스냅샷 간격이 달라도 비교할 수 있다.
+
+PEER_LEVELS = ['대학명', '전형명_key']
+FALLBACK_PEER_LEVELS = ['전형구분']
+MIN_PEERS = 5
+Z_THRESHOLD = 3.5
+# 이보다 지원인원이 적은 모집단위는 비율이 크게 흔들리므로 알림에서 뺀다
+MIN_APPLICANTS = 10
+
+MAD_SCALE = 1.4826
+MEAN_AD_SCALE = 1.2533
+
+SURGE = '급상승'
+DROP = '급하락'
+
+
+def pair_label(previous_col, current_col):
+    return f"{snapshot_label(previous_col)}→{snapshot_label(current_col)}"
+
+
+def applicant_growth(df):
+    # (행 × 인접 스냅샷 쌍) 로그 증가율. 이전 값이 0 이거나 비어 있으면 NaN (아직 집계 전인 경우가 많다)
+    applicant_columns = snapshot_columns(df, APPLICANT_PREFIX)
+    applicants = df[applicant_columns].to_numpy(dtype=float)
+    previous, current = applicants[:, :-1], applicants[:, 1:]
+    with np.errstate(invalid='ignore'):
+        growth = np.where((previous > 0) & ~np.isnan(current), np.log1p(current) - np.log1p(previous), np.nan)
+    labels = [pair_label(a, b) for a, b in zip(applicant_columns[:-1], applicant_columns[1:])]
+    return pd.DataFrame(growth, columns=labels, index=df.index)
+
+
+def robust_zscores(values, keys):
+    # 그룹(keys) 안에서 (값 - 중앙값) / (1.4826 × MAD). MAD 가 0 이면 평균 절대편차를 쓴다.
+    grouped = values.groupby(keys, observed=True, dropna=False)
+    median = grouped.transform('median')
+    deviation = (values - median).abs()
+    grouped_deviation = deviation.groupby(keys, observed=True, dropna=False)
+    mad = grouped_deviation.transform('median') * MAD_SCALE
+    mean_ad = grouped_deviation.transform('mean') * MEAN_AD_SCALE
+    scale = mad.where(mad > 0, mean_ad)
+    z = (values - median) / scale.where(scale > 0)
+    return z, median, grouped.transform('count')
+
+
+def detect_surges(df):
+    # 모든 행 × 모든 인접 스냅샷 쌍의 알림 후보 (long 형식). flagged 는 |z| >= Z_THRESHOLD 인 행.
+    growth = applicant_growth(df)
+    if growth.empty:
+        return pd.DataFrame()
+
+    z, median, count = robust_zscores(growth, [df[level] for level in PEER_LEVELS])
+    fallback_z, fallback_median, _ = robust_zscores(growth, [df[level] for level in FALLBACK_PEER_LEVELS])
+    few_peers = count < MIN_PEERS
+    z = z.mask(few_peers, fallback_z)
+    median = median.mask(few_peers, fallback_median)
+
+    applicant_columns = snapshot_columns(df, APPLICANT_PREFIX)
+    applicants = df[applicant_columns].to_numpy(dtype=float)
+    n_rows, n_pairs = growth.shape
+    rows = np.repeat(np.arange(n_rows), n_pairs)
+    pairs = np.tile(np.arange(n_pairs), n_rows)
+    previous = applicants[rows, pairs]
+    current = applicants[rows, pairs + 1]
+
+    alerts = df[KEY_COLUMNS].iloc[rows].reset_index(drop=True)
+    alerts['row'] = rows
+    alerts['구간'] = pd.Categorical.from_codes(pairs, categories=list(growth.columns), ordered=True)
+    alerts['이전 지원인원'] = previous
+    alerts['지원인원'] = current
+    alerts['증가'] = current - previous
+    alerts['증가율(%)'] = (np.expm1(growth.to_numpy().ravel()) * 100).round(1)
+    alerts['피어 증가율(%)'] = (np.expm1(median.to_numpy().ravel()) * 100).round(1)
+    alerts['z'] = z.to_numpy().ravel().round(2)
+
+    alerts = alerts[alerts['z'].notna()].reset_index(drop=True)
+    alerts['flagged'] = (alerts['z'].abs() >= Z_THRESHOLD) & (alerts['지원인원'] >= MIN_APPLICANTS)
+    return alerts
+
+
+def alert_feed(alerts, pair=None, direction=SURGE, n=10):
+    # 한 구간(기본값: 마지막 구간)의 급상승(z 큰 순) 또는 급하락(z 작은 순) 목록
+    if alerts.empty:
+        return alerts
+    pair = pair or alerts['구간'].cat.categories[-1]
+    feed = alerts[alerts['flagged'] & (alerts['구간'] == pair)]
+    feed = feed[feed['z'] > 0] if direction == SURGE else feed[feed['z'] < 0]
+    return feed.sort_values('z', ascending=direction != SURGE, kind='stable').head(n)
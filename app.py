@@ -1,32 +1,112 @@
+import os
+
 import streamlit as st
-import pandas as pd
-from dashboard_page import dashboard
-from university_analysis_page import university_analysis
-from university_detail_analysis_page import university_detail_analysis
-from filtering_search_page import filtering_search
-
-# 데이터 로드
-@st.cache_data
-def load_data():
-    df = pd.read_csv('integrated_data.csv')
-    return df
-
-# 대학 목록 가져오기
-@st.cache_data
-def get_universities(df):
-    return sorted(df['대학명'].unique())
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import startup
+from app_resources import get_profile_log, get_session_registry, get_store, load_data
+from data_store import format_snapshot_label
+from shared_dataset import estimate_bytes
+from profiling import annotate, recording, timed
+
+# SUSI_PROFILE=1 이면 렌더링 시간 측정을 켠 상태로 시작
+profile_by_default = os.environ.get('SUSI_PROFILE', '') not in ('', '0')
+
+# 탭 이름. 페이지 모듈(pandas/plotly 를 끌어오는 무거운 import)은 render_tab 에서 그 탭을 처음 그릴 때 가져온다.
+tab_names = ["대시보드", "학교별 통합분석", "학교별 세부분석", "필터링 검색", "보고서 생성", "스냅샷 비교"]
+# SUSI_LAZY_TABS=1 이면 st.tabs 대신 선택한 탭 하나만 그린다 (보지 않는 탭의 import 와 계산을 미룸).
+# st.tabs 는 모든 탭을 매번 그리므로 늦은 import 의 이득은 이 모드에서만 있다. startup.py 로 띄우면 기본으로 켜진다.
+lazy_tabs = os.environ.get('SUSI_LAZY_TABS', '') not in ('', '0')
+
+def select_as_of(store):
+    # 사이드바의 기준 시점. '최신' 이면 None (새 스냅샷이 들어오면 자동으로 따라감)
+    options = [None] + store.snapshots[::-1]
+    as_of = st.sidebar.selectbox("기준 시점", options, key="as_of_selectbox",
+                                 format_func=lambda label: "최신" if label is None else format_snapshot_label(label))
+    return None if as_of == store.snapshots[-1] else as_of
+
+
+def show_memory_metrics(dataset):
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    registry = get_session_registry()
+    registry.touch(ctx.session_id, sum(estimate_bytes(value) for value in st.session_state.to_dict().values()))
+    summary = registry.summary()
+
+    with st.sidebar.expander("서버 메모리"):
+        st.metric("공유 데이터셋", f"{dataset.memory_bytes() / 1024 ** 2:.1f} MB")
+        st.caption("컬럼 그룹별 (MB)")
+        st.dataframe(dataset.memory_report())
+        st.metric("활성 세션", summary['active_sessions'])
+        st.metric("세션당 오버헤드 (평균)", f"{summary['mean_session_bytes'] / 1024:.1f} KB")
+
+def show_startup_metrics():
+    report = startup.report
+    with st.sidebar.expander("서버 시작"):
+        st.metric("첫 화면까지", f"{report.first_render_seconds:.1f} s")
+        if report.prewarm_seconds is None:
+            st.caption("미리 데우기 없음 (python startup.py 로 띄우면 서버 시작 때 캐시를 채움)")
+            return
+        st.metric("미리 데우기", f"{report.prewarm_seconds:.1f} s")
+        for name, seconds in list(report.steps):
+            st.caption(f"{name}: {seconds:.2f} s")
+        if report.prewarm_error:
+            st.warning(f"미리 데우기 실패: {report.prewarm_error}")
+
+def show_profile_sidebar(profile, log):
+    with st.sidebar.expander("렌더링 시간", expanded=True):
+        st.metric("이번 실행", f"{profile.elapsed() * 1000:.0f} ms")
+        frame = profile.to_frame()
+        frame['ms'] = (frame['seconds'] * 1000).round(1)
+        frame['name'] = ['· ' * depth + name for depth, name in zip(frame['depth'], frame['name'])]
+        st.dataframe(frame.sort_values('offset')[['kind', 'name', 'ms', 'traces', 'payload_bytes']],
+                     hide_index=True)
+
+        st.caption(f"최근 {len(log.runs())}회 실행 요약 (ms)")
+        st.dataframe(log.summary())
+        st.download_button("JSON 내보내기", log.to_json(), file_name="render_profile.json",
+                           mime="application/json", key="profile_json_download")
+        st.download_button("CSV 내보내기", log.to_csv(), file_name="render_profile.csv",
+                           mime="text/csv", key="profile_csv_download")
+        if st.button("기록 지우기", key="profile_clear_button"):
+            log.clear()
 
 def main():
+    # 디버그용 렌더링 시간 측정 (데이터 로드, 탭, Figure 구성, 차트 전송)
+    profile_log = get_profile_log() if st.sidebar.checkbox("렌더링 시간 측정", value=profile_by_default,
+                                                           key="profile_checkbox") else None
+    with recording(profile_log) as profile:
+        render_app()
+    startup.report.mark_first_render()
+    show_startup_metrics()
+    if profile is not None:
+        show_profile_sidebar(profile, profile_log)
+
+def render_app():
     st.title("🖋️ 지략 수시 경쟁률 Tracker 📊")
 
     # 타이틀과 탭 사이에 줄바꿈 추가
     st.markdown("<br>", unsafe_allow_html=True)
 
-    df = load_data()
-    universities = get_universities(df)
+    store = get_store()
+    store.refresh()
+    as_of = select_as_of(store)
+    dataset = load_data(store, store.version, as_of)
+    annotate(data_version=dataset.cache_key, rows=len(dataset.df))
+    if as_of is not None:
+        st.info(f"{format_snapshot_label(as_of)} 기준 데이터를 보고 있습니다.")
+    show_memory_metrics(dataset)
+
+    if lazy_tabs:
+        selected = st.radio("탭", tab_names, horizontal=True, key="tab_selector", label_visibility="collapsed")
+        st.markdown("---")
+        with timed(selected, 'tab'):
+            render_tab(selected, store, dataset)
+        return
 
     # 탭 생성 및 스타일 적용
-    tabs = st.tabs(["대시보드", "학교별 통합분석", "학교별 세부분석", "필터링 검색", "보고서 생성"])
+    tabs = st.tabs(tab_names)
 
     # CSS를 사용하여 탭 너비를 전체 페이지에 맞게 조정
     st.markdown("""
@@ -59,21 +139,31 @@ def main():
         </style>
     """, unsafe_allow_html=True)
 
-    with tabs[0]:
-        dashboard(df)
-
-    with tabs[1]:
-        university_analysis(df)
-
-    with tabs[2]:
-        university_detail_analysis(df)
-
-    with tabs[3]:
-        filtering_search(df, universities)  # universities 목록을 전달
+    for tab, name in zip(tabs, tab_names):
+        with tab, timed(name, 'tab'):
+            render_tab(name, store, dataset)
 
-    with tabs[4]:
-        st.header("보고서 생성")
-        st.write("이 페이지는 개발 중입니다.")
+def render_tab(name, store, dataset):
+    # 페이지 모듈은 이 탭을 처음 그릴 때 가져온다 (이후에는 이미 가져온 모듈을 그대로 씀)
+    df, index, data_version = dataset.df, dataset.index, dataset.cache_key
+    if name == "대시보드":
+        from dashboard_page import dashboard
+        dashboard(df, data_version)
+    elif name == "학교별 통합분석":
+        from university_analysis_page import university_analysis
+        university_analysis(df, index, data_version)
+    elif name == "학교별 세부분석":
+        from university_detail_analysis_page import university_detail_analysis
+        university_detail_analysis(df, index, data_version)
+    elif name == "필터링 검색":
+        from filtering_search_page import filtering_search
+        filtering_search(df, dataset.universities, index, data_version)  # universities 목록을 전달
+    elif name == "보고서 생성":
+        from report_page import report_generation
+        report_generation(df, index, data_version)
+    elif name == "스냅샷 비교":
+        from snapshot_diff_page import snapshot_diff
+        snapshot_diff(store, data_version)
 
 if __name__ == "__main__":
     main()
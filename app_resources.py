@@ -0,0 +1,31 @@
+import streamlit as st
+
+from data_store import load_store
+from profiling import ProfileLog, profiled
+from shared_dataset import SessionRegistry, SharedDataset
+
+# 프로세스당 하나씩 두는 공유 자원
+# Streamlit 캐시 키에는 함수의 모듈 이름이 들어가므로, app.py(__main__)가 아닌 이 모듈에 두어야
+# 서버 시작 시 startup.prewarm() 이 채운 캐시를 첫 방문자의 스크립트 실행이 그대로 쓴다.
+
+# 스냅샷 저장소 (프로세스당 하나, 새 스냅샷이 들어오면 refresh 로 그 부분만 읽어 붙임)
+@st.cache_resource
+def get_store():
+    return load_store()
+
+# 데이터 로드: 모든 세션이 같은 읽기 전용 데이터셋(wide DataFrame + 인덱스)을 공유한다.
+# cache_data 와 달리 호출마다 복사본을 만들지 않으며, 저장소 버전이나 기준 시점이 바뀔 때만 새로 만든다.
+@profiled('load_data', kind='load')
+@st.cache_resource(max_entries=4)
+def load_data(_store, version, as_of=None):
+    return SharedDataset.from_store(_store, as_of)
+
+# 세션별 메모리 사용량 기록 (프로세스당 하나)
+@st.cache_resource
+def get_session_registry():
+    return SessionRegistry()
+
+# 렌더링 시간 기록 (프로세스당 하나, 모든 세션의 측정 실행이 모인다)
+@st.cache_resource
+def get_profile_log():
+    return ProfileLog()
@@ -0,0 +1,323 @@
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from aggregates import build_aggregate_cube, cube_mean
+from alerts import detect_surges
+from dashboard_model import DashboardView, build_average_bar_figure, build_recommend_figure, build_track_trend_figure
+from data_store import SnapshotStore
+from filtering_search_model import FilterSearchView, filter_rows
+from group_comparison import DEFAULT_GROUPS, GroupComparison
+from projection import deadline_overrides
+from shared_dataset import SharedDataset
+from university_analysis_model import UniversityAnalysisView, build_admission_trend_figure, build_top_bottom_tables
+from university_detail_model import build_admission_grid_figure, build_major_figure
+
+# 성능 벤치마크
+# 합성 데이터셋을 규모별로 만들어 페이지 작업(로드, 집계, Figure, 필터)을 캐시 없이 재고
+# 같은 기계에서 저장한 기준 결과(benchmark_baseline.json)와 비교한다.
+#
+#     python benchmark.py                                      # 기본 시나리오를 재고 기준과 비교
+#     python benchmark.py --scenario nationwide
+#     python benchmark.py --rows 20000 --snapshots 48 --universities 200
+#     python benchmark.py --save-baseline                      # 지금 결과를 기준으로 저장
+
+BASELINE_PATH = 'benchmark_baseline.json'
+SCENARIOS = {
+    'current': dict(rows=3466, snapshots=8, universities=37),
+    'end_of_window': dict(rows=3466, snapshots=32, universities=37),
+    'nationwide': dict(rows=20000, snapshots=32, universities=200),
+}
+DEFAULT_SCENARIOS = ['current', 'end_of_window', 'nationwide']
+DEFAULT_REPEAT = 5
+# 기준 대비 이 비율 이상 느려지거나 빨라지면 표시한다
+TOLERANCE = 0.25
+# 학교별 페이지는 대학 하나씩 보므로 행이 많은 대학 몇 곳만 잰다
+SAMPLE_UNIVERSITIES = 3
+DETAIL_PAGE_SIZE = 10
+
+PAST_YEARS = [2024, 2023, 2022]
+PAST_CHECKPOINTS = [('D-2', 0.3), ('D-1', 0.5), ('D-0오전', 0.7), ('D-0오후', 0.8)]
+ADMISSIONS = [
+    # (전형명_key, 전형명, 전형구분, 추천전형)
+    ('학생부종합', '학생부종합(일반)', '종합', 0),
+    ('지역균형', '학생부교과(지역균형)', '교과', 1),
+    ('교과우수자', '학생부교과(교과우수자)', '교과', 0),
+    ('활동우수형', '학생부종합(활동우수형)', '종합', 0),
+    ('고른기회', '학생부종합(고른기회)', '종합', 0),
+    ('학교추천', '학생부교과(학교추천)', '교과', 1),
+]
+
+
+def synthetic_snapshot_labels(n):
+    # 마감 주간(0910-0913) 매일 11시-15시에 고르게 퍼진 n 개의 스냅샷 라벨 (n=8 이면 실제 라벨과 같음)
+    per_day = max(2, math.ceil(n / 4))
+    minutes = np.linspace(11 * 60, 15 * 60, per_day).round().astype(int)
+    labels = [f"09{day}_{m // 60:02d}{m % 60:02d}" for day in range(10, 14) for m in minutes]
+    return labels[:n]
+
+
+def synthetic_university_names(n):
+    # 실제 대학명을 먼저 써서 대시보드 그룹/마감일 설정이 그대로 적용되게 한다
+    real = list(dict.fromkeys([univ for group in DEFAULT_GROUPS.values() for univ in group]
+                              + list(deadline_overrides)))
+    return (real + [f"가상대학교{i:03d}" for i in range(n)])[:n] if n > len(real) else real[:n]
+
+
+def synthetic_dataset(rows, snapshots, universities, seed=0):
+    # integrated_data.csv 와 같은 컬럼의 wide DataFrame
+    rng = np.random.default_rng(seed)
+    names = synthetic_university_names(universities)
+    # 대학마다 최소 한 행, 나머지는 크기가 고르지 않게 나눈다
+    weights = rng.lognormal(0, 0.6, len(names))
+    sizes = rng.multinomial(max(rows - len(names), 0), weights / weights.sum()) + 1
+
+    keys = []
+    for univ, size in zip(names, sizes):
+        admissions = rng.choice(len(ADMISSIONS), size=min(len(ADMISSIONS), rng.integers(2, 5)), replace=False)
+        per_admission = np.array_split(np.arange(size), len(admissions))
+        for admission, majors in zip(admissions, per_admission):
+            keys.extend((univ, admission, major) for major in majors)
+    n = len(keys)
+
+    static = pd.DataFrame({
+        '대학명': [univ for univ, _, _ in keys],
+        '캠퍼스': np.nan,
+        '계열': rng.choice(np.array(['인문', '자연', None], dtype=object), n, p=[0.4, 0.4, 0.2]),
+        '추천전형': [ADMISSIONS[a][3] for _, a, _ in keys],
+        '전형명': [ADMISSIONS[a][1] for _, a, _ in keys],
+        '전형명_key': [ADMISSIONS[a][0] for _, a, _ in keys],
+        '전형구분': [ADMISSIONS[a][2] for _, a, _ in keys],
+        '모집단위': [f"모집단위{major:04d}" for _, _, major in keys],
+        '모집인원': rng.integers(3, 60, n).astype(float),
+    })
+
+    final = np.exp(rng.normal(np.log(6), 0.8, n))
+    past = {'2024_모집인원': static['모집인원'] + rng.integers(-5, 6, n)}
+    past_finals = []
+    for year in PAST_YEARS:
+        available = rng.random(n) < 0.8
+        year_final = np.where(available, final * np.exp(rng.normal(0, 0.25, n)), np.nan)
+        for checkpoint, fraction in PAST_CHECKPOINTS:
+            past[f'{checkpoint}({year})'] = (year_final * fraction * np.exp(rng.normal(0, 0.1, n))).round(2)
+        past[f'최종({year})'] = year_final.round(2)
+        past_finals.append(year_final)
+    past['3개년평균'] = pd.DataFrame(past_finals).mean().round(2).to_numpy()
+
+    # 누적 지원 곡선: 마감에 가까울수록 빨리 늘어나고 줄어들지 않는다
+    labels = synthetic_snapshot_labels(snapshots)
+    progress = np.linspace(0.35, 0.95, len(labels)) ** 2
+    rates = final[:, None] * progress[None, :] * np.exp(rng.normal(0, 0.05, (n, len(labels))))
+    rates = np.maximum.accumulate(rates, axis=1)
+    recruits = static['모집인원'].to_numpy()
+    applicants = np.round(rates * recruits[:, None])
+    rates = np.round(applicants / recruits[:, None], 2)
+    missing = rng.random((n, len(labels))) < 0.01
+    rates[missing] = np.nan
+    applicants[missing] = np.nan
+
+    series = {}
+    series.update({f'경쟁률_{label}': rates[:, j] for j, label in enumerate(labels)})
+    series['최종(2025)'] = np.round(final, 2)
+    series.update({f'지원인원_{label}': applicants[:, j] for j, label in enumerate(labels)})
+    series['최종지원인원(2025)'] = np.round(final * recruits)
+    return pd.concat([static, pd.DataFrame(past), pd.DataFrame(series)], axis=1)
+
+
+def measure(func, repeat):
+    # 반복 실행 시간 (초). GC 는 측정 밖에서 돌린다.
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+class Workload:
+    # 한 시나리오의 데이터와, 페이지별로 잴 작업들
+    def __init__(self, df, csv_path):
+        self.raw = df
+        self.csv_path = csv_path
+        self.store = SnapshotStore.from_wide(df)
+        self.dataset = SharedDataset.from_store(self.store)
+        self.df, self.index = self.dataset.df, self.dataset.index
+        self.rate_columns = [col for col in self.df.columns if col.startswith('경쟁률_')]
+        self.latest = self.rate_columns[-1]
+        self.previous = self.rate_columns[-2] if len(self.rate_columns) > 1 else None
+        self.x_values = [col.split('_', 1)[1] for col in self.rate_columns]
+        sizes = {univ: len(self.index.rows(univ)) for univ in self.index.universities()}
+        self.sample = sorted(sizes, key=sizes.get, reverse=True)[:SAMPLE_UNIVERSITIES]
+        self.cube = build_aggregate_cube(self.df)
+
+    def benchmarks(self):
+        return {
+            'load: CSV 읽기': lambda: pd.read_csv(self.csv_path),
+            'load: 저장소 구성': lambda: SnapshotStore.from_wide(self.raw),
+            'load: 데이터셋 구성 (wide + 예측 + 인덱스)': lambda: SharedDataset.from_store(self.store),
+            'dashboard: 집계 큐브': self.dashboard_aggregates,
+            'dashboard: 급상승 감지': lambda: detect_surges(self.df),
+            'dashboard: Figure 구성': self.dashboard_figures,
+            'dashboard: 그룹 비교 (전형 × 통계)': self.group_comparison,
+            'university_analysis: 대학별 Figure/표': self.university_analysis,
+            'university_detail_analysis: 대학별 Figure': self.university_detail_analysis,
+            'filter_data: 전체 대학 필터': self.filter_all,
+            'view: 대시보드 전체': lambda: DashboardView(self.df),
+            'view: 학교별 통합분석 (표본 대학)': lambda: [UniversityAnalysisView(self.index, university)
+                                                  for university in self.sample],
+            'view: 필터링 검색 (전체 대학)': lambda: self.filter_search_view(self.index.universities(),
+                                                            10.0, "모두", False),
+        }
+
+    def dashboard_aggregates(self):
+        cube = build_aggregate_cube(self.df)
+        return cube_mean(cube, ['대학명']), cube_mean(cube, ['대학명', '전형구분']), \
+            cube_mean(cube, ['대학명'], where={'추천전형': 1})
+
+    def dashboard_figures(self):
+        univ_means = cube_mean(self.cube, ['대학명'])
+        track_means = cube_mean(self.cube, ['대학명', '전형구분'])
+        recommend_means = cube_mean(self.cube, ['대학명'], where={'추천전형': 1})
+        figures = [build_average_bar_figure(univ_means, self.latest)]
+        for universities in DEFAULT_GROUPS.values():
+            figures += [build_track_trend_figure(track_means, universities, track, self.x_values)
+                        for track in ['교과', '종합']]
+        figures.append(build_recommend_figure(self.df['대학명'].unique(), recommend_means, self.latest, self.x_values))
+        return figures
+
+    def group_comparison(self):
+        # 기본 그룹 전체의 전형구분별 통계 4가지 (대학 단위 집계 구성 포함)
+        groups = GroupComparison(self.cube)
+        return [groups.compute(DEFAULT_GROUPS, track) for track in groups.tracks()]
+
+    def university_analysis(self):
+        # 대학 하나 선택 시 그리는 전형별 추이 차트와 TOP/LOW 표 (표본 대학 평균이 아니라 합계)
+        for university in self.sample:
+            for admission_key in self.index.admission_keys(university):
+                build_admission_trend_figure(self.index, university, admission_key, self.rate_columns)
+                build_top_bottom_tables(self.index.slice(university, admission_key), self.latest, self.previous)
+
+    def university_detail_analysis(self):
+        # 첫 페이지(DETAIL_PAGE_SIZE 개 모집단위)의 묶음 차트와 모집단위별 차트
+        for university in self.sample:
+            for admission_key in self.index.admission_keys(university):
+                majors = self.index.majors(university, admission_key)[:DETAIL_PAGE_SIZE]
+                rows = np.concatenate([self.index.rows(university, admission_key, major) for major in majors])
+                build_admission_grid_figure(self.df.iloc[rows], admission_key, self.rate_columns)
+                for major in majors:
+                    build_major_figure(self.index.slice(university, admission_key, major), admission_key, major,
+                                       self.rate_columns)
+
+    def filter_search_view(self, universities, *conditions):
+        # 캐시된 뷰(행 위치)를 만들고 화면 한 번에 그리는 표를 모두 만든다
+        view = FilterSearchView(self.df, self.index, universities, *conditions)
+        return [view.table(rows) for orders in view.row_orders.values() for _, _, rows in orders if rows is not None]
+
+    def filter_all(self):
+        return filter_rows(self.df, self.index, self.index.universities(), 10.0, "모두", False, self.latest)
+
+
+def run_scenario(name, rows, snapshots, universities, repeat=DEFAULT_REPEAT, seed=0, csv_dir=None):
+    df = synthetic_dataset(rows, snapshots, universities, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(csv_dir or tmp, f'integrated_data_{name}.csv')
+        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        workload = Workload(df, csv_path)
+        results = []
+        for benchmark, func in workload.benchmarks().items():
+            times = measure(func, repeat)
+            results.append({'scenario': name, 'rows': len(df), 'snapshots': snapshots, 'universities': universities,
+                            'benchmark': benchmark, 'median_ms': round(float(np.median(times)) * 1000, 2),
+                            'min_ms': round(min(times) * 1000, 2), 'repeat': repeat})
+            print(f"  {benchmark}: {results[-1]['median_ms']:.1f} ms", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline):
+    # 현재 결과 + 기준 결과 비교 표 (시나리오 이름과 규모, 벤치마크 이름이 같은 것끼리)
+    table = pd.DataFrame(results)
+    key = ['scenario', 'rows', 'snapshots', 'universities', 'benchmark']
+    if baseline:
+        base = pd.DataFrame(baseline['results'])[key + ['median_ms']].rename(columns={'median_ms': 'baseline_ms'})
+        table = table.merge(base, on=key, how='left')
+    else:
+        table['baseline_ms'] = np.nan
+    table['ratio'] = (table['median_ms'] / table['baseline_ms']).round(2)
+    table['판정'] = np.select([table['ratio'] > 1 + TOLERANCE, table['ratio'] < 1 - TOLERANCE],
+                            ['느려짐', '빨라짐'], default='')
+    return table
+
+
+def machine_info():
+    return {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'machine': platform.machine(), 'processor': platform.processor(), 'cpus': os.cpu_count()}
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'created': datetime.now().isoformat(timespec='seconds'), 'machine': machine_info(),
+                   'results': results}, f, ensure_ascii=False, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 데이터셋 규모별 페이지 작업 벤치마크")
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help="실행할 시나리오 (여러 번 지정 가능, 기본: 전부)")
+    parser.add_argument('--rows', type=int, help="사용자 지정 규모: 행 수")
+    parser.add_argument('--snapshots', type=int, help="사용자 지정 규모: 스냅샷 수")
+    parser.add_argument('--universities', type=int, help="사용자 지정 규모: 대학 수")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="이번 결과를 기준으로 저장")
+    parser.add_argument('--csv-dir', help="합성 CSV 를 이 디렉터리에 남긴다")
+    parser.add_argument('--output', help="비교 표를 CSV 로 저장")
+    parser.add_argument('--fail-on-regression', action='store_true', help="기준보다 느려진 항목이 있으면 종료 코드 1")
+    args = parser.parse_args()
+
+    scenarios = {name: SCENARIOS[name] for name in (args.scenario or [])}
+    if args.rows or args.snapshots or args.universities:
+        base = SCENARIOS['current']
+        custom = dict(rows=args.rows or base['rows'], snapshots=args.snapshots or base['snapshots'],
+                      universities=args.universities or base['universities'])
+        scenarios[f"custom_{custom['rows']}x{custom['snapshots']}x{custom['universities']}"] = custom
+    if not scenarios:
+        scenarios = {name: SCENARIOS[name] for name in DEFAULT_SCENARIOS}
+
+    results = []
+    for name, size in scenarios.items():
+        print(f"[{name}] {size}", file=sys.stderr)
+        results += run_scenario(name, repeat=args.repeat, seed=args.seed, csv_dir=args.csv_dir, **size)
+
+    table = compare(results, load_baseline(args.baseline))
+    with pd.option_context('display.width', 200, 'display.max_columns', 20, 'display.max_rows', 200):
+        print(table.drop(columns=['repeat']).to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False, encoding='utf-8-sig')
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"기준 결과 저장: {args.baseline}", file=sys.stderr)
+    if args.fail_on_regression and (table['판정'] == '느려짐').any():
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+# 컬럼 스키마: 컬럼 이름으로 그룹을 정하고 그룹마다 dtype 을 정한다.
+# - 경쟁률 -> float32 (계산할 때는 to_numpy(dtype=float) 로 올려 쓴다)
+# - 인원   -> 저장소 Int32, wide 뷰 float32 (경쟁률과 한 블록)
+# - 문자열 -> category (저장소 static 의 categories 를 모든 데이터셋이 공유)
+# 사용자 상한과 비교할 때는 rate_threshold() 로 상한도 float32 로 맞춘다.
+#
+#     python column_schema.py integrated_data.csv   # 컬럼 그룹별 메모리
+
+RATES = '경쟁률'
+COUNTS = '인원'
+STRINGS = '문자열'
+OTHER = '기타'
+GROUPS = [RATES, COUNTS, STRINGS, OTHER]
+
+RATE_DTYPE = 'float32'
+# float32 경쟁률을 float64 로 올릴 때 이 자리에서 반올림해 원래 값(6.17)으로 되돌린다 (6.170000076 -> 6.17)
+RATE_DECIMALS = 4
+COUNT_DTYPE = 'Int32'
+VIEW_COUNT_DTYPE = 'float32'
+
+CATEGORY_COLUMNS = ['대학명', '캠퍼스', '계열', '전형명', '전형명_key', '전형구분', '모집단위', '예측근거']
+_RATE_PATTERN = re.compile(r'^(경쟁률_|예상최종)|^(D-\d|D-0오전|D-0오후|최종)\(\d{4}\)$|^3개년평균$')
+_COUNT_PATTERN = re.compile(r'^지원인원_|모집인원$|지원인원\(\d{4}\)$')
+
+
+def column_group(col):
+    if col in CATEGORY_COLUMNS:
+        return STRINGS
+    if _RATE_PATTERN.search(col):
+        return RATES
+    if _COUNT_PATTERN.search(col):
+        return COUNTS
+    return OTHER
+
+
+def _float_values(values):
+    if not (isinstance(values, np.ndarray) and values.dtype.kind == 'f'):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    return np.asarray(values, dtype=float)
+
+
+def to_rates(values):
+    return _float_values(values).astype(RATE_DTYPE)
+
+
+def to_counts(values, dtype=COUNT_DTYPE):
+    # 지원인원은 정수지만 계산을 거쳐 들어오면 float 이므로 반올림해서 넣는다
+    values = np.rint(_float_values(values))
+    if dtype != COUNT_DTYPE:
+        return values.astype(dtype)
+    missing = np.isnan(values)
+    return pd.arrays.IntegerArray(np.where(missing, 0, values).astype('int32'), missing)
+
+
+def rate_values(frame):
+    # 경쟁률 컬럼(들) -> float64 배열 (Figure 에 넣을 값. float32 꼬리 자릿수가 JSON 에 실리지 않게 한다)
+    return np.round(frame.to_numpy(dtype=float, na_value=np.nan), RATE_DECIMALS)
+
+
+def rate_threshold(value):
+    # float32 경쟁률 컬럼과 비교할 상한/하한 (None 은 그대로)
+    return None if value is None else np.float32(value)
+
+
+def compact_column(series, count_dtype=COUNT_DTYPE):
+    group = column_group(series.name)
+    if group == RATES and series.dtype != RATE_DTYPE:
+        return pd.Series(to_rates(series), index=series.index, name=series.name)
+    if group == COUNTS and series.dtype != count_dtype:
+        return pd.Series(to_counts(series, count_dtype), index=series.index, name=series.name)
+    if group == STRINGS and not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype('category')
+    return series
+
+
+def compact(df, count_dtype=COUNT_DTYPE):
+    # 스키마대로 dtype 을 맞춘 DataFrame. 이미 맞는 컬럼(공유 categorical 포함)은 복사하지 않고 그대로 쓴다.
+    # count_dtype=VIEW_COUNT_DTYPE 이면 페이지용 wide 뷰 (인원도 float32)
+    columns, changed = {}, False
+    for col in df.columns:
+        series = df[col]
+        columns[col] = compact_column(series, count_dtype)
+        changed |= columns[col] is not series
+    return pd.DataFrame(columns, index=df.index) if changed else df
+
+
+def csv_dtypes(columns):
+    dtypes = {}
+    for col in columns:
+        group = column_group(col)
+        if group == RATES:
+            dtypes[col] = RATE_DTYPE
+        elif group == COUNTS:
+            dtypes[col] = COUNT_DTYPE
+        elif group == STRINGS:
+            dtypes[col] = 'category'
+    return dtypes
+
+
+def read_csv(path, **kwargs):
+    columns = pd.read_csv(path, nrows=0, **kwargs).columns
+    return pd.read_csv(path, dtype=csv_dtypes(columns), **kwargs)
+
+
+def _wide_bytes(series):
+    # 같은 컬럼을 float64 / object 로 두었을 때의 크기
+    if column_group(series.name) == STRINGS or series.dtype == object:
+        return int(series.astype(object).memory_usage(deep=True, index=False))
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return len(series) * 8
+    return int(series.memory_usage(deep=True, index=False))
+
+
+def memory_report(df):
+    # 컬럼 그룹별 컬럼 수, 현재 크기, float64/object 로 두었을 때 크기 (MB)
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        rows.append({'그룹': column_group(col), '컬럼': col, 'dtype': str(series.dtype),
+                     '현재': int(series.memory_usage(deep=True, index=False)), 'float64/object': _wide_bytes(series)})
+    table = pd.DataFrame(rows, columns=['그룹', '컬럼', 'dtype', '현재', 'float64/object'])
+    report = table.groupby('그룹', sort=False).agg(
+        컬럼수=('컬럼', 'count'),
+        dtype=('dtype', lambda dtypes: ', '.join(sorted(set(dtypes)))),
+        현재=('현재', 'sum'),
+        **{'float64/object': ('float64/object', 'sum')})
+    report = report.reindex([group for group in GROUPS if group in report.index])
+    report.loc['합계'] = [report['컬럼수'].sum(), '', report['현재'].sum(), report['float64/object'].sum()]
+    report['절감(%)'] = (1 - report['현재'] / report['float64/object'].replace(0, np.nan)).mul(100).round(1)
+    report[['현재', 'float64/object']] = (report[['현재', 'float64/object']] / 1e6).round(3)
+    return report.rename(columns={'현재': '현재(MB)', 'float64/object': 'float64/object(MB)'})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="컬럼 그룹별 메모리 사용량 (스키마 적용 전후)")
+    parser.add_argument('csv', help="wide 형식 CSV (integrated_data.csv 등)")
+    args = parser.parse_args()
+    print(memory_report(read_csv(args.csv)).to_string())
+
+
+if __name__ == '__main__':
+    main()
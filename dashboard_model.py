@@ -0,0 +1,135 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+from aggregates import build_aggregate_cube, cube_mean
+from alerts import alert_feed, detect_surges
+from group_comparison import GroupComparison, build_group_comparison_figure
+from profiling import profiled
+
+# 대시보드 계산 층 (Streamlit 없음)
+# 선택과 무관한 집계, 차트, 순위 표는 DashboardView 로 한 번에 만들고, 그룹 차트는 그룹 정의마다 만든다.
+
+@profiled()
+def build_average_bar_figure(univ_means, latest_competition_rate):
+    avg_competition = univ_means[latest_competition_rate].sort_values(ascending=False)
+    fig = go.Figure(go.Bar(x=avg_competition.index, y=avg_competition.values))
+    fig.update_layout(title="학교별 평균 경쟁률", xaxis_title="대학명", yaxis_title="평균 경쟁률", yaxis=dict(range=[0, max(avg_competition.values) * 1.1]))
+    return fig
+
+
+@profiled()
+def build_track_trend_figure(track_means, universities, track, x_values):
+    # 그룹 대학들의 전형구분(교과/종합)별 평균 경쟁률 추이
+    fig = go.Figure()
+    # 대학명이 categorical 이라 .loc 로 한 대학씩 꺼내면 느리므로 행렬로 바꿔 순서대로 쓴다
+    means = track_means.reindex(pd.MultiIndex.from_product([universities, [track]])).to_numpy()
+    for univ, y_values in zip(universities, means.tolist()):
+        fig.add_trace(go.Scatter(x=x_values, y=y_values, mode='lines+markers', name=univ))
+    fig.update_layout(title=f"{track}전형 평균 경쟁률", xaxis_title="기준일", yaxis_title="평균 경쟁률", height=400, yaxis=dict(range=[0, None]))
+    return fig
+
+
+@profiled()
+def build_recommend_figure(universities, recommend_means, latest_competition_rate, x_values):
+    # 학교장 추천전형 평균 경쟁률 추이 (상위 5개 대학은 오른쪽에 값 표시)
+    fig_recommend = go.Figure()
+
+    avg_recommend_rates = recommend_means[latest_competition_rate]
+
+    # 상위 5개 대학 찾기
+    top_5_universities = avg_recommend_rates.nlargest(5)
+
+    annotations = []
+    for univ in universities:
+        if univ in recommend_means.index:
+            y_values = recommend_means.loc[univ].tolist()
+            line = fig_recommend.add_trace(go.Scatter(x=x_values, y=y_values, mode='lines+markers', name=univ))
+
+            # 상위 5개 대학에 대해 주석 추가
+            if univ in top_5_universities.index:
+                last_y = y_values[-1]
+                annotations.append(dict(
+                    x=1.02, y=last_y,
+                    xref='paper', yref='y',
+                    text=f'{univ} ({last_y:.2f})',
+                    font=dict(size=10),
+                    showarrow=False,
+                    xanchor='left',
+                    yanchor='middle'
+                ))
+
+    fig_recommend.update_layout(
+        title="학교장 추천전형 평균 경쟁률",
+        yaxis_title="평균 경쟁률",
+        yaxis=dict(range=[0, None]),
+        xaxis=dict(
+            title="기준일",
+            titlefont=dict(size=12),
+            tickfont=dict(size=10),
+            domain=[0, 0.9]  # x축 영역을 줄여 오른쪽에 공간 확보
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.2,
+            xanchor="center",
+            x=0.45,
+            font=dict(size=8)
+        ),
+        margin=dict(l=50, r=120, t=50, b=150),  # 오른쪽 여백 증가
+        height=700,
+        annotations=annotations
+    )
+    return fig_recommend
+
+
+def rate_table(rates):
+    table = rates.reset_index()
+    table.columns = ['대학명', '평균 경쟁률']
+    return table
+
+
+class DashboardView:
+    def __init__(self, df):
+        competition_rate_columns = [col for col in df.columns if col.startswith('경쟁률_')]
+        latest_competition_rate = competition_rate_columns[-1]
+        x_values = [col.split('_', 1)[1] for col in competition_rate_columns]
+
+        cube = build_aggregate_cube(df)
+        univ_means = cube_mean(cube, ['대학명'])
+        track_means = cube_mean(cube, ['대학명', '전형구분'])
+        recommend_means = cube_mean(cube, ['대학명'], where={'추천전형': 1})
+
+        # 1. 학교별 평균 경쟁률 (통합)
+        self.average_figure = build_average_bar_figure(univ_means, latest_competition_rate)
+
+        # 급상승/급하락 후보 (구간별 표는 alert_feed 로 꺼낸다)
+        self.alerts = detect_surges(df)
+        self.alert_pairs = list(self.alerts['구간'].cat.categories) if not self.alerts.empty else []
+
+        # 2. 그룹 비교 (그룹 정의는 페이지에서 받는다)
+        self.x_values = x_values
+        self.track_means = track_means
+        self.groups = GroupComparison(cube)
+
+        # 학교장 추천전형: 학교별 평균 경쟁률 (큐브에서 추천전형 == 1 만 모은 값)
+        avg_recommend_rates = recommend_means[latest_competition_rate]
+        self.recommend_figure = build_recommend_figure(df['대학명'].unique(), recommend_means,
+                                                       latest_competition_rate, x_values)
+        self.recommend_top = rate_table(avg_recommend_rates.nlargest(5))
+        self.recommend_bottom = rate_table(avg_recommend_rates.nsmallest(5))
+        self.recommend_ranking = rate_table(avg_recommend_rates.sort_values(ascending=False))
+        self.recommend_ranking.insert(0, '순위', range(1, len(self.recommend_ranking) + 1))
+
+    def alert_feed(self, pair, direction, n):
+        return alert_feed(self.alerts, pair, direction, n)
+
+    def group_figures(self, universities):
+        # 그룹 소속 대학들의 교과/종합 평균 경쟁률 추이
+        return (build_track_trend_figure(self.track_means, universities, '교과', self.x_values),
+                build_track_trend_figure(self.track_means, universities, '종합', self.x_values))
+
+    def group_comparison_figure(self, groups, track, stat):
+        # 그룹마다 선 하나인 비교 차트 (통계: group_comparison.STATS)
+        table = self.groups.compute(groups, track)[stat]
+        return build_group_comparison_figure(table, self.x_values, f"그룹별 {stat} 경쟁률 ({track})")
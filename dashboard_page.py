@@ -1,154 +1,144 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-
-# 대학 그룹 정의
-university_groups = {
-    "서연고": ["서울대학교", "연세대학교", "고려대학교"],
-    "서성한": ["서강대학교", "성균관대학교", "한양대학교"],
-    "중경외시이": ["중앙대학교", "경희대학교", "한국외국어대학교", "서울시립대학교", "이화여자대학교"],
-    "경건동홍숙": ["경희대학교", "건국대학교", "동국대학교", "홍익대학교", "숙명여자대학교"],
-    "국숭세단/과기/인하/아주": ["국민대학교", "숭실대학교", "세종대학교", "단국대학교(죽전)", "서울과학기술대학교", "인하대학교", "아주대학교"],
-    "성신/광운/가천/가톨릭/에리카": ["성신여자대학교", "광운대학교", "가천대학교", "가톨릭대학교", "한양대학교(에리카)"],
-    "명지/상명/항공/경기/글로벌/인천": ["명지대학교", "상명대학교", "경기대학교", "한국외국어대학교(글로벌)", "인천대학교", "한국항공대학교"],
-    "동덕/덕성/서울여대": ["동덕여자대학교", "덕성여자대학교", "서울여자대학교"],
-}
-
-
-def dashboard(df):
+from alerts import DROP, SURGE
+from dashboard_model import DashboardView
+from group_comparison import STATS, groups_key, load_groups, save_groups
+from profiling import plotly_chart
+from table_renderer import dataframe_to_html
+
+# 급상승/급하락 알림 표 컬럼 형식
+alert_columns = ['대학명', '전형명_key', '모집단위', '이전 지원인원', '지원인원', '증가율(%)', '피어 증가율(%)', 'z']
+alert_formats = {'이전 지원인원': '%.0f', '지원인원': '%.0f', '증가율(%)': '%.1f', '피어 증가율(%)': '%.1f'}
+alert_feed_size = 10
+
+
+# 대시보드 화면 전체(집계, 알림 후보, 차트, 순위 표)는 데이터 버전이 바뀔 때만 다시 만든다 (DataFrame 자체는 해시하지 않음)
+@st.cache_resource(max_entries=2)
+def get_dashboard_view(_df, data_version):
+    return DashboardView(_df)
+
+
+# 그룹 차트: (데이터 버전, 그룹 정의) 로 캐시한다. 그룹을 고치면 바뀐 그룹의 차트만 새로 만든다.
+@st.cache_resource(max_entries=64)
+def get_group_figures(_view, data_version, universities):
+    return _view.group_figures(list(universities))
+
+
+@st.cache_resource(max_entries=32)
+def get_group_comparison_figure(_view, data_version, groups, track, stat):
+    return _view.group_comparison_figure(dict(groups), track, stat)
+
+
+def session_groups():
+    # 세션의 그룹 정의 (처음에는 설정 파일 university_groups.json, 없으면 기본 그룹)
+    if 'university_groups' not in st.session_state:
+        st.session_state['university_groups'] = load_groups()
+    return st.session_state['university_groups']
+
+
+def edit_groups(view):
+    groups = session_groups()
+    with st.expander("✏️ 그룹 편집"):
+        col1, col2 = st.columns(2)
+        with col1:
+            name = st.text_input("그룹 이름", key="dashboard_group_name")
+            members = st.multiselect("대학", view.groups.universities,
+                                     default=[univ for univ in groups.get(name, []) if univ in view.groups.universities],
+                                     key=f"dashboard_group_members_{name}")
+            if st.button("추가 / 수정", key="dashboard_group_add") and name and members:
+                groups[name] = members
+        with col2:
+            removed = st.multiselect("삭제할 그룹", list(groups), key="dashboard_group_remove")
+            if st.button("삭제", key="dashboard_group_delete"):
+                for group in removed:
+                    groups.pop(group, None)
+            if st.button("설정 파일에 저장", key="dashboard_group_save"):
+                st.success(f"{save_groups(groups)} 에 저장했습니다.")
+            if st.button("설정 파일에서 다시 읽기", key="dashboard_group_reload"):
+                st.session_state['university_groups'] = groups = load_groups()
+    return groups
+
+
+def show_surge_alerts(view):
+    if not view.alert_pairs:
+        st.info("비교할 스냅샷이 부족합니다.")
+        return
+
+    pairs = view.alert_pairs
+    pair = st.selectbox("구간", pairs, index=len(pairs) - 1, key="dashboard_alert_pair")
+    st.caption("같은 대학·전형의 모집단위(5개 미만이면 같은 전형구분 전체) 대비 지원인원 증가율의 robust z-score 기준")
+
+    col1, col2 = st.columns(2)
+    for col, direction in [(col1, SURGE), (col2, DROP)]:
+        with col:
+            feed = view.alert_feed(pair, direction, alert_feed_size)
+            if feed.empty:
+                st.markdown(f"##### {direction}")
+                st.write("해당 없음")
+            else:
+                st.markdown(dataframe_to_html(feed[alert_columns], direction, font_size='0.6rem',
+                                              formats=alert_formats), unsafe_allow_html=True)
+
+
+def dashboard(df, data_version):
     st.markdown("<br>", unsafe_allow_html=True)
-    # 경쟁률 컬럼 찾기
-    competition_rate_columns = [col for col in df.columns if col.startswith('경쟁률_')]
-    latest_competition_rate = competition_rate_columns[-1]
+    view = get_dashboard_view(df, data_version)
 
     # 1. 학교별 평균 경쟁률 (통합)
     st.markdown("### 📊 학교별 평균 경쟁률 (통합)")
-    avg_competition = df.groupby('대학명')[latest_competition_rate].mean().sort_values(ascending=False)
-    fig = go.Figure(go.Bar(x=avg_competition.index, y=avg_competition.values))
-    fig.update_layout(title="학교별 평균 경쟁률", xaxis_title="대학명", yaxis_title="평균 경쟁률", yaxis=dict(range=[0, max(avg_competition.values) * 1.1]))
-    st.plotly_chart(fig)
+    plotly_chart(view.average_figure)
+
+    st.markdown("---")
+
+    # 급상승/급하락 알림
+    st.markdown("### 🚨 급상승/급하락 모집단위")
+    show_surge_alerts(view)
 
     st.markdown("---")
 
-    # 2. 그룹별 평균 경쟁률 (종합/교과)
+    # 2. 그룹 비교 (그룹마다 선 하나) 와 그룹별 평균 경쟁률 (종합/교과)
+    st.markdown("### 🏫 그룹 비교")
+    groups = edit_groups(view)
+    if not groups:
+        st.info("그룹이 없습니다. 그룹 편집에서 추가하세요.")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            stat = st.radio("통계", STATS, horizontal=True, key="dashboard_group_stat")
+        with col2:
+            track = st.radio("전형구분", view.groups.tracks(), horizontal=True, key="dashboard_group_track")
+        plotly_chart(get_group_comparison_figure(view, data_version, groups_key(groups), track, stat),
+                     use_container_width=True)
+        st.caption("가중: 모집인원 가중 · 중앙값: 소속 대학별 값의 중앙값")
+
     st.markdown("### 🏫 그룹별 평균 경쟁률 (종합/교과)")
-    for group, universities in university_groups.items():
+    for group, universities in groups.items():
+        fig_edu, fig_comp = get_group_figures(view, data_version, tuple(universities))
         st.markdown(f"#### 🔹 {group}")
 
         col1, col2 = st.columns(2)
 
         with col1:
             # 교과전형
-            fig_edu = go.Figure()
-            for univ in universities:
-                univ_data = df[(df['대학명'] == univ) & (df['전형구분'] == '교과')]
-                x_values = [col.split('_', 1)[1] for col in competition_rate_columns]
-                y_values = [univ_data[col].mean() for col in competition_rate_columns]
-                fig_edu.add_trace(go.Scatter(x=x_values, y=y_values, mode='lines+markers', name=univ))
-            fig_edu.update_layout(title="교과전형 평균 경쟁률", xaxis_title="기준일", yaxis_title="평균 경쟁률", height=400, yaxis=dict(range=[0, None]))
-            st.plotly_chart(fig_edu, use_container_width=True)
+            plotly_chart(fig_edu, use_container_width=True)
 
         with col2:
             # 종합전형
-            fig_comp = go.Figure()
-            for univ in universities:
-                univ_data = df[(df['대학명'] == univ) & (df['전형구분'] == '종합')]
-                x_values = [col.split('_', 1)[1] for col in competition_rate_columns]
-                y_values = [univ_data[col].mean() for col in competition_rate_columns]
-                fig_comp.add_trace(go.Scatter(x=x_values, y=y_values, mode='lines+markers', name=univ))
-            fig_comp.update_layout(title="종합전형 평균 경쟁률", xaxis_title="기준일", yaxis_title="평균 경쟁률", height=400, yaxis=dict(range=[0, None]))
-            st.plotly_chart(fig_comp, use_container_width=True)
+            plotly_chart(fig_comp, use_container_width=True)
 
     st.markdown("---")
 
     # 학교장 추천전형 경쟁률 부분
     st.markdown("### 🎓 학교장 추천전형 경쟁률")
-    fig_recommend = go.Figure()
-
-    # 최신 경쟁률 컬럼 찾기
-    latest_competition_rate = [col for col in df.columns if col.startswith('경쟁률_')][-1]
-
-    # 학교별 평균 경쟁률 계산
-    avg_recommend_rates = df[df['추천전형'] == 1].groupby('대학명')[latest_competition_rate].mean()
-
-    # 상위 5개 대학 찾기
-    top_5_universities = avg_recommend_rates.nlargest(5)
-
-    annotations = []
-    for univ in df['대학명'].unique():
-        univ_data = df[(df['대학명'] == univ) & (df['추천전형'] == 1)]
-        if not univ_data.empty:
-            x_values = [col.split('_', 1)[1] for col in competition_rate_columns]
-            y_values = [univ_data[col].mean() for col in competition_rate_columns]
-            line = fig_recommend.add_trace(go.Scatter(x=x_values, y=y_values, mode='lines+markers', name=univ))
-
-            # 상위 5개 대학에 대해 주석 추가
-            if univ in top_5_universities.index:
-                last_y = y_values[-1]
-                annotations.append(dict(
-                    x=1.02, y=last_y,
-                    xref='paper', yref='y',
-                    text=f'{univ} ({last_y:.2f})',
-                    font=dict(size=10),
-                    showarrow=False,
-                    xanchor='left',
-                    yanchor='middle'
-                ))
-
-    fig_recommend.update_layout(
-        title="학교장 추천전형 평균 경쟁률",
-        yaxis_title="평균 경쟁률",
-        yaxis=dict(range=[0, None]),
-        xaxis=dict(
-            title="기준일",
-            titlefont=dict(size=12),
-            tickfont=dict(size=10),
-            domain=[0, 0.9]  # x축 영역을 줄여 오른쪽에 공간 확보
-        ),
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=-0.2,
-            xanchor="center",
-            x=0.45,
-            font=dict(size=8)
-        ),
-        margin=dict(l=50, r=120, t=50, b=150),  # 오른쪽 여백 증가
-        height=700,
-        annotations=annotations
-    )
-
-    st.plotly_chart(fig_recommend, use_container_width=True)
-
-    # 상위 5개, 하위 5개 경쟁률 표 수정
-    top_5 = avg_recommend_rates.nlargest(5).reset_index()
-    top_5.columns = ['대학명', '평균 경쟁률']
-    bottom_5 = avg_recommend_rates.nsmallest(5).reset_index()
-    bottom_5.columns = ['대학명', '평균 경쟁률']
+    plotly_chart(view.recommend_figure, use_container_width=True)
 
     col1, col2 = st.columns(2)
 
-    def dataframe_to_html(df, title):
-        html = f"<h5>{title}</h5>"  # h4를 h3로 변경하여 크기를 키움
-        html += "<table style='width:100%; font-size:0.8rem; border-collapse: collapse;'>"
-        html += "<tr>" + "".join(
-            f"<th style='border:1px solid black; padding:5px;'>{col}</th>" for col in df.columns) + "</tr>"
-        for _, row in df.iterrows():
-            html += "<tr>"
-            for col in df.columns:
-                value = row[col]
-                if isinstance(value, float):
-                    formatted_value = f"{value:.2f}"
-                else:
-                    formatted_value = str(value)
-                html += f"<td style='border:1px solid black; padding:5px;'>{formatted_value}</td>"
-            html += "</tr>"
-        html += "</table>"
-        return html
-
     with col1:
-        st.markdown(dataframe_to_html(top_5, "TOP 5"), unsafe_allow_html=True)
+        st.markdown(dataframe_to_html(view.recommend_top, "TOP 5"), unsafe_allow_html=True)
 
     with col2:
-        st.markdown(dataframe_to_html(bottom_5, "LOW 5"), unsafe_allow_html=True)
+        st.markdown(dataframe_to_html(view.recommend_bottom, "LOW 5"), unsafe_allow_html=True)
+
+    # 전체 순위 (TOP/LOW 5 와 같은 렌더러, 스크롤 영역)
+    if st.checkbox("추천전형 전체 순위 보기", key="dashboard_recommend_full_ranking"):
+        st.markdown(dataframe_to_html(view.recommend_ranking, "전체 순위", max_height='400px'), unsafe_allow_html=True)
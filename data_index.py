@@ -0,0 +1,51 @@
+import numpy as np
+
+from data_store import KEY_COLUMNS
+
+# (대학명, 전형명_key, 모집단위) 계층 인덱스
+# 로드 시 한 번 groupby 로 각 단계별 행 위치 배열을 만들어 두고, 페이지에서는 boolean 스캔 대신
+# 위치 배열로 iloc 슬라이싱한다. 하위 키 목록은 원본 데이터의 등장 순서(unique() 와 같은 순서)를 유지한다.
+# 키 컬럼과 행 순서는 정적 속성(static)에서 오므로, 스냅샷만 다른 DataFrame 에는 for_frame() 으로 위치 배열을 공유한다.
+
+_EMPTY_ROWS = np.array([], dtype=np.intp)
+
+
+class DatasetIndex:
+    def __init__(self, df):
+        self.df = df
+        self._rows = {(): np.arange(len(df))}
+        self._children = {}
+
+        for depth in range(1, len(KEY_COLUMNS) + 1):
+            groups = df.groupby(KEY_COLUMNS[:depth], sort=False, observed=True, dropna=False).indices
+            # 첫 등장 위치 순으로 정렬해서 unique() 와 같은 순서를 만든다
+            for key, rows in sorted(groups.items(), key=lambda item: item[1][0]):
+                key = key if isinstance(key, tuple) else (key,)
+                self._rows[key] = rows
+                self._children.setdefault(key[:-1], []).append(key[-1])
+
+    def for_frame(self, df):
+        # 같은 행(같은 정적 버전)의 다른 DataFrame 을 가리키는 인덱스. 위치 배열과 하위 키 목록은 새로 만들지 않는다
+        index = object.__new__(DatasetIndex)
+        index.df = df
+        index._rows = self._rows
+        index._children = self._children
+        return index
+
+    def rows(self, *key):
+        return self._rows.get(key, _EMPTY_ROWS)
+
+    def slice(self, *key):
+        return self.df.iloc[self.rows(*key)]
+
+    def nbytes(self):
+        return sum(rows.nbytes for rows in self._rows.values())
+
+    def universities(self):
+        return sorted(self._children.get((), []))
+
+    def admission_keys(self, university):
+        return self._children.get((university,), [])
+
+    def majors(self, university, admission_key):
+        return self._children.get((university, admission_key), [])
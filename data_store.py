@@ -0,0 +1,422 @@
+import argparse
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import column_schema
+from column_schema import COUNT_DTYPE, RATE_DTYPE, VIEW_COUNT_DTYPE, compact, to_counts, to_rates
+from row_matching import RowMatcher, load_mapping, save_mapping
+
+# 경쟁률 스냅샷 저장소
+# - static.parquet : 스냅샷과 무관한 행 속성 / series/<스냅샷>.parquet : 스냅샷별 (row_id, 경쟁률, 지원인원)
+# - manifest.json : 스냅샷 목록과 버전
+# append_snapshot() 은 파일 하나만 더하고 version 을 올린다. rebuild_store 는 수집한 스냅샷을 유지한다.
+# 내용은 StoreState 하나에 담아 refresh 때 통째로 바꾼다. 여러 값을 읽을 때는 store.state 를 한 번 받아 쓴다.
+
+CSV_PATH = 'integrated_data.csv'
+STORE_DIR = 'store'
+
+KEY_COLUMNS = ['대학명', '전형명_key', '모집단위']
+
+RATE_PREFIX = '경쟁률_'
+APPLICANT_PREFIX = '지원인원_'
+RATE = '경쟁률'
+APPLICANTS = '지원인원'
+
+MANIFEST_FILE = 'manifest.json'
+STATIC_FILE = 'static.parquet'
+SERIES_DIR = 'series'
+
+
+def is_snapshot_column(col):
+    return col.startswith(RATE_PREFIX) or col.startswith(APPLICANT_PREFIX)
+
+
+def snapshot_columns(df, prefix=RATE_PREFIX):
+    return [col for col in df.columns if col.startswith(prefix)]
+
+
+def snapshot_label(col):
+    # '경쟁률_0913_1500' -> '0913_1500'
+    return col.split('_', 1)[1]
+
+
+def format_snapshot_label(label):
+    # '0913_1500' -> '09/13 15:00'
+    day, time_of_day = label.split('_')
+    return f"{day[:2]}/{day[2:]} {time_of_day[:2]}:{time_of_day[2:]}"
+
+
+def label_from_timestamp(timestamp):
+    # datetime / '2024-09-14 11:00' -> '0914_1100'
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    return timestamp.strftime('%m%d_%H%M')
+
+
+def _source_fingerprint(csv_path):
+    stat = os.stat(csv_path)
+    return {'path': os.path.abspath(csv_path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+class StoreState:
+    # 저장소의 한 버전. 만든 뒤에는 고치지 않는다
+    def __init__(self, static, series, snapshots, version=0, source=None, static_version=None):
+        self.static = static  # index = row_id
+        self.series = series  # long format: row_id, snapshot, 경쟁률, 지원인원
+        self.snapshots = list(snapshots)
+        self.version = version
+        self.source = source
+        # 정적 속성이 바뀔 때만 올라가는 버전 (스냅샷 추가로는 바뀌지 않음)
+        self.static_version = static_version if static_version is not None else version
+
+    def replace(self, **changes):
+        values = {'static': self.static, 'series': self.series, 'snapshots': self.snapshots,
+                  'version': self.version, 'source': self.source, 'static_version': self.static_version}
+        values.update(changes)
+        return StoreState(**values)
+
+    def snapshots_as_of(self, as_of=None):
+        # as_of(스냅샷 라벨) 이하의 스냅샷 목록. None 이면 전체
+        if as_of is None:
+            return list(self.snapshots)
+        return [label for label in self.snapshots if label <= as_of]
+
+    def snapshot_matrices(self, snapshots=None):
+        # (행 × 스냅샷) 경쟁률 / 지원인원 배열. 저장되지 않은 값은 NaN
+        snapshots = self.snapshots if snapshots is None else snapshots
+        position = {label: j for j, label in enumerate(snapshots)}
+        n_rows = len(self.static)
+        rates = np.full((n_rows, len(snapshots)), np.nan)
+        applicants = np.full((n_rows, len(snapshots)), np.nan)
+        for label, frame in self.series.groupby('snapshot', observed=True, sort=False):
+            if label not in position:
+                continue
+            row_id = frame['row_id'].to_numpy()
+            rates[row_id, position[label]] = frame[RATE].to_numpy(dtype=float, na_value=np.nan)
+            applicants[row_id, position[label]] = frame[APPLICANTS].to_numpy(dtype=float, na_value=np.nan)
+        return rates, applicants
+
+    def to_wide(self, as_of=None):
+        # 기존 페이지용 호환 뷰: 정적 컬럼 + 경쟁률_* + 지원인원_* (as_of 가 주어지면 그 시점까지의 스냅샷만)
+        # 문자열 컬럼은 복사하지 않고 (copy-on-write) static 의 categorical 을 그대로 공유하고,
+        # 스냅샷 컬럼은 float32 행렬 하나(블록 하나)로 붙인다
+        snapshots = self.snapshots_as_of(as_of)
+        rates, applicants = self.snapshot_matrices(snapshots)
+        columns = [RATE_PREFIX + label for label in snapshots] + [APPLICANT_PREFIX + label for label in snapshots]
+        values = np.hstack([rates, np.rint(applicants)]).astype(RATE_DTYPE)
+        return pd.concat([compact(self.static, VIEW_COUNT_DTYPE),
+                          pd.DataFrame(values, columns=columns, index=self.static.index)], axis=1)
+
+
+class SnapshotStore:
+    def __init__(self, static, series, snapshots, version=0, source=None, static_version=None):
+        self.state = StoreState(static, series, snapshots, version, source, static_version)
+        self._manifest_mtime_ns = None
+        self._lock = threading.Lock()
+
+    @property
+    def static(self):
+        return self.state.static
+
+    @property
+    def series(self):
+        return self.state.series
+
+    @property
+    def snapshots(self):
+        return self.state.snapshots
+
+    @property
+    def version(self):
+        return self.state.version
+
+    @property
+    def source(self):
+        return self.state.source
+
+    @property
+    def static_version(self):
+        return self.state.static_version
+
+    @classmethod
+    def from_wide(cls, df, source=None):
+        static_columns = [col for col in df.columns if not is_snapshot_column(col)]
+        static = compact(df[static_columns].reset_index(drop=True))
+
+        snapshots = sorted({snapshot_label(col) for col in df.columns if col.startswith(RATE_PREFIX)})
+        frames = [_snapshot_frame(df[RATE_PREFIX + label].to_numpy(),
+                                  _column_or_none(df, APPLICANT_PREFIX + label))
+                  for label in snapshots]
+        series = _concat_series(frames, snapshots)
+        build_id = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        return cls(static, series, snapshots, version=1, source=source, static_version=build_id)
+
+    @classmethod
+    def from_csv(cls, csv_path=CSV_PATH):
+        df = column_schema.read_csv(csv_path)
+        return cls.from_wide(df, source=_source_fingerprint(csv_path))
+
+    @classmethod
+    def load(cls, store_dir=STORE_DIR):
+        manifest = read_manifest(store_dir)
+        # 스키마 이전에 저장된 저장소도 읽을 때 dtype 을 맞춘다
+        static = compact(pd.read_parquet(os.path.join(store_dir, STATIC_FILE)))
+        snapshots = manifest['snapshots']
+        frames = [read_snapshot_file(store_dir, label) for label in snapshots]
+        series = _concat_series(frames, snapshots)
+        store = cls(static, series, snapshots, version=manifest['version'], source=manifest.get('source'),
+                    static_version=manifest.get('static_version'))
+        store._manifest_mtime_ns = _manifest_mtime_ns(store_dir)
+        return store
+
+    def save(self, store_dir=STORE_DIR):
+        state = self.state
+        os.makedirs(os.path.join(store_dir, SERIES_DIR), exist_ok=True)
+        state.static.to_parquet(os.path.join(store_dir, STATIC_FILE))
+        for label in state.snapshots:
+            frame = state.series[state.series['snapshot'] == label]
+            frame = frame.drop(columns='snapshot').reset_index(drop=True)
+            frame.to_parquet(_snapshot_path(store_dir, label), index=False)
+        write_manifest(store_dir, {
+            'version': state.version,
+            'static_version': state.static_version,
+            'snapshots': state.snapshots,
+            'source': state.source,
+        })
+        self._manifest_mtime_ns = _manifest_mtime_ns(store_dir)
+
+    def refresh(self, store_dir=STORE_DIR):
+        # manifest 가 바뀌었을 때 새로 추가된 스냅샷 파일만 읽어 붙인다. 새로 읽은 스냅샷 목록을 돌려준다.
+        # 새 StoreState 를 다 만든 뒤 참조 하나만 바꾸므로, 잠금 없이 읽는 쪽은 이전 상태나 새 상태 중 하나를 통째로 본다.
+        mtime_ns = _manifest_mtime_ns(store_dir)
+        if mtime_ns is None or mtime_ns == self._manifest_mtime_ns:
+            return []
+
+        with self._lock:
+            if mtime_ns == self._manifest_mtime_ns:
+                return []
+            state = self.state
+            manifest = read_manifest(store_dir)
+            if manifest.get('static_version') != state.static_version:
+                # 정적 속성이 다시 만들어졌으면 전체를 다시 읽는다
+                reloaded = SnapshotStore.load(store_dir)
+                self.state = reloaded.state
+                self._manifest_mtime_ns = reloaded._manifest_mtime_ns
+                return list(reloaded.snapshots)
+
+            if manifest['version'] == state.version:
+                self._manifest_mtime_ns = mtime_ns
+                return []
+
+            new_labels = [label for label in manifest['snapshots'] if label not in state.snapshots]
+            frames = {label: frame.drop(columns='snapshot')
+                      for label, frame in state.series.groupby('snapshot', observed=False, sort=False)}
+            for label in new_labels:
+                frames[label] = read_snapshot_file(store_dir, label)
+
+            snapshots = manifest['snapshots']
+            self.state = state.replace(series=_concat_series([frames[label] for label in snapshots], snapshots),
+                                       snapshots=snapshots, version=manifest['version'])
+            self._manifest_mtime_ns = mtime_ns
+            return new_labels
+
+    def snapshots_as_of(self, as_of=None):
+        return self.state.snapshots_as_of(as_of)
+
+    def snapshot_matrices(self, snapshots=None):
+        return self.state.snapshot_matrices(snapshots)
+
+    def to_wide(self, as_of=None):
+        return self.state.to_wide(as_of)
+
+
+def _column_or_none(df, col):
+    if col in df.columns:
+        return df[col].to_numpy()
+    return None
+
+
+def _snapshot_frame(rate_values, applicant_values):
+    n_rows = len(rate_values)
+    frame = pd.DataFrame({
+        'row_id': np.arange(n_rows, dtype='int32'),
+        RATE: to_rates(rate_values),
+        APPLICANTS: to_counts(applicant_values if applicant_values is not None else np.full(n_rows, np.nan)),
+    })
+    # 값이 없는 행은 long 테이블에 남기지 않는다
+    return frame[frame[RATE].notna() | frame[APPLICANTS].notna()].reset_index(drop=True)
+
+
+def _empty_series_frame():
+    return pd.DataFrame({
+        'row_id': pd.Series(dtype='int32'),
+        RATE: pd.Series(dtype=RATE_DTYPE),
+        APPLICANTS: pd.Series(dtype=COUNT_DTYPE),
+    })
+
+
+def _concat_series(frames, snapshots):
+    # 스냅샷별 프레임을 이어 붙이고 snapshot 컬럼은 순서 있는 categorical 로 둔다
+    series = pd.concat([_empty_series_frame()] + list(frames), ignore_index=True)
+    codes = np.repeat(np.arange(len(frames), dtype='int32'), [len(frame) for frame in frames])
+    series.insert(1, 'snapshot', pd.Categorical.from_codes(codes, categories=snapshots, ordered=True))
+    return series
+
+
+def _snapshot_path(store_dir, label):
+    return os.path.join(store_dir, SERIES_DIR, f'{label}.parquet')
+
+
+def _manifest_mtime_ns(store_dir):
+    try:
+        return os.stat(os.path.join(store_dir, MANIFEST_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def read_snapshot_file(store_dir, label):
+    frame = pd.read_parquet(_snapshot_path(store_dir, label))
+    return frame.assign(**{RATE: to_rates(frame[RATE]), APPLICANTS: to_counts(frame[APPLICANTS])})
+
+
+def read_manifest(store_dir=STORE_DIR):
+    with open(os.path.join(store_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json_atomic(path, data):
+    # 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 임시 파일에 쓰고 교체한다
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_manifest(store_dir, manifest):
+    write_json_atomic(os.path.join(store_dir, MANIFEST_FILE), manifest)
+
+
+def carry_snapshots(store, store_dir, manifest):
+    # 기존 저장소에만 있는 스냅샷(CSV 에 없는 라벨, 수집으로 추가된 것)을 새 저장소의 행에 키로 다시 맞춰 붙인다.
+    # 새 static 에 없는 행의 값은 빠진다. 붙인 스냅샷 목록을 돌려준다.
+    carried = [label for label in manifest['snapshots'] if label not in store.snapshots]
+    if not carried:
+        return []
+    old_keys = pd.read_parquet(os.path.join(store_dir, STATIC_FILE), columns=KEY_COLUMNS)
+    new_row_ids = RowMatcher(store.static, KEY_COLUMNS).match(old_keys)['row_id'].to_numpy(dtype=float, na_value=np.nan)
+
+    frames = {label: frame.drop(columns='snapshot')
+              for label, frame in store.series.groupby('snapshot', observed=False, sort=False)}
+    for label in carried:
+        frame = read_snapshot_file(store_dir, label)
+        row_id = new_row_ids[frame['row_id'].to_numpy()]
+        keep = ~np.isnan(row_id)
+        frame = frame[keep].assign(row_id=row_id[keep].astype('int32'))
+        frames[label] = frame.drop_duplicates('row_id', keep='last').sort_values('row_id').reset_index(drop=True)
+
+    snapshots = sorted(store.snapshots + carried)
+    store.state = store.state.replace(series=_concat_series([frames[label] for label in snapshots], snapshots),
+                                      snapshots=snapshots)
+    return carried
+
+
+def rebuild_store(store_dir=STORE_DIR, csv_path=CSV_PATH):
+    # CSV 로부터 저장소를 다시 만든다 (저장은 부르는 쪽이 함).
+    # 기존 저장소가 있으면 수집으로만 들어온 스냅샷을 이어 붙이고, version 은 기존 version 다음 번호로 한다.
+    # (페이지 캐시가 version 으로 키를 잡으므로 1 로 돌아가면 예전 버전의 데이터셋이 그대로 쓰일 수 있다)
+    store = SnapshotStore.from_csv(csv_path)
+    if os.path.exists(os.path.join(store_dir, MANIFEST_FILE)):
+        manifest = read_manifest(store_dir)
+        carry_snapshots(store, store_dir, manifest)
+        store.state = store.state.replace(version=manifest['version'] + 1)
+    return store
+
+
+def load_store(store_dir=STORE_DIR, csv_path=CSV_PATH):
+    # 저장소가 없거나 CSV 가 다시 만들어졌으면 CSV 로부터 저장소를 다시 만든다 (수집된 스냅샷은 유지)
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        manifest = read_manifest(store_dir)
+        if not os.path.exists(csv_path) or manifest.get('source') == _source_fingerprint(csv_path):
+            return SnapshotStore.load(store_dir)
+
+    store = rebuild_store(store_dir, csv_path)
+    try:
+        store.save(store_dir)
+    except OSError:
+        # 읽기 전용 배포 환경에서는 메모리 상의 저장소만 사용한다
+        pass
+    return store
+
+
+def append_snapshot(timestamp, snapshot_df, store_dir=STORE_DIR):
+    # 새 스냅샷 하나(대학명, 전형명_key, 모집단위, 경쟁률, 지원인원)를 저장소에 추가한다.
+    # 기존 스냅샷 파일과 static.parquet 는 건드리지 않고, 매칭되지 않은 행을 (사유와 함께) 돌려준다.
+    # 행 매칭은 row_matching.RowMatcher 가 하고, 유사 매칭으로 새로 찾은 키는 매핑 표에 남긴다.
+    label = timestamp if isinstance(timestamp, str) and '_' in timestamp else label_from_timestamp(timestamp)
+    manifest = read_manifest(store_dir)
+    if label in manifest['snapshots']:
+        raise ValueError(f"이미 저장된 스냅샷입니다: {label}")
+
+    keys = pd.read_parquet(os.path.join(store_dir, STATIC_FILE), columns=KEY_COLUMNS)
+    static_version = manifest.get('static_version')
+    matcher = RowMatcher(keys, KEY_COLUMNS, load_mapping(store_dir, KEY_COLUMNS, static_version))
+    incoming = snapshot_df[KEY_COLUMNS + [RATE, APPLICANTS]].reset_index(drop=True)
+    matches = matcher.match(incoming)
+    save_mapping(store_dir, incoming, matches, KEY_COLUMNS, keys, static_version)
+    merged = pd.concat([incoming, matches], axis=1)
+
+    unmatched = merged[merged['row_id'].isna()][KEY_COLUMNS + [RATE, APPLICANTS]]
+    unmatched = unmatched.assign(사유=merged.loc[unmatched.index, 'method'])
+    matched = merged[merged['row_id'].notna()].drop_duplicates('row_id', keep='last')
+
+    n_rows = len(keys)
+    rates = np.full(n_rows, np.nan)
+    applicants = np.full(n_rows, np.nan)
+    row_id = matched['row_id'].to_numpy().astype('int64')
+    rates[row_id] = pd.to_numeric(matched[RATE]).to_numpy()
+    applicants[row_id] = pd.to_numeric(matched[APPLICANTS]).to_numpy()
+
+    os.makedirs(os.path.join(store_dir, SERIES_DIR), exist_ok=True)
+    _snapshot_frame(rates, applicants).to_parquet(_snapshot_path(store_dir, label), index=False)
+
+    # 스냅샷 파일을 먼저 쓰고 manifest 를 마지막에 교체해야 읽는 쪽이 없는 파일을 보지 않는다
+    manifest['snapshots'] = sorted(manifest['snapshots'] + [label])
+    manifest['version'] += 1
+    write_manifest(store_dir, manifest)
+    return label, unmatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경쟁률 스냅샷 저장소 관리")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="CSV 로부터 저장소를 다시 만든다 (수집된 스냅샷은 유지)")
+    build_parser.add_argument('--csv', default=CSV_PATH)
+    build_parser.add_argument('--store', default=STORE_DIR)
+
+    ingest_parser = subparsers.add_parser('ingest', help="스냅샷 CSV 하나를 저장소에 추가한다")
+    ingest_parser.add_argument('snapshot_csv')
+    ingest_parser.add_argument('timestamp', help="예: '2024-09-14 11:00' 또는 '0914_1100'")
+    ingest_parser.add_argument('--store', default=STORE_DIR)
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        store = rebuild_store(args.store, args.csv)
+        store.save(args.store)
+        print(f"{args.store}: {len(store.static)} rows, {len(store.snapshots)} snapshots (version {store.version})")
+    else:
+        label, unmatched = append_snapshot(args.timestamp, pd.read_csv(args.snapshot_csv), args.store)
+        print(f"{label} 추가 완료 (version {read_manifest(args.store)['version']}), 매칭 실패 {len(unmatched)}행")
+        if not unmatched.empty:
+            print(unmatched.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import numpy as np
+
+from column_schema import rate_threshold
+from projection import PROJECTION_COLUMN
+
+# 필터링 검색 계산 층 (Streamlit 없음)
+# FilterSearchView 는 표마다 정렬된 행 위치 배열만 들고, 표는 그릴 때 table() 로 만든다.
+
+# 학교별 필터 결과 표의 전형구분 순서와 표시 기호
+track_symbols = [('교과', '📌'), ('종합', '🔍')]
+
+
+def filter_rows(df, index, selected_universities, max_competition_rate, series_option, only_recommended,
+                latest_competition_rate):
+    # 선택한 대학의 행만 인덱스에서 바로 가져온다 (전체 대학명 컬럼 스캔 없음)
+    rows = np.sort(np.concatenate([index.rows(univ) for univ in selected_universities]))
+    mask = df[latest_competition_rate].to_numpy()[rows] <= rate_threshold(max_competition_rate)
+
+    if series_option != "모두":
+        mask &= df['계열'].to_numpy()[rows] == series_option
+
+    if only_recommended:
+        mask &= df['추천전형'].to_numpy()[rows] == 1
+
+    return rows[mask]
+
+
+class FilterSearchView:
+    def __init__(self, df, index, selected_universities, max_competition_rate, series_option, only_recommended):
+        self.df = df
+        self.latest_competition_rate = [col for col in df.columns if col.startswith('경쟁률_')][-1]
+        rows = filter_rows(df, index, selected_universities, max_competition_rate, series_option, only_recommended,
+                           self.latest_competition_rate)
+        self.empty = len(rows) == 0
+
+        # 대학명 -> [(전형구분, 기호, 최신 경쟁률 내림차순 행 위치 또는 None)]
+        latest = df[self.latest_competition_rate].to_numpy(dtype=float, na_value=np.nan)
+        tracks = df['전형구분'].to_numpy()
+        self.row_orders = {}
+        for univ in selected_universities:
+            univ_rows = np.intersect1d(rows, index.rows(univ), assume_unique=True)
+            orders = []
+            for admission_type, symbol in track_symbols:
+                track_rows = univ_rows[tracks[univ_rows] == admission_type]
+                order = None
+                if len(track_rows):
+                    # 내림차순, 값이 없는 행은 맨 뒤 (sort_values 와 같은 순서)
+                    order = track_rows[np.argsort(-latest[track_rows], kind='stable')]
+                orders.append((admission_type, symbol, order))
+            self.row_orders[univ] = orders
+
+    def table(self, rows):
+        # 행 위치 -> 화면에 그릴 표
+        columns_to_show = ['모집단위', '전형명', '모집인원', self.latest_competition_rate, PROJECTION_COLUMN,
+                           '최종(2024)', '3개년평균']
+        return self.df.iloc[rows][columns_to_show].rename(columns={self.latest_competition_rate: '최신경쟁률'})
+
+
+def recommendation_table(rec_index, rows, scores):
+    columns_to_show = ['대학명', '전형명', '모집단위', '모집인원', rec_index.latest_column, PROJECTION_COLUMN, '3개년평균']
+    result = rec_index.df.iloc[rows][columns_to_show].rename(columns={rec_index.latest_column: '최신경쟁률'})
+    result.insert(0, '안정도', (scores * 100).round(1))
+    return result
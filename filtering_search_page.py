@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
+from filtering_search_model import FilterSearchView, recommendation_table
+from recommendation import DEFAULT_WEIGHTS, SIGNALS, RecommendationIndex
 
 
 @st.cache_data
@@ -20,24 +20,80 @@ def get_university_emoji(university_name):
     return emoji_dict.get(university_name, "🏫")
 
 
-@st.cache_data
-def filter_data(df, selected_universities, max_competition_rate, series_option, only_recommended,
-                latest_competition_rate):
-    filtered_df = df[df['대학명'].isin(selected_universities)]
-    filtered_df = filtered_df[filtered_df[latest_competition_rate] <= max_competition_rate]
-
-    if series_option != "모두":
-        filtered_df = filtered_df[filtered_df['계열'] == series_option]
-
-    if only_recommended:
-        filtered_df = filtered_df[filtered_df['추천전형'] == 1]
-
-    return filtered_df
-
-
-def filtering_search(df, universities):
+# DataFrame 을 해시하지 않고 (데이터 버전, 필터 조건) 으로만 캐시한다. 오래된 결과는 LRU 로 밀려난다.
+# 캐시 항목은 표별 행 위치 배열뿐이라 작고, 표는 그릴 때 view.table() 로 만든다.
+@st.cache_resource(max_entries=32)
+def get_filter_search_view(_df, _index, data_version, selected_universities, max_competition_rate, series_option,
+                           only_recommended):
+    return FilterSearchView(_df, _index, selected_universities, max_competition_rate, series_option,
+                            only_recommended)
+
+
+# 추천 검색 인덱스는 데이터 버전당 한 번만 만든다
+@st.cache_resource(max_entries=2)
+def get_recommendation_index(_df, data_version):
+    return RecommendationIndex(_df)
+
+
+# 추천 검색 결과 표 (가중치는 dict 대신 (신호, 값) 튜플로 받아 캐시 키로 쓴다)
+@st.cache_resource(max_entries=64)
+def get_recommendation_table(_df, data_version, weights, max_latest, max_projected, min_recruits, series, tracks,
+                             only_recommended, exclude_closed, top_k):
+    rec_index = get_recommendation_index(_df, data_version)
+    rows, scores = rec_index.query(dict(weights), max_latest, max_projected, min_recruits, series, list(tracks),
+                                   only_recommended, exclude_closed, top_k)
+    return recommendation_table(rec_index, rows, scores)
+
+
+search_modes = ["학교별 필터", "추천 검색 (전체 대학)"]
+
+
+def recommendation_search(df, data_version):
+    # 버튼 없이 바로 다시 조회한다 (인덱스 질의라 슬라이더를 움직여도 빠름)
+    rec_index = get_recommendation_index(df, data_version)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        series_option = st.radio("계열 선택", ["모두", "인문", "자연"], key="recommend_series_radio")
+        tracks = st.multiselect("전형구분", rec_index.tracks(), key="recommend_tracks_multiselect")
+    with col2:
+        max_latest = st.number_input("최신 경쟁률 (이하)", min_value=0.0, max_value=100.0, value=6.00, step=0.5,
+                                     format="%.2f", key="recommend_max_latest")
+        max_projected = st.number_input("예상 최종 경쟁률 (이하)", min_value=0.0, max_value=100.0, value=10.00,
+                                        step=0.5, format="%.2f", key="recommend_max_projected")
+        min_recruits = st.number_input("최소 모집인원", min_value=0, max_value=200, value=0, step=1,
+                                       key="recommend_min_recruits")
+    with col3:
+        only_recommended = st.checkbox("추천전형만 보기", key="recommend_recommended_checkbox")
+        exclude_closed = st.checkbox("마감된 전형 제외", value=True, key="recommend_exclude_closed")
+        top_k = st.selectbox("결과 수", [20, 50, 100, 200], index=1, key="recommend_top_k")
+
+    st.markdown("##### 가중치")
+    weight_columns = st.columns(len(SIGNALS))
+    weights = {}
+    for col, signal in zip(weight_columns, SIGNALS):
+        with col:
+            weights[signal] = st.slider(signal, 0.0, 3.0, DEFAULT_WEIGHTS[signal], 0.1,
+                                        key=f"recommend_weight_{signal}")
+
+    result = get_recommendation_table(df, data_version, tuple(weights.items()), max_latest, max_projected,
+                                      min_recruits, None if series_option == "모두" else series_option, tuple(tracks),
+                                      only_recommended, exclude_closed, top_k)
+    if result.empty:
+        st.info("조건에 맞는 결과가 없습니다.")
+        return
+
+    st.dataframe(result, hide_index=True, width=None)
+
+
+def filtering_search(df, universities, index, data_version):
     st.header("필터링 검색")
 
+    search_mode = st.radio("검색 방식", search_modes, horizontal=True, key="filtering_search_mode")
+    if search_mode == search_modes[1]:
+        recommendation_search(df, data_version)
+        return
+
     series_option = st.radio("계열 선택", ["모두", "인문", "자연"], key="filtering_series_radio")
 
     selected_universities = st.multiselect("대상 학교 선택 (복수 선택 가능)", universities,
@@ -52,32 +108,21 @@ def filtering_search(df, universities):
         if not selected_universities:
             st.warning("최소 하나의 대학을 선택해주세요.")
         else:
-            latest_competition_rate = [col for col in df.columns if col.startswith('경쟁률_')][-1]
-            filtered_df = filter_data(df, selected_universities, max_competition_rate, series_option, only_recommended,
-                                      latest_competition_rate)
+            view = get_filter_search_view(df, index, data_version, tuple(sorted(selected_universities)),
+                                          max_competition_rate, series_option, only_recommended)
 
-            if filtered_df.empty:
+            if view.empty:
                 st.info("조건에 맞는 결과가 없습니다.")
             else:
                 for univ in selected_universities:
                     st.markdown("---")
                     emoji = get_university_emoji(univ)
                     st.subheader(f"{emoji} {univ}")
-                    univ_df = filtered_df[filtered_df['대학명'] == univ]
 
-                    for admission_type, symbol in [('교과', '📌'), ('종합', '🔍')]:
-                        admission_df = univ_df[univ_df['전형구분'] == admission_type]
-                        if not admission_df.empty:
+                    for admission_type, symbol, rows in view.row_orders[univ]:
+                        if rows is not None:
                             st.write(f"{symbol} {admission_type} 전형")
-                            columns_to_show = ['모집단위', '전형명', '모집인원', latest_competition_rate, '최종(2024)', '3개년평균']
-
-                            admission_df_sorted = admission_df.sort_values(by=latest_competition_rate, ascending=False)
-
-                            st.dataframe(
-                                admission_df_sorted[columns_to_show].rename(columns={latest_competition_rate: '최신경쟁률'}),
-                                hide_index=True,
-                                width=None
-                            )
+                            st.dataframe(view.table(rows), hide_index=True, width=None)
                         else:
                             st.write(f"{symbol} {admission_type} 전형: 해당 없음")
 
@@ -0,0 +1,150 @@
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from data_store import write_json_atomic
+from profiling import profiled
+
+# 대학 그룹 비교
+# 그룹 정의는 university_groups.json (없으면 DEFAULT_GROUPS). 대시보드에서 고친 그룹은 저장 버튼으로 쓴다.
+# 집계 큐브를 대학 × 전형구분 배열로 줄여 두고 소속 행렬(그룹 × 대학)로 모든 그룹을 한 번에 구한다.
+# 통계: 평균, 중앙값(대학별 평균의), 모집인원 가중 평균, 가중 중앙값(대학별 가중 평균의)
+
+GROUPS_FILE = 'university_groups.json'
+
+DEFAULT_GROUPS = {
+    "서연고": ["서울대학교", "연세대학교", "고려대학교"],
+    "서성한": ["서강대학교", "성균관대학교", "한양대학교"],
+    "중경외시이": ["중앙대학교", "경희대학교", "한국외국어대학교", "서울시립대학교", "이화여자대학교"],
+    "경건동홍숙": ["경희대학교", "건국대학교", "동국대학교", "홍익대학교", "숙명여자대학교"],
+    "국숭세단/과기/인하/아주": ["국민대학교", "숭실대학교", "세종대학교", "단국대학교(죽전)", "서울과학기술대학교", "인하대학교", "아주대학교"],
+    "성신/광운/가천/가톨릭/에리카": ["성신여자대학교", "광운대학교", "가천대학교", "가톨릭대학교", "한양대학교(에리카)"],
+    "명지/상명/항공/경기/글로벌/인천": ["명지대학교", "상명대학교", "경기대학교", "한국외국어대학교(글로벌)", "인천대학교", "한국항공대학교"],
+    "동덕/덕성/서울여대": ["동덕여자대학교", "덕성여자대학교", "서울여자대학교"],
+}
+
+ALL_TRACKS = '전체'
+MEAN = '평균'
+MEDIAN = '중앙값'
+WEIGHTED_MEAN = '가중 평균'
+WEIGHTED_MEDIAN = '가중 중앙값'
+STATS = [MEAN, MEDIAN, WEIGHTED_MEAN, WEIGHTED_MEDIAN]
+
+_CUBE_PARTS = ['sum', 'count', 'weighted_sum', 'weight']
+
+
+def load_groups(path=GROUPS_FILE):
+    # {그룹 이름: [대학명]} (파일의 순서 유지). 파일이 없으면 기본 그룹
+    if not os.path.exists(path):
+        return {name: list(universities) for name, universities in DEFAULT_GROUPS.items()}
+    with open(path, encoding='utf-8') as f:
+        groups = json.load(f)
+    if not isinstance(groups, dict) or not all(isinstance(members, list) for members in groups.values()):
+        raise ValueError(f"{path}: {{그룹 이름: [대학명, ...]}} 형식이어야 합니다")
+    return {str(name): [str(univ) for univ in members] for name, members in groups.items()}
+
+
+def save_groups(groups, path=GROUPS_FILE):
+    return write_json_atomic(path, groups)
+
+
+def groups_key(groups):
+    # 캐시 키로 쓸 수 있는 형태 (순서 포함)
+    return tuple((name, tuple(members)) for name, members in groups.items())
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _member_values(values, membership):
+    # (대학 × 스냅샷) -> (그룹 × 대학 × 스냅샷), 소속이 아니면 NaN
+    return np.where(membership[:, :, None], values[None, :, :], np.nan)
+
+
+def _median(values, membership):
+    with warnings.catch_warnings():
+        # 소속 대학에 값이 하나도 없는 스냅샷은 NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmedian(_member_values(values, membership), axis=1)
+
+
+def _weighted_median(values, weights, membership):
+    # 그룹 × 스냅샷마다 값을 정렬해 누적 가중치가 절반에 처음 닿는 값
+    member_values = _member_values(values, membership)
+    member_weights = np.where(np.isnan(member_values), 0.0, weights[None, :, :])
+    order = np.argsort(member_values, axis=1)  # NaN 은 맨 뒤
+    sorted_values = np.take_along_axis(member_values, order, axis=1)
+    cumulative = np.cumsum(np.take_along_axis(member_weights, order, axis=1), axis=1)
+    total = cumulative[:, -1:, :]
+    position = np.argmax(cumulative >= total / 2, axis=1)
+    result = np.take_along_axis(sorted_values, position[:, None, :], axis=1)[:, 0, :]
+    return np.where(total[:, 0, :] > 0, result, np.nan)
+
+
+class GroupComparison:
+    def __init__(self, cube):
+        self.columns = list(cube['sum'].columns)
+        by_track = cube[_CUBE_PARTS].groupby(level=['대학명', '전형구분'], dropna=False, observed=True).sum()
+        totals = by_track.groupby(level='대학명', observed=True).sum()
+        self.universities = list(totals.index)
+        self._position = {univ: j for j, univ in enumerate(self.universities)}
+
+        # 전형구분 -> {part: (대학 × 스냅샷) 배열}
+        self._arrays = {ALL_TRACKS: self._university_arrays(totals)}
+        tracks = by_track.index.get_level_values('전형구분')
+        for track in pd.unique(tracks.dropna()):
+            self._arrays[track] = self._university_arrays(by_track[tracks == track].droplevel('전형구분'))
+
+    def _university_arrays(self, frame):
+        frame = frame.reindex(self.universities)
+        return {part: np.nan_to_num(frame[part].to_numpy(dtype=float)) for part in _CUBE_PARTS}
+
+    def tracks(self):
+        return list(self._arrays)
+
+    def membership(self, groups):
+        # (그룹 × 대학) 소속 행렬. 데이터에 없는 대학은 무시한다
+        matrix = np.zeros((len(groups), len(self.universities)), dtype=bool)
+        for g, members in enumerate(groups.values()):
+            for univ in members:
+                if univ in self._position:
+                    matrix[g, self._position[univ]] = True
+        return matrix
+
+    def compute(self, groups, track=ALL_TRACKS):
+        # {통계: DataFrame(index 그룹 이름, 컬럼 경쟁률_*)}
+        arrays = self._arrays.get(track)
+        if arrays is None:
+            arrays = {part: np.zeros((len(self.universities), len(self.columns))) for part in _CUBE_PARTS}
+        membership = self.membership(groups)
+        weights = membership.astype(float)
+        sums = {part: weights @ arrays[part] for part in _CUBE_PARTS}
+
+        university_means = _ratio(arrays['sum'], arrays['count'])
+        university_weighted = _ratio(arrays['weighted_sum'], arrays['weight'])
+        stats = {
+            MEAN: _ratio(sums['sum'], sums['count']),
+            MEDIAN: _median(university_means, membership),
+            WEIGHTED_MEAN: _ratio(sums['weighted_sum'], sums['weight']),
+            WEIGHTED_MEDIAN: _weighted_median(university_weighted, arrays['weight'], membership),
+        }
+        index = pd.Index(list(groups), name='그룹')
+        return {stat: pd.DataFrame(values, index=index, columns=self.columns) for stat, values in stats.items()}
+
+
+@profiled()
+def build_group_comparison_figure(table, x_values, title):
+    # 그룹마다 선 하나 (table: 그룹 × 스냅샷)
+    fig = go.Figure()
+    for group, values in zip(table.index, table.to_numpy().tolist()):
+        fig.add_trace(go.Scatter(x=x_values, y=values, mode='lines+markers', name=group,
+                                 hovertemplate='%{y:.2f}'))
+    fig.update_layout(title=title, xaxis_title="기준일", yaxis_title="경쟁률", height=450, yaxis=dict(range=[0, None]),
+                      legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5, font=dict(size=9)))
+    return fig
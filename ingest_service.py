@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import re
+import time
+import traceback
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+import aiohttp
+import pandas as pd
+
+from data_store import APPLICANTS, KEY_COLUMNS, RATE, STATIC_FILE, STORE_DIR, append_snapshot
+
+# 경쟁률 수집 서비스
+# 설정 파일의 소스를 asyncio 로 가져와 스냅샷 스키마로 바꾸고 append_snapshot() 으로 저장소에 붙인다.
+# 동시 요청은 max_concurrency, 같은 호스트는 host_interval 초 간격, 일시적 오류는 지수 백오프로 재시도.
+# 실패한 소스는 실패 목록에만 남는다. 소스 종류는 SOURCE_TYPES 에 등록한다.
+#
+# 설정 파일 (JSON):
+# {"max_concurrency": 8, "host_interval": 1.0,
+#  "sources": [{"type": "html_table", "university": "가천대학교", "url": "https://...", "encoding": "utf-8"}, ...]}
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_HOST_INTERVAL = 1.0
+DEFAULT_TIMEOUT = 20
+DEFAULT_MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 페이지마다 다른 헤더 이름 -> 스냅샷 스키마
+COLUMN_ALIASES = {
+    '모집단위': ['모집단위', '모집단위명', '학과', '학부', '학과(전공)', '학부(과)'],
+    '전형명': ['전형명', '전형', '전형유형'],
+    '모집인원': ['모집인원', '모집정원', '정원'],
+    APPLICANTS: ['지원인원', '지원자', '지원자수', '지원'],
+    RATE: ['경쟁률', '경쟁율'],
+}
+_NUMBER = re.compile(r'[-+]?\d[\d,]*\.?\d*')
+
+
+class SourceError(Exception):
+    pass
+
+
+def parse_number(text):
+    # '12.34 : 1', '1,234명' -> 12.34, 1234.0 (숫자가 없으면 NaN)
+    match = _NUMBER.search(str(text))
+    return float(match.group().replace(',', '')) if match else float('nan')
+
+
+def normalize_header(text):
+    return re.sub(r'\s+', '', str(text))
+
+
+class _TableParser(HTMLParser):
+    # <table> 마다 셀 텍스트의 2차원 목록을 모은다 (중첩 표는 안쪽 표만 따로 모임)
+    def __init__(self):
+        super().__init__()
+        self.tables = []
+        self._stack = []
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self._stack.append([])
+        elif tag == 'tr' and self._stack:
+            self._stack[-1].append([])
+        elif tag in ('td', 'th') and self._stack:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ('td', 'th') and self._cell is not None and self._stack and self._stack[-1]:
+            self._stack[-1][-1].append(' '.join(''.join(self._cell).split()))
+            self._cell = None
+        elif tag == 'table' and self._stack:
+            self.tables.append(self._stack.pop())
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def parse_html_tables(text):
+    parser = _TableParser()
+    parser.feed(text)
+    return [[row for row in table if row] for table in parser.tables]
+
+
+def rows_from_table(table):
+    # 헤더에 모집단위와 (경쟁률 또는 지원인원) 이 있는 표를 스키마 컬럼의 DataFrame 으로 바꾼다
+    if len(table) < 2:
+        return None
+    header = [normalize_header(cell) for cell in table[0]]
+    columns = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        for i, cell in enumerate(header):
+            if cell in aliases and name not in columns:
+                columns[name] = i
+    if '모집단위' not in columns or (RATE not in columns and APPLICANTS not in columns):
+        return None
+
+    width = len(header)
+    body = [row for row in table[1:] if len(row) == width]
+    frame = pd.DataFrame({name: [row[i] for row in body] for name, i in columns.items()})
+    for name in ['모집인원', APPLICANTS, RATE]:
+        if name in frame.columns:
+            frame[name] = frame[name].map(parse_number)
+    return frame
+
+
+class RateSource:
+    # 소스 하나 = 요청 하나. parse() 는 (모집단위, 전형명 또는 전형명_key, 모집인원, 경쟁률, 지원인원) 행을 돌려준다.
+    def __init__(self, university, url, encoding=None, admission_key=None, **options):
+        self.university = university
+        self.url = url
+        self.encoding = encoding
+        self.admission_key = admission_key
+        self.options = options
+
+    @property
+    def host(self):
+        return urlsplit(self.url).netloc
+
+    def parse(self, text):
+        raise NotImplementedError
+
+
+class HtmlTableSource(RateSource):
+    # 경쟁률 페이지의 <table> 들 중 모집단위/경쟁률 헤더가 있는 표를 모두 읽는다.
+    # 표에 전형명 컬럼이 없으면 설정의 admission_key 를 쓴다.
+    def parse(self, text):
+        frames = [frame for frame in map(rows_from_table, parse_html_tables(text)) if frame is not None]
+        if not frames:
+            raise SourceError(f"경쟁률 표를 찾지 못했습니다: {self.url}")
+        return pd.concat(frames, ignore_index=True)
+
+
+class JsonSource(RateSource):
+    # [{"전형명": ..., "모집단위": ..., "모집인원": ..., "지원인원": ..., "경쟁률": ...}, ...] 형식의 API
+    def parse(self, text):
+        records = json.loads(text)
+        if isinstance(records, dict):
+            records = records.get(self.options.get('records_key', 'data'), [])
+        return pd.DataFrame(records)
+
+
+SOURCE_TYPES = {
+    'html_table': HtmlTableSource,
+    'json': JsonSource,
+}
+
+
+def source_from_config(entry):
+    entry = dict(entry)
+    source_type = SOURCE_TYPES[entry.pop('type', 'html_table')]
+    return source_type(**entry)
+
+
+def load_config(path):
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    config['sources'] = [source_from_config(entry) for entry in config.get('sources', [])]
+    return config
+
+
+class HostRateLimiter:
+    # 같은 호스트로 가는 요청 사이에 최소 interval 초 간격을 둔다
+    def __init__(self, interval):
+        self.interval = interval
+        self._locks = {}
+        self._last = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host, semaphore):
+        # 호스트 간격을 기다린 뒤 semaphore 를 잡고, 블록이 끝나면 놓는다.
+        # 호스트 잠금은 semaphore 를 잡을 때까지 쥐고 있어 semaphore 를 기다리는 사이 같은 호스트 요청이 간격을 건너뛰지 않고,
+        # 간격을 기다리는 동안에는 semaphore 를 쥐지 않는다.
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self._last.get(host, 0) + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await semaphore.acquire()
+            self._last[host] = time.monotonic()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+def admission_key_lookup(store_dir=STORE_DIR):
+    # (대학명, 전형명 또는 전형명_key) -> 전형명_key
+    static = pd.read_parquet(os.path.join(store_dir, STATIC_FILE), columns=['대학명', '전형명', '전형명_key'])
+    static = static.astype(str).drop_duplicates()
+    lookup = {(univ, key): key for univ, key in zip(static['대학명'], static['전형명_key'])}
+    lookup.update({(univ, name): key for univ, name, key in zip(static['대학명'], static['전형명'], static['전형명_key'])})
+    return lookup
+
+
+def to_snapshot_rows(source, frame, lookup):
+    # 소스 하나의 파싱 결과를 스냅샷 스키마로 맞춘다. 경쟁률/지원인원 중 빠진 값은 모집인원으로 채운다.
+    frame = frame.copy()
+    frame['대학명'] = source.university
+    if '전형명_key' not in frame.columns:
+        names = frame['전형명'] if '전형명' in frame.columns else pd.Series(source.admission_key, index=frame.index)
+        frame['전형명_key'] = [lookup.get((source.university, str(name)), name) for name in names]
+    recruits = frame['모집인원'] if '모집인원' in frame.columns else pd.Series(float('nan'), index=frame.index)
+    if RATE not in frame.columns:
+        frame[RATE] = (frame[APPLICANTS] / recruits).round(2)
+    if APPLICANTS not in frame.columns:
+        frame[APPLICANTS] = (frame[RATE] * recruits).round()
+    frame[RATE] = frame[RATE].fillna((frame[APPLICANTS] / recruits).round(2))
+    frame[APPLICANTS] = frame[APPLICANTS].fillna((frame[RATE] * recruits).round())
+    return frame[KEY_COLUMNS + [RATE, APPLICANTS]]
+
+
+class IngestService:
+    def __init__(self, sources, store_dir=STORE_DIR, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 host_interval=DEFAULT_HOST_INTERVAL, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES):
+        self.sources = sources
+        self.store_dir = store_dir
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.limiter = HostRateLimiter(host_interval)
+
+    @classmethod
+    def from_config(cls, path, store_dir=STORE_DIR):
+        config = load_config(path)
+        return cls(config['sources'], store_dir,
+                   max_concurrency=config.get('max_concurrency', DEFAULT_MAX_CONCURRENCY),
+                   host_interval=config.get('host_interval', DEFAULT_HOST_INTERVAL),
+                   timeout=config.get('timeout', DEFAULT_TIMEOUT),
+                   max_retries=config.get('max_retries', DEFAULT_MAX_RETRIES))
+
+    async def fetch(self, session, semaphore, source):
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.limiter.slot(source.host, semaphore):
+                    async with session.get(source.url) as response:
+                        if response.status in RETRY_STATUS:
+                            raise SourceError(f"HTTP {response.status}: {source.url}")
+                        response.raise_for_status()
+                        return await response.text(encoding=source.encoding)
+            except (aiohttp.ClientError, asyncio.TimeoutError, SourceError):
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(RETRY_BASE_DELAY * 2 ** attempt)
+
+    async def collect(self, lookup):
+        # 모든 소스를 가져와 파싱하고 스냅샷 스키마로 바꾼다 -> (소스별 DataFrame 목록, 실패 목록)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            results = await asyncio.gather(*(self.fetch(session, semaphore, source) for source in self.sources),
+                                           return_exceptions=True)
+
+        frames, failures = [], []
+        for source, result in zip(self.sources, results):
+            if isinstance(result, BaseException):
+                failures.append((source.university, source.url, repr(result)))
+                continue
+            try:
+                frames.append(to_snapshot_rows(source, source.parse(result), lookup))
+            except Exception as e:
+                failures.append((source.university, source.url, repr(e)))
+        return frames, failures
+
+    async def run_once(self, timestamp=None):
+        # 한 번 수집해서 스냅샷 하나로 저장한다 -> 결과 요약
+        timestamp = timestamp or datetime.now()
+        started = time.perf_counter()
+        frames, failures = await self.collect(admission_key_lookup(self.store_dir))
+        if not frames:
+            return {'label': None, 'rows': 0, 'unmatched': None, 'failures': failures,
+                    'seconds': time.perf_counter() - started}
+
+        snapshot = pd.concat(frames, ignore_index=True)
+        label, unmatched = append_snapshot(timestamp, snapshot, self.store_dir)
+        return {'label': label, 'rows': len(snapshot), 'unmatched': unmatched, 'failures': failures,
+                'seconds': time.perf_counter() - started}
+
+    async def serve(self, times):
+        # 매일 지정한 시각(HH:MM 목록)에 한 번씩 수집한다
+        while True:
+            now = datetime.now()
+            upcoming = sorted(now.replace(hour=int(t[:2]), minute=int(t[3:5]), second=0, microsecond=0)
+                              for t in times)
+            upcoming = [t for t in upcoming if t > now] or [upcoming[0] + timedelta(days=1)]
+            await asyncio.sleep((upcoming[0] - now).total_seconds())
+            await self.run_scheduled(upcoming[0])
+
+    async def run_scheduled(self, timestamp):
+        # serve 의 한 번. 실패해도 예외를 올리지 않고 기록만 남긴다 (결과 요약, 실패면 None)
+        try:
+            summary = await self.run_once(timestamp)
+        except Exception:
+            print(f"{timestamp:%m-%d %H:%M} 수집 실패:\n{traceback.format_exc()}")
+            return None
+        print_summary(summary)
+        return summary
+
+
+def print_summary(summary):
+    if summary['label'] is None:
+        print(f"수집 실패: 저장할 행이 없습니다 ({summary['seconds']:.1f}s)")
+    else:
+        print(f"{summary['label']} 저장: {summary['rows']}행, 매칭 실패 {len(summary['unmatched'])}행 "
+              f"({summary['seconds']:.1f}s)")
+    for university, url, error in summary['failures']:
+        print(f"  실패 {university} {url}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대학별 경쟁률 페이지 수집 서비스")
+    parser.add_argument('config', help="소스 설정 JSON")
+    parser.add_argument('--store', default=STORE_DIR)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    once_parser = subparsers.add_parser('once', help="지금 한 번 수집한다")
+    once_parser.add_argument('--timestamp', default=None, help="스냅샷 시각 (기본: 지금), 예: '2024-09-13 15:00'")
+
+    serve_parser = subparsers.add_parser('serve', help="매일 지정한 시각에 수집한다")
+    serve_parser.add_argument('--at', action='append', required=True, help="수집 시각 HH:MM (여러 번 지정 가능)")
+
+    args = parser.parse_args()
+    service = IngestService.from_config(args.config, args.store)
+    if args.command == 'once':
+        print_summary(asyncio.run(service.run_once(args.timestamp)))
+    else:
+        asyncio.run(service.serve(args.at))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import html
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlsplit
+
+import numpy as np
+
+from data_store import STORE_DIR, SnapshotStore
+
+# 수집 서비스 점검용 로컬 경쟁률 서버
+# 저장소의 마지막 스냅샷 × growth 로 대학별 경쟁률 페이지(/rates/<대학명>)를 만든다.
+# fail_first 는 경로마다 처음 몇 번 503, latency 는 응답 지연, max_active 는 최대 동시 요청 수.
+#
+#     with MockRateServer(growth=1.1, fail_first=1) as server:
+#         service = IngestService([source_from_config(entry) for entry in server.sources()], store_dir=...)
+#         asyncio.run(service.run_once('0914_1100'))
+
+
+def render_rate_page(university, rows):
+    body = "".join(
+        f"<tr><td>{html.escape(name)}</td><td>{html.escape(major)}</td><td>{recruits:.0f}</td>"
+        f"<td>{applicants:,.0f}</td><td>{rate:.2f} : 1</td></tr>"
+        for name, major, recruits, applicants, rate in rows)
+    return (f"<html><head><meta charset='utf-8'><title>{html.escape(university)} 경쟁률</title></head><body>"
+            f"<h1>{html.escape(university)} 수시모집 경쟁률</h1>"
+            "<table><tr><th>전형명</th><th>모집단위</th><th>모집인원</th><th>지원인원</th><th>경쟁률</th></tr>"
+            f"{body}</table></body></html>")
+
+
+def build_pages(store, growth=1.0):
+    # 대학명 -> 페이지 HTML (지원인원은 마지막 스냅샷 × growth, 경쟁률은 지원인원 / 모집인원)
+    state = store.state
+    static = state.static
+    rates, applicants = state.snapshot_matrices([state.snapshots[-1]])
+    recruits = static['모집인원'].to_numpy(dtype=float)
+    applicants = np.round(np.nan_to_num(applicants[:, 0]) * growth)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = np.where(recruits > 0, applicants / recruits, 0.0)
+
+    pages = {}
+    for university, rows in static.groupby('대학명', observed=True, sort=False).indices.items():
+        page_rows = zip(static['전형명'].astype(str).to_numpy()[rows], static['모집단위'].astype(str).to_numpy()[rows],
+                        np.nan_to_num(recruits[rows]), applicants[rows], rates[rows])
+        pages[str(university)] = render_rate_page(str(university), page_rows)
+    return pages
+
+
+class MockRateServer:
+    def __init__(self, store_dir=STORE_DIR, growth=1.0, fail_first=0, latency=0.0, port=0):
+        self.pages = build_pages(SnapshotStore.load(store_dir), growth)
+        self.fail_first = fail_first
+        self.latency = latency
+        self.requests = Counter()
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._thread = None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = unquote(urlsplit(self.path).path)
+                with server._lock:
+                    server.requests[path] += 1
+                    count = server.requests[path]
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    self._respond(path, count)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+            def _respond(self, path, count):
+                if server.latency:
+                    time.sleep(server.latency)
+
+                university = path.removeprefix('/rates/')
+                if university not in server.pages:
+                    self.send_error(404)
+                    return
+                if count <= server.fail_first:
+                    self.send_error(503)
+                    return
+                body = server.pages[university].encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sources(self):
+        # 수집 서비스 설정의 sources 항목과 같은 형식
+        return [{'type': 'html_table', 'university': university, 'url': f"{self.url}/rates/{quote(university)}"}
+                for university in self.pages]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 경쟁률 페이지 서버 (수집 서비스 점검용)")
+    parser.add_argument('--store', default=STORE_DIR)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--growth', type=float, default=1.1, help="마지막 스냅샷 지원인원에 곱할 배율")
+    parser.add_argument('--fail-first', type=int, default=0, help="경로마다 처음 N 번은 503 응답")
+    parser.add_argument('--latency', type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument('--write-config', help="수집 서비스 설정 파일을 이 경로에 쓴다")
+    args = parser.parse_args()
+
+    server = MockRateServer(args.store, args.growth, args.fail_first, args.latency, args.port)
+    if args.write_config:
+        with open(args.write_config, 'w', encoding='utf-8') as f:
+            json.dump({'max_concurrency': 8, 'host_interval': 0.0, 'sources': server.sources()}, f,
+                      ensure_ascii=False, indent=2)
+    print(f"{server.url} 에서 {len(server.pages)}개 대학 페이지 제공 중")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
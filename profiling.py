@@ -0,0 +1,168 @@
+import contextlib
+import functools
+import io
+import itertools
+import json
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+# 렌더링 시간 측정
+# timed() / profiled() / plotly_chart() 가 재실행 하나의 구간별 시간을 현재 스레드의 RunProfile 에 남긴다.
+# 구간 종류: load, tab, figure, chart (chart 는 trace 수, JSON 크기, 직렬화 시간 포함)
+# 끝난 실행은 ProfileLog 에 최근 MAX_RUNS 개까지 모아 JSON / CSV 로 내보낸다.
+
+MAX_RUNS = 200
+RECORD_COLUMNS = ['run', 'kind', 'name', 'parent', 'depth', 'offset', 'seconds',
+                  'traces', 'payload_bytes', 'serialize_seconds']
+
+_local = threading.local()
+_run_ids = itertools.count(1)
+
+
+class RunProfile:
+    def __init__(self, meta=None):
+        self.run = next(_run_ids)
+        self.started = time.time()
+        self.meta = dict(meta or {})
+        self.records = []
+        self.seconds = None
+        self._start = time.perf_counter()
+        self._stack = []
+
+    def elapsed(self):
+        return time.perf_counter() - self._start if self.seconds is None else self.seconds
+
+    def to_frame(self):
+        frame = pd.DataFrame(self.records, columns=RECORD_COLUMNS)
+        for key, value in self.meta.items():
+            frame[key] = value
+        return frame
+
+    def to_dict(self):
+        return {'run': self.run, 'started': self.started, 'seconds': self.elapsed(), 'meta': self.meta,
+                'records': self.records}
+
+
+class ProfileLog:
+    # 최근 실행 기록 (여러 세션이 함께 쓰므로 잠금)
+    def __init__(self, max_runs=MAX_RUNS):
+        self._runs = deque(maxlen=max_runs)
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        with self._lock:
+            self._runs.append(profile)
+
+    def clear(self):
+        with self._lock:
+            self._runs.clear()
+
+    def runs(self):
+        with self._lock:
+            return list(self._runs)
+
+    def to_frame(self):
+        frames = [profile.to_frame() for profile in self.runs()]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RECORD_COLUMNS)
+
+    def summary(self):
+        # 구간별 횟수 / 평균 / p95 / 최대 (ms), 차트는 평균 trace 수와 payload 크기도
+        frame = self.to_frame()
+        if frame.empty:
+            return pd.DataFrame()
+        frame['ms'] = frame['seconds'] * 1000
+        grouped = frame.groupby(['kind', 'name'], sort=False)
+        summary = grouped['ms'].agg(횟수='count', 평균='mean', p95=lambda ms: ms.quantile(0.95), 최대='max')
+        summary['trace 수'] = grouped['traces'].mean()
+        summary['payload(KB)'] = grouped['payload_bytes'].mean() / 1024
+        return summary.round(1).sort_values('평균', ascending=False)
+
+    def to_json(self):
+        return json.dumps([profile.to_dict() for profile in self.runs()], ensure_ascii=False, indent=1)
+
+    def to_csv(self):
+        buffer = io.StringIO()
+        self.to_frame().to_csv(buffer, index=False)
+        return buffer.getvalue()
+
+    def write(self, path):
+        # 확장자(.json / .csv)에 따라 저장
+        text = self.to_csv() if path.endswith('.csv') else self.to_json()
+        with open(path, 'w', encoding='utf-8-sig' if path.endswith('.csv') else 'utf-8') as f:
+            f.write(text)
+        return path
+
+
+def current():
+    return getattr(_local, 'profile', None)
+
+
+@contextlib.contextmanager
+def recording(log=None, **meta):
+    # 이 블록 안의 측정 구간을 새 RunProfile 에 기록하고, 끝나면 log 에 넣는다. log 가 None 이면 측정하지 않는다.
+    if log is None:
+        yield None
+        return
+    profile = RunProfile(meta)
+    _local.profile = profile
+    try:
+        yield profile
+    finally:
+        _local.profile = None
+        profile.seconds = profile.elapsed()
+        log.add(profile)
+
+
+def annotate(**meta):
+    # 실행 전체에 붙일 정보 (데이터 버전, 행 수 등)
+    profile = current()
+    if profile is not None:
+        profile.meta.update(meta)
+
+
+@contextlib.contextmanager
+def timed(name, kind='block', **detail):
+    profile = current()
+    if profile is None:
+        yield
+        return
+    parent = profile._stack[-1] if profile._stack else None
+    profile._stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        profile._stack.pop()
+        profile.records.append(dict(run=profile.run, kind=kind, name=name, parent=parent, depth=len(profile._stack),
+                                    offset=start - profile._start, seconds=end - start, **detail))
+
+
+def profiled(name=None, kind='figure'):
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(label, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def plotly_chart(fig, name=None, **kwargs):
+    # st.plotly_chart 대신 쓴다. 측정 중이면 trace 수와 직렬화 크기/시간도 기록한다.
+    # (st.plotly_chart 는 부를 때마다 Figure 를 JSON 으로 직렬화하므로, 캐시된 Figure 도 이 시간은 매번 든다)
+    import streamlit as st
+
+    if current() is None:
+        return st.plotly_chart(fig, **kwargs)
+    start = time.perf_counter()
+    payload = fig.to_json()
+    serialize_seconds = time.perf_counter() - start
+    with timed(name or fig.layout.title.text or 'chart', 'chart', traces=len(fig.data),
+               payload_bytes=len(payload.encode('utf-8')), serialize_seconds=serialize_seconds):
+        return st.plotly_chart(fig, **kwargs)
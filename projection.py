@@ -0,0 +1,207 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from data_store import RATE_PREFIX, snapshot_columns, snapshot_label
+
+# 최종 경쟁률 예측 엔진
+# 과거 연도마다 올해 곡선에 맞는 배율을 구해 그 해 최종 경쟁률에 곱하고 평균한다. 과거 자료가 없으면 유사전형 배율.
+# 구간은 80% 포함 목표 (과거 연도 하나씩 뺀 백테스트 잔차 / 유사전형 배율의 10/90% 분위).
+# D-2 보다 이른 스냅샷만 있는 행은 예측하지 않는다.
+
+PAST_YEARS = [2024, 2023, 2022]
+CHECKPOINTS = ['D-2', 'D-1', 'D-0오전', 'D-0오후']
+# 마감에 가까운 체크포인트일수록 최종값을 더 잘 설명하므로 가중치를 크게 둔다
+CHECKPOINT_WEIGHTS = np.array([1.0, 2.0, 4.0, 8.0])
+# 불확실성 구간이 목표로 하는 분위 (10~90%: 실제 최종이 구간 안에 들 비율 80% 목표)
+BAND_QUANTILES = (0.1, 0.9)
+PEER_QUANTILES = (BAND_QUANTILES[0], 0.5, BAND_QUANTILES[1])
+CLOSED = len(CHECKPOINTS)  # 마감 이후 스냅샷 (값이 곧 최종)
+BEFORE_WINDOW = -1  # D-2 보다 이른 스냅샷
+
+PROJECTION_COLUMN = '예상최종(2025)'
+PROJECTION_LOW_COLUMN = '예상최종_하한'
+PROJECTION_HIGH_COLUMN = '예상최종_상한'
+PROJECTION_BASIS_COLUMN = '예측근거'
+PROJECTION_COLUMNS = [PROJECTION_COLUMN, PROJECTION_LOW_COLUMN, PROJECTION_HIGH_COLUMN, PROJECTION_BASIS_COLUMN]
+
+# 마감일 (MMDD). 기본값과 다른 대학만 적는다.
+DEFAULT_DEADLINE = '0913'
+deadline_overrides = {
+    "서울대학교": "0911",
+    "고려대학교": "0911",
+    "건국대학교": "0912",
+    "동국대학교": "0912",
+    "서울시립대학교": "0912",
+    "연세대학교": "0912",
+    "이화여자대학교": "0912",
+}
+# 이 시각 이전 마감일 스냅샷은 D-0오전, 이후는 D-0오후
+MORNING_END = '1200'
+# 과거 연도 계산용 기준 연도 (월/일 차이만 쓴다)
+_CALENDAR_YEAR = 2024
+
+
+def past_column(checkpoint, year):
+    return f'{checkpoint}({year})'
+
+
+def _to_date(mmdd):
+    return date(_CALENDAR_YEAR, int(mmdd[:2]), int(mmdd[2:4]))
+
+
+def checkpoint_of(label, deadline):
+    # 스냅샷 라벨 '0912_1500' 이 마감일 deadline('0913') 기준으로 어느 체크포인트에 해당하는지
+    day, time_of_day = label.split('_')
+    days_left = (_to_date(deadline) - _to_date(day)).days
+    if days_left < 0:
+        return CLOSED
+    if days_left == 0:
+        return CHECKPOINTS.index('D-0오전') if time_of_day < MORNING_END else CHECKPOINTS.index('D-0오후')
+    if days_left <= 2:
+        return CHECKPOINTS.index(f'D-{days_left}')
+    return BEFORE_WINDOW
+
+
+def align_current_rates(df, rate_columns, deadlines=None):
+    # (행 × [D-2, D-1, D-0오전, D-0오후, 마감]) 배열. 같은 체크포인트에 스냅샷이 여럿이면 늦은 것을 쓴다.
+    deadlines = deadline_overrides if deadlines is None else deadlines
+    labels = [snapshot_label(col) for col in rate_columns]
+    rates = df[rate_columns].to_numpy(dtype=float)
+
+    universities, inverse = np.unique(df['대학명'].astype(str).to_numpy(), return_inverse=True)
+    slots = np.array([[checkpoint_of(label, deadlines.get(univ, DEFAULT_DEADLINE)) for label in labels]
+                      for univ in universities], dtype=int).reshape(len(universities), len(labels))
+    row_slots = slots[inverse]
+
+    current = np.full((len(df), CLOSED + 1), np.nan)
+    for j in range(len(labels)):
+        valid = (row_slots[:, j] != BEFORE_WINDOW) & ~np.isnan(rates[:, j])
+        current[valid, row_slots[valid, j]] = rates[valid, j]
+    return current
+
+
+def _past_array(df, columns):
+    return df.reindex(columns=columns).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+
+def _last_valid(values):
+    # 행마다 마지막으로 값이 있는 위치와 그 값 (없으면 -1, NaN)
+    has_value = ~np.isnan(values)
+    last = np.where(has_value.any(axis=1), values.shape[1] - 1 - np.argmax(has_value[:, ::-1], axis=1), -1)
+    picked = np.take_along_axis(values, np.maximum(last, 0)[:, None], axis=1)[:, 0]
+    return last, np.where(last >= 0, picked, np.nan)
+
+
+def _group_quantiles(values, groups, quantiles=BAND_QUANTILES):
+    # values (행, 연도) 를 그룹별로 모아 구한 분위수를 행마다 돌려준다 -> (행, 분위수)
+    n_rows, n_years = values.shape
+    codes, uniques = pd.factorize(groups, use_na_sentinel=False)
+    table = (pd.Series(values.ravel()).groupby(np.repeat(codes, n_years))
+             .quantile(list(quantiles)).unstack())
+    return table.reindex(range(len(uniques))).to_numpy()[codes]
+
+
+def _peer_ratio_quantiles(history, finals, groups):
+    # 전형구분 × 체크포인트 별 (최종 / 체크포인트) 배율의 하한/중앙/상한 분위 -> (행, 체크포인트, 3)
+    n_rows, n_years, n_checkpoints = history.shape
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = finals[:, :, None] / history
+    ratios[~np.isfinite(ratios) | (ratios <= 0)] = np.nan
+
+    quantiles = np.full((n_rows, n_checkpoints, 3), np.nan)
+    for k in range(n_checkpoints):
+        quantiles[:, k, :] = _group_quantiles(ratios[:, :, k], groups, PEER_QUANTILES)
+    return quantiles
+
+
+def _yearly_projections(window, history, finals):
+    # 연도별 배율 sum(w c h) / sum(w h^2) × 그 해 최종 -> (행, 연도). 올해와 그 해 모두 값이 있는 체크포인트만 쓴다
+    both = ~np.isnan(window)[:, None, :] & ~np.isnan(history)
+    weights = CHECKPOINT_WEIGHTS * both
+    c = np.nan_to_num(window)[:, None, :]
+    h = np.nan_to_num(history)
+    numerator = (weights * c * h).sum(axis=2)
+    denominator = (weights * h * h).sum(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan) * finals
+
+
+def _mean_over_years(yearly):
+    n_years = (~np.isnan(yearly)).sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        return np.where(n_years > 0, np.nansum(yearly, axis=1) / n_years, np.nan)
+
+
+def _backtest_log_residuals(window, history, finals):
+    # 과거 연도 하나를 올해처럼 두고 (이 행에서 올해 값이 있는 체크포인트만 보이게) 나머지 연도로 같은 방식으로
+    # 예측했을 때의 log(실제 최종 / 예측) -> (행, 연도)
+    available = ~np.isnan(window)
+    n_years = history.shape[1]
+    residuals = np.full(finals.shape, np.nan)
+    for year in range(n_years):
+        others = [k for k in range(n_years) if k != year]
+        held_out = np.where(available, history[:, year, :], np.nan)
+        predicted = _mean_over_years(_yearly_projections(held_out, history[:, others, :], finals[:, others]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            residuals[:, year] = np.log(finals[:, year] / predicted)
+    residuals[~np.isfinite(residuals)] = np.nan
+    return residuals
+
+
+def project_final_rates(df, deadlines=None):
+    rate_columns = snapshot_columns(df, RATE_PREFIX)
+    current = align_current_rates(df, rate_columns, deadlines)
+    # 접수 초반의 0 은 곡선의 높이를 알려 주지 않으므로 체크포인트 값이 없는 것으로 본다
+    with np.errstate(invalid='ignore'):
+        window = np.where(current[:, :CLOSED] > 0, current[:, :CLOSED], np.nan)
+    closed = current[:, CLOSED]
+    groups = df['전형구분'].astype(str).to_numpy()
+
+    history = np.stack([_past_array(df, [past_column(cp, year) for cp in CHECKPOINTS]) for year in PAST_YEARS],
+                       axis=1)  # (행, 연도, 체크포인트)
+    finals = _past_array(df, [past_column('최종', year) for year in PAST_YEARS])  # (행, 연도)
+
+    yearly = _yearly_projections(window, history, finals)
+    has_history = (~np.isnan(yearly)).any(axis=1)
+
+    # 유사 전형 배율: 행마다 가장 최근 체크포인트 기준 (구간 안에 스냅샷이 없으면 NaN)
+    last_checkpoint, last_window_value = _last_valid(window)
+    peer = _peer_ratio_quantiles(history, finals, groups)
+    peer_at_last = np.take_along_axis(peer, np.maximum(last_checkpoint, 0)[:, None, None], axis=1)[:, 0, :]
+    peer_at_last[last_checkpoint < 0] = np.nan
+    peer_projection = last_window_value[:, None] * peer_at_last  # (행, 3): 하한, 중앙, 상한
+
+    projection = np.where(has_history, _mean_over_years(yearly), peer_projection[:, 1])
+    # 과거추이 구간: 같은 전형구분·같은 마지막 체크포인트 행들의 과거 연도 백테스트 잔차 분위수
+    residual_groups = np.char.add(groups, last_checkpoint.astype(str))
+    residual_band = np.exp(_group_quantiles(_backtest_log_residuals(window, history, finals), residual_groups))
+    low = np.where(has_history, projection * residual_band[:, 0], peer_projection[:, 0])
+    high = np.where(has_history, projection * residual_band[:, 1], peer_projection[:, 2])
+
+    # 예측 근거는 아래 하한 보정 전에 정한다 (체크포인트 구간 밖이라 예측하지 못한 행을 현재 값으로 채우지 않음)
+    predicted = ~np.isnan(projection)
+    basis = np.where(has_history, '과거추이', np.where(predicted, '유사전형', ''))
+
+    # 경쟁률은 줄지 않으므로 예측한 행은 마지막 관측값 아래로 내리지 않는다
+    _, last_observed = _last_valid(df[rate_columns].to_numpy(dtype=float))
+    projection = np.where(predicted, np.fmax(projection, last_observed), np.nan)
+    low = np.where(predicted, np.fmax(low, last_observed), np.nan)
+    high = np.where(predicted, np.fmax(high, projection), np.nan)
+
+    is_closed = ~np.isnan(closed)
+    projection[is_closed] = low[is_closed] = high[is_closed] = closed[is_closed]
+    basis[is_closed] = '마감'
+
+    return pd.DataFrame({
+        PROJECTION_COLUMN: projection.round(2),
+        PROJECTION_LOW_COLUMN: np.fmin(low, projection).round(2),
+        PROJECTION_HIGH_COLUMN: high.round(2),
+        PROJECTION_BASIS_COLUMN: basis,
+    }, index=df.index)
+
+
+def add_projection_columns(df, deadlines=None):
+    return pd.concat([df.drop(columns=PROJECTION_COLUMNS, errors='ignore'), project_final_rates(df, deadlines)],
+                     axis=1)
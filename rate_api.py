@@ -0,0 +1,331 @@
+import argparse
+import gzip
+import json
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import numpy as np
+
+from column_schema import rate_values
+from data_store import APPLICANT_PREFIX, RATE_PREFIX, STORE_DIR, load_store, snapshot_columns, snapshot_label
+from projection import PROJECTION_COLUMN, PROJECTION_HIGH_COLUMN, PROJECTION_LOW_COLUMN
+from shared_dataset import SharedDataset
+
+# 경쟁률 조회 API (로컬 HTTP/JSON). 값은 페이지와 같은 SharedDataset 에서 꺼낸다.
+# 응답은 (데이터 버전, 경로) 로 한 번만 만든다. ETag 는 "정적 버전-데이터 버전", gzip 은 Accept-Encoding 을 따른다.
+# 경로 조각(대학명 / 전형명_key / 모집단위)은 하나씩 URL 인코딩한다.
+#     GET /api/meta                                  버전, 스냅샷 목록
+#     GET /api/universities                          대학별 전형명_key 목록
+#     GET /api/series/<대학>[/<전형>[/<모집단위>]]     스냅샷별 경쟁률 추이
+#     GET /api/latest/<대학>[/<전형>[/<모집단위>]]     최신 스냅샷의 모집단위별 값과 예상 최종 경쟁률
+#
+#     python rate_api.py --port 8600
+#     SUSI_API_PORT=8600 python startup.py --server.port 8501
+
+API_PREFIX = '/api'
+API_THREAD = 'rate-api'
+# 버전 확인(저장소 manifest stat, 데이터셋 캐시 조회) 간격. 폴링이 몰려도 요청마다 하지 않는다
+REFRESH_INTERVAL_SECONDS = 1.0
+RESPONSE_CACHE_SIZE = 4096
+# 이보다 작은 본문은 압축하지 않는다
+GZIP_MIN_BYTES = 512
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_values(values):
+    # NaN -> null, float32 꼬리 자릿수 없이
+    return [None if np.isnan(value) else value for value in np.asarray(values, dtype=float).tolist()]
+
+
+def _json_value(value):
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+class RateSeries:
+    # 데이터셋 하나(버전 하나)의 API 응답을 만든다
+    def __init__(self, dataset):
+        df = dataset.df
+        self.dataset = dataset
+        self.index = dataset.index
+        self.etag = f'"{dataset.static_version}-{dataset.version}"'
+        rate_columns = snapshot_columns(df, RATE_PREFIX)
+        self.snapshots = [snapshot_label(col) for col in rate_columns]
+        self.rates = rate_values(df[rate_columns])
+        self.applicants = df[[APPLICANT_PREFIX + label for label in self.snapshots]].to_numpy(dtype=float, na_value=np.nan)
+        self.recruits = df['모집인원'].to_numpy(dtype=float, na_value=np.nan)
+        self.projections = rate_values(df[[PROJECTION_COLUMN, PROJECTION_LOW_COLUMN, PROJECTION_HIGH_COLUMN]]) \
+            if PROJECTION_COLUMN in df.columns else np.full((len(df), 3), np.nan)
+        self.admission_keys = df['전형명_key'].astype(str).to_numpy()
+        self.majors = df['모집단위'].astype(str).to_numpy()
+
+    def meta(self):
+        return {'version': self.dataset.version, 'static_version': self.dataset.static_version,
+                'snapshots': self.snapshots, 'latest': self.snapshots[-1] if self.snapshots else None,
+                'universities': len(self.dataset.universities)}
+
+    def universities(self):
+        return {'universities': [{'university': univ, 'admissions': self.index.admission_keys(univ)}
+                                 for univ in self.dataset.universities]}
+
+    def _rows(self, key):
+        rows = self.index.rows(*key)
+        if not len(rows):
+            raise ApiError(404, f"없는 항목: {' / '.join(key)}")
+        return rows
+
+    def _key_fields(self, key):
+        return dict(zip(['university', 'admission', 'major'], key))
+
+    def series(self, key):
+        rows = self._rows(key)
+        rates, applicants = self.rates[rows], self.applicants[rows]
+        with warnings.catch_warnings():
+            # 값이 하나도 없는 스냅샷은 null
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean_rate = np.round(np.nanmean(rates, axis=0), 2)
+        total_applicants = np.where(np.isnan(applicants).all(axis=0), np.nan, np.nansum(applicants, axis=0))
+        result = self._key_fields(key)
+        result.update({
+            'snapshots': self.snapshots,
+            'units': len(rows),
+            'recruits': _json_value(np.nansum(self.recruits[rows])),
+            'rate': _json_values(mean_rate),
+            'applicants': _json_values(total_applicants),
+        })
+        if len(key) < 3:
+            result['children'] = (self.index.admission_keys(key[0]) if len(key) == 1
+                                  else self.index.majors(*key))
+        return result
+
+    def latest(self, key):
+        rows = self._rows(key)
+        result = self._key_fields(key)
+        result['snapshot'] = self.snapshots[-1] if self.snapshots else None
+        if not self.snapshots:
+            result['units'] = []
+            return result
+        rates = self.rates[rows]
+        previous = rates[:, -2] if rates.shape[1] > 1 else np.full(len(rows), np.nan)
+        columns = zip(self.admission_keys[rows].tolist(), self.majors[rows].tolist(),
+                      _json_values(self.recruits[rows]), _json_values(rates[:, -1]), _json_values(previous),
+                      _json_values(self.applicants[rows, -1]), *(_json_values(column) for column in self.projections[rows].T))
+        result['units'] = [
+            {'admission': admission, 'major': major, 'recruits': recruits, 'rate': rate, 'previous_rate': previous_rate,
+             'applicants': applicants, 'projected_final': projected, 'projected_low': low, 'projected_high': high}
+            for admission, major, recruits, rate, previous_rate, applicants, projected, low, high in columns]
+        return result
+
+    def route(self, path):
+        # 경로 -> 응답 dict
+        parts = [unquote(part) for part in urlsplit(path).path.split('/') if part]
+        if parts[:1] != [API_PREFIX.strip('/')]:
+            raise ApiError(404, "없는 경로")
+        endpoint, key = parts[1:2], tuple(parts[2:])
+        if endpoint == ['meta'] and not key:
+            return self.meta()
+        if endpoint == ['universities'] and not key:
+            return self.universities()
+        if endpoint == ['series'] and 1 <= len(key) <= 3:
+            return self.series(key)
+        if endpoint == ['latest'] and 1 <= len(key) <= 3:
+            return self.latest(key)
+        raise ApiError(404, "없는 경로")
+
+
+class StoreDatasets:
+    # 따로 띄울 때의 데이터 공급: 저장소를 직접 읽고 버전이 바뀌면 데이터셋을 새로 만든다
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self.store = load_store(store_dir)
+        self._dataset = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        self.store.refresh(self.store_dir)
+
+    def dataset(self):
+        with self._lock:
+            state = self.store.state
+            if self._dataset is None or self._dataset.version != state.version \
+                    or self._dataset.static_version != state.static_version:
+                self._dataset = SharedDataset.from_store(self.store)
+            return self._dataset
+
+
+class StreamlitDatasets:
+    # Streamlit 서버 안에서 띄울 때: 페이지와 같은 캐시 함수로 저장소와 데이터셋을 받는다
+    def __init__(self):
+        from app_resources import get_store, load_data
+        self._get_store = get_store
+        self._load_data = load_data
+
+    def refresh(self):
+        self._get_store().refresh()
+
+    def dataset(self):
+        store = self._get_store()
+        # app.py 와 같은 인자 (as_of=None 까지) 라야 같은 캐시 항목을 쓴다
+        return self._load_data(store, store.version, None)
+
+
+class RateApi:
+    # 버전별 RateSeries 와 (버전, 경로) 응답 캐시
+    def __init__(self, datasets, refresh_interval=REFRESH_INTERVAL_SECONDS, cache_size=RESPONSE_CACHE_SIZE):
+        self.datasets = datasets
+        self.refresh_interval = refresh_interval
+        self.cache_size = cache_size
+        self._series = None
+        self._responses = OrderedDict()  # 경로 -> (status, 본문, gzip 본문)
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def current(self):
+        # 저장소 버전은 refresh_interval 마다 한 번만 확인하고, 그 사이에는 지금의 RateSeries 를 그대로 쓴다
+        now = time.monotonic()
+        series = self._series
+        if series is not None and now - self._checked < self.refresh_interval:
+            return series
+        with self._lock:
+            if self._series is None or now - self._checked >= self.refresh_interval:
+                self._checked = now
+                self.datasets.refresh()
+                dataset = self.datasets.dataset()
+                if self._series is None or self._series.dataset is not dataset:
+                    self._series = RateSeries(dataset)
+                    self._responses.clear()
+            return self._series
+
+    def response(self, path):
+        # (status, ETag, 본문, gzip 본문)
+        series = self.current()
+        with self._lock:
+            cached = self._responses.get(path) if self._series is series else None
+            if cached is not None:
+                self._responses.move_to_end(path)
+                return (*cached[:1], series.etag, *cached[1:])
+        try:
+            status, payload = 200, series.route(path)
+        except ApiError as e:
+            status, payload = e.status, {'error': str(e)}
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        compressed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+        with self._lock:
+            if self._series is series:
+                self._responses[path] = (status, body, compressed)
+                while len(self._responses) > self.cache_size:
+                    self._responses.popitem(last=False)
+        return status, series.etag, body, compressed
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 기본값(5)이면 동시에 몰린 연결이 listen 큐에서 넘쳐 SYN 재전송(1s, 3s, ...) 만큼 늦어진다
+    request_queue_size = 256
+
+    def process_request(self, request, client_address):
+        # 요청 스레드에 이름을 붙인다 (startup 이 이 스레드의 Streamlit 캐시 경고를 끈다)
+        thread = threading.Thread(target=self.process_request_thread, args=(request, client_address),
+                                  name=API_THREAD, daemon=True)
+        thread.start()
+
+
+def _etag_matches(header, etag):
+    return header is not None and (header.strip() == '*' or etag in [tag.strip() for tag in header.split(',')])
+
+
+class RateApiServer:
+    def __init__(self, api, host='127.0.0.1', port=0):
+        self.api = api
+        self._server = _ThreadingServer((host, port), self._handler_class())
+        self._thread = None
+
+    def _handler_class(self):
+        api = self.api
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                try:
+                    status, etag, body, compressed = api.response(self.path)
+                except Exception as e:
+                    status, etag, compressed = 500, None, None
+                    body = json.dumps({'error': repr(e)}, ensure_ascii=False).encode('utf-8')
+
+                if status == 200 and _etag_matches(self.headers.get('If-None-Match'), etag):
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                use_gzip = compressed is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+                payload = compressed if use_gzip else body
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.send_header('Vary', 'Accept-Encoding')
+                if status == 200:
+                    # 캐시해도 되지만 매번 ETag 로 확인하게 한다 (새 스냅샷은 언제든 들어올 수 있음)
+                    self.send_header('ETag', etag)
+                    self.send_header('Cache-Control', 'no-cache')
+                if use_gzip:
+                    self.send_header('Content-Encoding', 'gzip')
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=API_THREAD, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경쟁률 조회 API (로컬 HTTP/JSON)")
+    parser.add_argument('--store', default=STORE_DIR)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    args = parser.parse_args()
+
+    server = RateApiServer(RateApi(StoreDatasets(args.store)), args.host, args.port)
+    print(f"{server.url}{API_PREFIX} 에서 경쟁률 API 제공 중")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
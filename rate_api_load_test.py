@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from urllib.parse import quote
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from rate_api import API_PREFIX, RateApi, RateApiServer, StoreDatasets
+
+# 경쟁률 API 부하 시험
+# 클라이언트마다 경로 watch 개를 골라 bursts 번 동시에 요청하고, 받은 ETag 는 다음 요청에 If-None-Match 로 보낸다.
+# 단계별 지연 시간 분위수, 처리량, 상태 코드, 받은 바이트를 표로 출력한다.
+#
+#     python rate_api_load_test.py                           # 저장소로 서버를 같은 프로세스에 띄워 시험
+#     python rate_api_load_test.py --url http://127.0.0.1:8600 --clients 200 --bursts 20
+
+DEFAULT_CLIENTS = 100
+DEFAULT_BURSTS = 10
+DEFAULT_PATHS = 200
+DEFAULT_WATCH = 3
+
+
+async def fetch_json(session, url):
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+async def sample_paths(session, base_url, n_paths, seed=0):
+    # 대학 / 전형 / 모집단위 경로를 고르게 섞어 고른다
+    rng = random.Random(seed)
+    universities = (await fetch_json(session, f"{base_url}{API_PREFIX}/universities"))['universities']
+    paths = [f"{API_PREFIX}/meta"]
+    while len(paths) < n_paths:
+        entry = rng.choice(universities)
+        key = [entry['university']]
+        depth = rng.randint(1, 3)
+        if depth >= 2 and entry['admissions']:
+            key.append(rng.choice(entry['admissions']))
+            if depth == 3:
+                series = await fetch_json(session, f"{base_url}{API_PREFIX}/series/" + '/'.join(quote(part, safe='') for part in key))
+                if series.get('children'):
+                    key.append(rng.choice(series['children']))
+        endpoint = rng.choice(['series', 'latest'])
+        paths.append(f"{API_PREFIX}/{endpoint}/" + '/'.join(quote(part, safe='') for part in key))
+    return paths
+
+
+async def client(session, base_url, paths, watch, bursts, start_events, records, rng):
+    etags = {}
+    watched = rng.sample(paths, min(watch, len(paths)))
+    for burst in range(bursts):
+        await start_events[burst].wait()
+        path = watched[burst % len(watched)]
+        headers = {'If-None-Match': etags[path]} if path in etags else {}
+        phase = 'ETag 재요청' if path in etags else '첫 요청'
+        start = time.perf_counter()
+        try:
+            async with session.get(base_url + path, headers=headers) as response:
+                body = await response.read()
+                status = response.status
+                if 'ETag' in response.headers:
+                    etags[path] = response.headers['ETag']
+                size = int(response.headers.get('Content-Length', len(body)))
+        except aiohttp.ClientError as e:
+            status, size = type(e).__name__, 0
+        records.append((phase, status, time.perf_counter() - start, size))
+
+
+async def run_load_test(base_url, clients=DEFAULT_CLIENTS, bursts=DEFAULT_BURSTS, n_paths=DEFAULT_PATHS,
+                        watch=DEFAULT_WATCH, interval=0.0, gzip=True, seed=0):
+    headers = {'Accept-Encoding': 'gzip' if gzip else 'identity'}
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector, headers=headers, auto_decompress=True) as session:
+        paths = await sample_paths(session, base_url, n_paths, seed)
+        start_events = [asyncio.Event() for _ in range(bursts)]
+        records = []
+        tasks = [asyncio.create_task(client(session, base_url, paths, watch, bursts, start_events, records,
+                                            random.Random(seed + i)))
+                 for i in range(clients)]
+        start = time.perf_counter()
+        for event in start_events:
+            # 한 번의 burst: 모든 클라이언트가 동시에 요청하고, 다 끝나면 다음 burst
+            done = len(records) + clients
+            event.set()
+            while len(records) < done:
+                await asyncio.sleep(0.001)
+            if interval:
+                await asyncio.sleep(interval)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return summarize(records, elapsed)
+
+
+def summarize(records, elapsed):
+    frame = pd.DataFrame(records, columns=['단계', '상태', '초', '바이트'])
+    rows = []
+    for phase, group in [('전체', frame)] + list(frame.groupby('단계', sort=False)):
+        latency = group['초'].to_numpy() * 1000
+        rows.append({
+            '단계': phase,
+            '요청': len(group),
+            'p50(ms)': round(float(np.percentile(latency, 50)), 2),
+            'p95(ms)': round(float(np.percentile(latency, 95)), 2),
+            'p99(ms)': round(float(np.percentile(latency, 99)), 2),
+            '최대(ms)': round(float(latency.max()), 2),
+            '상태': ', '.join(f"{status}:{count}" for status, count in sorted(Counter(group['상태'].astype(str)).items())),
+            '받은 KB': round(group['바이트'].sum() / 1024, 1),
+        })
+    table = pd.DataFrame(rows).set_index('단계')
+    table.attrs['throughput'] = len(frame) / elapsed if elapsed else float('nan')
+    table.attrs['elapsed'] = elapsed
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경쟁률 API 부하 시험 (동시 폴링 burst)")
+    parser.add_argument('--url', help="시험할 API 서버 (없으면 저장소로 이 프로세스에 서버를 띄움)")
+    parser.add_argument('--store', default='store')
+    parser.add_argument('--clients', type=int, default=DEFAULT_CLIENTS, help="동시 클라이언트 수")
+    parser.add_argument('--bursts', type=int, default=DEFAULT_BURSTS, help="클라이언트마다 보내는 요청 수 (동시 burst 횟수)")
+    parser.add_argument('--paths', type=int, default=DEFAULT_PATHS, help="무작위로 고를 경로 수")
+    parser.add_argument('--watch', type=int, default=DEFAULT_WATCH, help="클라이언트마다 번갈아 폴링할 경로 수")
+    parser.add_argument('--interval', type=float, default=0.0, help="burst 사이 간격 (초)")
+    parser.add_argument('--no-gzip', action='store_true', help="gzip 없이 요청")
+    args = parser.parse_args()
+
+    def run(base_url):
+        return asyncio.run(run_load_test(base_url, args.clients, args.bursts, args.paths, args.watch, args.interval,
+                                         gzip=not args.no_gzip))
+
+    if args.url:
+        table = run(args.url.rstrip('/'))
+    else:
+        with RateApiServer(RateApi(StoreDatasets(args.store))) as server:
+            table = run(server.url)
+    print(table.to_string())
+    print(f"처리량 {table.attrs['throughput']:.0f} 요청/s ({table.attrs['elapsed']:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
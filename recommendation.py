@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from column_schema import rate_threshold
+from data_store import RATE_PREFIX, snapshot_columns
+from projection import PROJECTION_BASIS_COLUMN, PROJECTION_COLUMN
+
+# 안정 지원 추천 검색
+# 로드 시 한 번 신호별 백분위 점수(0~1, 클수록 안정)와 경쟁률 정렬 순서, 필터별 boolean 마스크를 만들어 두고,
+# 질의는 정렬된 경쟁률에서 searchsorted 로 상한 이하 후보만 잘라낸 뒤 마스크와 가중합 점수로 top-k 를 고른다.
+# 슬라이더를 움직일 때마다 전체 행을 다시 훑거나 대학별로 다시 그리지 않는다.
+
+SIGNALS = ['최신 경쟁률', '예상 최종', '3개년평균', '모집인원']
+DEFAULT_WEIGHTS = {'최신 경쟁률': 1.0, '예상 최종': 2.0, '3개년평균': 1.0, '모집인원': 0.5}
+# 값이 없는 신호(예: 신설 모집단위의 3개년평균)는 중간 점수로 본다
+NEUTRAL_SCORE = 0.5
+
+
+class RecommendationIndex:
+    def __init__(self, df):
+        self.df = df
+        latest_column = snapshot_columns(df, RATE_PREFIX)[-1]
+        self.latest_column = latest_column
+        latest = df[latest_column].to_numpy(dtype=float)
+        projected = df[PROJECTION_COLUMN].to_numpy(dtype=float) if PROJECTION_COLUMN in df.columns else latest
+
+        # 신호별 점수 (행 × 신호). 경쟁률 계열은 낮을수록, 모집인원은 많을수록 안정
+        columns = {
+            '최신 경쟁률': 1 - pd.Series(latest).rank(pct=True),
+            '예상 최종': 1 - pd.Series(projected).rank(pct=True),
+            '3개년평균': 1 - pd.to_numeric(df['3개년평균'], errors='coerce').reset_index(drop=True).rank(pct=True),
+            '모집인원': pd.to_numeric(df['모집인원'], errors='coerce').reset_index(drop=True).rank(pct=True),
+        }
+        self.scores = np.column_stack([columns[signal].fillna(NEUTRAL_SCORE).to_numpy() for signal in SIGNALS])
+
+        # 상한 질의용 정렬 (NaN 은 맨 뒤)
+        self.latest = latest
+        self.projected = projected
+        self._latest_order = np.argsort(latest, kind='stable')
+        self._latest_sorted = latest[self._latest_order]
+        self.recruits = pd.to_numeric(df['모집인원'], errors='coerce').to_numpy(dtype=float)
+
+        # 필터 마스크
+        self.series_masks = {value: (df['계열'] == value).to_numpy() for value in df['계열'].dropna().unique()}
+        self.track_masks = {value: (df['전형구분'] == value).to_numpy() for value in df['전형구분'].dropna().unique()}
+        self.recommended_mask = (df['추천전형'] == 1).to_numpy()
+        basis = df[PROJECTION_BASIS_COLUMN] if PROJECTION_BASIS_COLUMN in df.columns else pd.Series('', index=df.index)
+        self.closed_mask = (basis == '마감').to_numpy()
+
+    def tracks(self):
+        return sorted(self.track_masks)
+
+    def query(self, weights=None, max_latest=None, max_projected=None, min_recruits=None, series=None,
+              tracks=None, only_recommended=False, exclude_closed=True, k=50):
+        # 조건을 만족하는 행 중 가중 안정도 점수 상위 k 개의 (행 위치, 점수)
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        w = np.array([weights.get(signal, 0.0) for signal in SIGNALS], dtype=float)
+
+        if max_latest is None:
+            candidates = self._latest_order[:np.count_nonzero(~np.isnan(self._latest_sorted))]
+        else:
+            candidates = self._latest_order[:np.searchsorted(self._latest_sorted, rate_threshold(max_latest), side='right')]
+
+        keep = np.ones(len(candidates), dtype=bool)
+        if max_projected is not None:
+            keep &= self.projected[candidates] <= rate_threshold(max_projected)
+        if min_recruits:
+            keep &= self.recruits[candidates] >= min_recruits
+        if series:
+            keep &= self.series_masks.get(series, np.zeros(len(self.df), dtype=bool))[candidates]
+        if tracks:
+            track_mask = np.zeros(len(self.df), dtype=bool)
+            for track in tracks:
+                track_mask |= self.track_masks.get(track, False)
+            keep &= track_mask[candidates]
+        if only_recommended:
+            keep &= self.recommended_mask[candidates]
+        if exclude_closed:
+            keep &= ~self.closed_mask[candidates]
+        candidates = candidates[keep]
+
+        total = w.sum()
+        scores = self.scores[candidates] @ w / total if total > 0 else np.zeros(len(candidates))
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        order = np.lexsort((self.latest[candidates], -scores))
+        return candidates[order], scores[order]
@@ -0,0 +1,285 @@
+import argparse
+import base64
+import functools
+import html
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
+
+from data_store import RATE_PREFIX, snapshot_columns, snapshot_label
+from table_renderer import dataframe_to_html
+from university_analysis_model import (build_admission_trend_figure, build_top_bottom_tables,
+                                       get_emoji_for_admission, rate_table_formats)
+from university_detail_model import build_admission_grid_figure
+
+# 상담용 보고서 생성기
+# 선택한 대학/전형마다 섹션(추이 차트, TOP/LOW 5 표, 과거 연도 비교)을 순서대로 파일에 바로 쓴다.
+# 차트 이미지는 프로세스 풀에서 변환하고 (kaleido 가 없으면 plotly.js HTML), PDF 는 weasyprint 가 필요하다.
+
+REPORTS_DIR = 'reports'
+REPORT_FORMATS = ['HTML', 'PDF']
+REPORT_TTL_SECONDS = 24 * 60 * 60
+
+IMAGE_WIDTH = 1000
+IMAGE_DEFAULT_HEIGHT = 600
+MAX_PENDING_SECTIONS = 4
+# 과거 연도 비교 격자 차트 하나에 넣을 모집단위 수 (이미지가 너무 길어지지 않도록)
+GRID_MAJORS_PER_FIGURE = 20
+
+REPORT_STYLE = """
+    body { font-family: sans-serif; font-size: 0.8rem; margin: 2rem; }
+    .section { page-break-inside: avoid; margin-bottom: 2rem; }
+    .tables { display: flex; gap: 1rem; }
+    .tables > div { flex: 1; }
+    img { width: 100%; }
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def static_images_available():
+    # kaleido 가 설치되어 있어도 브라우저가 없으면 변환이 안 되므로 작은 차트로 한 번 시험해 본다
+    try:
+        pio.to_image(go.Figure(), format='png', width=10, height=10)
+    except Exception:
+        return False
+    return True
+
+
+def pdf_available():
+    try:
+        import weasyprint  # noqa: F401
+    except ImportError:
+        return False
+    return static_images_available()
+
+
+def render_image(fig_json, image_format='png'):
+    # 작업 프로세스에서 실행된다: Figure JSON -> base64 이미지
+    fig = pio.from_json(fig_json)
+    height = fig.layout.height or IMAGE_DEFAULT_HEIGHT
+    image = pio.to_image(fig, format=image_format, width=IMAGE_WIDTH, height=height)
+    return base64.b64encode(image).decode('ascii')
+
+
+def plan_sections(index, universities, admission_keys=None, majors=None):
+    # (대학명, 전형명_key, 모집단위 목록) 목록. admission_keys / majors 가 주어지면 그 전형 / 모집단위만 남긴다.
+    sections = []
+    for university in universities:
+        for admission_key in index.admission_keys(university):
+            if admission_keys is not None and admission_key not in admission_keys:
+                continue
+            section_majors = [major for major in index.majors(university, admission_key)
+                              if majors is None or major in majors]
+            if section_majors:
+                sections.append((university, admission_key, section_majors))
+    return sections
+
+
+def build_section(index, university, admission_key, majors, competition_rate_columns, include_past=True):
+    # 섹션 하나를 HTML 문자열과 Figure 가 섞인 조각 목록으로 만든다 (Figure 는 나중에 이미지로 바뀐다)
+    latest_competition_rate = competition_rate_columns[-1]
+    previous_competition_rate = competition_rate_columns[-2] if len(competition_rate_columns) > 1 else None
+    admission_data = index.slice(university, admission_key)
+    all_majors = len(majors) == len(index.majors(university, admission_key))
+    if not all_majors:
+        admission_data = admission_data[admission_data['모집단위'].isin(majors).to_numpy()]
+
+    parts = [f"<h3>{get_emoji_for_admission(admission_key)} {html.escape(university)} - "
+             f"{html.escape(admission_key)} 전형</h3>",
+             build_admission_trend_figure(index, university, admission_key, competition_rate_columns,
+                                          None if all_majors else majors)]
+
+    top_5_df, bottom_5_df = build_top_bottom_tables(admission_data, latest_competition_rate,
+                                                    previous_competition_rate)
+    parts.append("<div class='tables'>"
+                 f"<div>{dataframe_to_html(top_5_df, 'TOP 5', font_size='0.6rem', formats=rate_table_formats)}</div>"
+                 f"<div>{dataframe_to_html(bottom_5_df, 'LOW 5', font_size='0.6rem', formats=rate_table_formats)}</div>"
+                 "</div>")
+
+    if include_past:
+        parts.append("<h4>과거 연도 비교</h4>")
+        for start in range(0, len(majors), GRID_MAJORS_PER_FIGURE):
+            rows = admission_data['모집단위'].isin(majors[start:start + GRID_MAJORS_PER_FIGURE]).to_numpy()
+            parts.append(build_admission_grid_figure(admission_data[rows], admission_key, competition_rate_columns))
+    return parts
+
+
+def _figure_html(fig, image=None):
+    if image is not None:
+        return f"<img src='data:image/png;base64,{image}'>"
+    return pio.to_html(fig, include_plotlyjs=False, full_html=False)
+
+
+def _iter_rendered_sections(sections, pool):
+    # 섹션을 순서대로 돌려주되, 뒤따르는 몇 개 섹션의 차트는 미리 풀에 넘겨 두고 함께 변환한다
+    pending = deque()
+
+    def finish(parts, futures):
+        images = iter([future.result() for future in futures])
+        return "".join(part if isinstance(part, str) else _figure_html(part, next(images) if pool else None)
+                       for part in parts)
+
+    for parts in sections:
+        futures = [pool.submit(render_image, part.to_json()) for part in parts
+                   if not isinstance(part, str)] if pool else []
+        pending.append((parts, futures))
+        if len(pending) >= MAX_PENDING_SECTIONS:
+            yield finish(*pending.popleft())
+    while pending:
+        yield finish(*pending.popleft())
+
+
+def iter_report_html(index, universities, admission_keys=None, include_past=True, static_images=None,
+                     workers=None, data_version=None, progress=None, majors=None):
+    # 보고서 HTML 을 섹션 단위로 돌려준다. progress(완료 섹션 수, 전체 섹션 수) 가 주어지면 섹션마다 호출한다.
+    if static_images is None:
+        static_images = static_images_available()
+    competition_rate_columns = snapshot_columns(index.df, RATE_PREFIX)
+    plan = plan_sections(index, universities, admission_keys, majors)
+
+    head_script = ("" if static_images else
+                   f"<script src='https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js'></script>")
+    yield ("<!DOCTYPE html><html><head><meta charset='utf-8'><title>수시 경쟁률 보고서</title>"
+           f"<style>{REPORT_STYLE}</style>{head_script}</head><body>"
+           "<h1>수시 경쟁률 보고서</h1>"
+           f"<p>생성 시각 {datetime.now():%Y-%m-%d %H:%M} · 기준 스냅샷 "
+           f"{snapshot_label(competition_rate_columns[-1])} · 데이터 버전 {data_version}</p>")
+
+    sections = (build_section(index, university, admission_key, section_majors, competition_rate_columns, include_past)
+                for university, admission_key, section_majors in plan)
+    # Streamlit 서버처럼 스레드가 도는 프로세스에서 fork 하지 않도록 spawn 으로 작업 프로세스를 띄운다
+    pool = (ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            if static_images else None)
+    try:
+        current_university = None
+        for i, ((university, _, _), section_html) in enumerate(zip(plan, _iter_rendered_sections(sections, pool))):
+            if university != current_university:
+                current_university = university
+                yield f"<h2>{html.escape(university)}</h2>"
+            yield f"<div class='section'>{section_html}</div>"
+            if progress:
+                progress(i + 1, len(plan))
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    yield "</body></html>"
+
+
+def write_report(path, chunks, report_format='HTML'):
+    # 조각을 받는 대로 파일에 쓴다. PDF 는 HTML 을 먼저 쓴 뒤 변환한다.
+    html_path = path if report_format == 'HTML' else os.path.splitext(path)[0] + '.html'
+    with open(html_path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            f.flush()
+
+    if report_format == 'PDF':
+        import weasyprint
+        weasyprint.HTML(filename=html_path).write_pdf(path)
+        os.remove(html_path)
+    return path
+
+
+def remove_old_reports(reports_dir=REPORTS_DIR, ttl_seconds=REPORT_TTL_SECONDS):
+    if not os.path.isdir(reports_dir):
+        return
+    now = time.time()
+    for name in os.listdir(reports_dir):
+        path = os.path.join(reports_dir, name)
+        if now - os.path.getmtime(path) > ttl_seconds:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ReportJob:
+    # 백그라운드 스레드에서 보고서를 만든다. 화면은 done/total/finished 만 읽어서 진행 상황을 보여 준다.
+    def __init__(self, index, universities, admission_keys=None, include_past=True, report_format='HTML',
+                 data_version=None, reports_dir=REPORTS_DIR, majors=None):
+        os.makedirs(reports_dir, exist_ok=True)
+        remove_old_reports(reports_dir)
+        extension = 'pdf' if report_format == 'PDF' else 'html'
+        self.path = os.path.join(reports_dir, f"report_{datetime.now():%Y%m%d_%H%M%S_%f}.{extension}")
+        self.report_format = report_format
+        self.total = len(plan_sections(index, universities, admission_keys, majors))
+        self.done = 0
+        self.error = None
+        self.finished = False
+        self._data = None
+        self._args = (index, universities, admission_keys, include_past, majors)
+        self._data_version = data_version
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _progress(self, done, total):
+        self.done = done
+
+    def _run(self):
+        index, universities, admission_keys, include_past, majors = self._args
+        try:
+            chunks = iter_report_html(index, universities, admission_keys, include_past,
+                                      static_images=True if self.report_format == 'PDF' else None,
+                                      data_version=self._data_version, progress=self._progress, majors=majors)
+            write_report(self.path, chunks, self.report_format)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 1.0
+
+    def data(self):
+        # 다 만든 보고서 파일 내용 (다운로드 버튼용, 파일은 한 번만 읽는다)
+        if self._data is None:
+            with open(self.path, 'rb') as f:
+                self._data = f.read()
+        return self._data
+
+
+def main():
+    from data_store import load_store
+    from shared_dataset import SharedDataset
+
+    parser = argparse.ArgumentParser(description="수시 경쟁률 보고서 생성")
+    parser.add_argument('output', help="출력 파일 (.html 또는 .pdf)")
+    parser.add_argument('--university', action='append', help="대상 대학 (여러 번 지정 가능, 생략하면 전체)")
+    parser.add_argument('--admission', action='append', help="대상 전형명_key (여러 번 지정 가능)")
+    parser.add_argument('--major', action='append', help="대상 모집단위 (여러 번 지정 가능)")
+    parser.add_argument('--no-past', action='store_true', help="과거 연도 비교 차트 제외")
+    parser.add_argument('--workers', type=int, default=None, help="이미지 변환 프로세스 수")
+    args = parser.parse_args()
+
+    store = load_store()
+    index = SharedDataset.from_store(store).index
+    universities = args.university or index.universities()
+    report_format = 'PDF' if args.output.lower().endswith('.pdf') else 'HTML'
+    total = len(plan_sections(index, universities, args.admission, args.major))
+    started = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} 섹션", end='', flush=True)
+
+    chunks = iter_report_html(index, universities, args.admission, not args.no_past,
+                              static_images=True if report_format == 'PDF' else None, workers=args.workers,
+                              data_version=store.version, progress=progress, majors=args.major)
+    write_report(args.output, chunks, report_format)
+    print(f"\n{args.output}: {total} 섹션, {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import os
+
+import streamlit as st
+
+from report_generator import REPORT_FORMATS, ReportJob, pdf_available, plan_sections, static_images_available
+
+
+@st.fragment(run_every=1)
+def poll_report_progress():
+    # 작업이 도는 동안에만 불린다. 진행 상황만 주기적으로 다시 그리고 (페이지 전체를 다시 실행하지 않음),
+    # 끝나면 앱을 한 번 다시 실행해 폴링을 멈추고 결과를 그린다
+    job = st.session_state.get('report_job')
+    if job is None or job.finished:
+        st.rerun()
+    st.progress(job.fraction, text=f"보고서 생성 중... {job.done}/{job.total} 섹션")
+
+
+def show_report_result(job):
+    if job.error is not None:
+        st.error(f"보고서 생성 실패: {job.error}")
+        return
+    mime = 'application/pdf' if job.report_format == 'PDF' else 'text/html'
+    st.download_button("보고서 다운로드", job.data(), file_name=os.path.basename(job.path), mime=mime,
+                       key="report_download_button")
+
+
+def report_generation(df, index, data_version):
+    st.header("보고서 생성")
+
+    universities = index.universities()
+    selected_universities = st.multiselect("대상 학교 선택 (복수 선택 가능)", universities,
+                                           key="report_universities_multiselect")
+
+    admission_options = list(dict.fromkeys(key for univ in selected_universities
+                                           for key in index.admission_keys(univ)))
+    selected_admissions = st.multiselect("대상 전형 (비워 두면 전체)", admission_options,
+                                         key="report_admissions_multiselect")
+
+    major_options = list(dict.fromkeys(major for univ in selected_universities
+                                       for key in index.admission_keys(univ)
+                                       if not selected_admissions or key in selected_admissions
+                                       for major in index.majors(univ, key)))
+    selected_majors = st.multiselect("대상 모집단위 (비워 두면 전체)", major_options,
+                                     key="report_majors_multiselect")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        formats = REPORT_FORMATS if pdf_available() else REPORT_FORMATS[:1]
+        report_format = st.radio("형식", formats, horizontal=True, key="report_format_radio")
+    with col2:
+        include_past = st.checkbox("과거 연도 비교 차트 포함", value=True, key="report_include_past")
+
+    if not static_images_available():
+        st.caption("정적 이미지 변환(kaleido)이 설치되어 있지 않아 차트를 인터랙티브 HTML 로 넣습니다.")
+
+    job = st.session_state.get('report_job')
+    running = job is not None and not job.finished
+
+    if st.button("보고서 생성", key="report_generate_button", disabled=running):
+        if not selected_universities:
+            st.warning("최소 하나의 대학을 선택해주세요.")
+        else:
+            admission_keys = set(selected_admissions) or None
+            majors = set(selected_majors) or None
+            if not plan_sections(index, selected_universities, admission_keys, majors):
+                st.info("조건에 맞는 전형이 없습니다.")
+            else:
+                st.session_state['report_job'] = job = ReportJob(index, selected_universities, admission_keys,
+                                                                 include_past, report_format, data_version,
+                                                                 majors=majors).start()
+                running = True
+
+    if running:
+        poll_report_progress()
+    elif job is not None:
+        show_report_result(job)
@@ -0,0 +1,199 @@
+import argparse
+import difflib
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# 행 매칭: 새 스냅샷의 (대학명, 전형명_key, 모집단위) 를 저장소 row_id 에 맞춘다.
+# 순서: 매핑 표(row_mapping.csv) -> 원문 일치 -> 정규화 키 일치 -> 같은 대학·전형 블록 안의 유사 매칭
+# 유사 매칭은 FUZZY_THRESHOLD 이상, 2등과 FUZZY_MARGIN 이상 차이 날 때만 받고 매핑 표에 남긴다.
+
+MAPPING_FILE = 'row_mapping.csv'
+FUZZY_THRESHOLD = 0.8
+FUZZY_MARGIN = 0.05
+# 한쪽 이름이 다른 쪽에 통째로 들어 있으면 ('지역균형' ⊂ '학생부교과(지역균형전형)') 이 점수로 본다
+CONTAINMENT_SCORE = 0.9
+
+MAPPING = 'mapping'
+EXACT = 'exact'
+CANONICAL = 'canonical'
+FUZZY = 'fuzzy'
+AMBIGUOUS = 'ambiguous'
+UNMATCHED = 'unmatched'
+
+_BRACKETS = str.maketrans('[{<〈《「『【', '((((((((', )
+_CLOSING = str.maketrans(']}>〉》」』】', '))))))))')
+_NOISE = re.compile(r'[\s·ㆍ•\-_/,.:;\'"]+')
+_INNER = re.compile(r'\(([^()]+)\)')
+
+
+def canonical(text):
+    # '컴퓨터  AI학부' / '컴퓨터AI학부' / '컴퓨터·AI 학부' -> '컴퓨터ai학부'
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return ''
+    text = unicodedata.normalize('NFKC', str(text)).lower()
+    return _NOISE.sub('', text.translate(_BRACKETS).translate(_CLOSING))
+
+
+def similarity(a, b):
+    if not a or not b:
+        return 0.0
+    if a in b or b in a:
+        return max(CONTAINMENT_SCORE, difflib.SequenceMatcher(None, a, b).ratio())
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def admission_similarity(a, b):
+    # 전형명은 '학생부교과(교과성적우수자전형)' 처럼 바깥 분류로 감싸인 경우가 많아 괄호 안쪽 이름도 비교한다
+    variants = [a] + _INNER.findall(a)
+    variants += [v[:-2] for v in variants if v.endswith('전형')]
+    return max(similarity(v, b) for v in variants)
+
+
+def best_match(name, candidates, score=similarity):
+    # candidates: [(정규화 이름, 값)] -> (값, 점수, 방법). 기준 미달이나 애매하면 값은 None
+    scored = sorted(((score(name, candidate), value) for candidate, value in candidates),
+                    key=lambda item: item[0], reverse=True)
+    if not scored or scored[0][0] < FUZZY_THRESHOLD:
+        return None, (scored[0][0] if scored else 0.0), UNMATCHED
+    if len(scored) > 1 and scored[0][0] - scored[1][0] < FUZZY_MARGIN and scored[0][1] != scored[1][1]:
+        return None, scored[0][0], AMBIGUOUS
+    return scored[0][1], scored[0][0], FUZZY
+
+
+class RowMatcher:
+    def __init__(self, keys, key_columns, mapping=None):
+        # keys: 저장소 행의 키 컬럼 (index = row_id), key_columns: [대학, 전형, 모집단위] 컬럼 이름
+        self.key_columns = list(key_columns)
+        raw = keys[self.key_columns].astype(str)
+        canon = raw.map(canonical)
+        row_ids = keys.index.to_numpy()
+
+        self._exact = dict(zip(map(tuple, raw.to_numpy()), row_ids))
+        self._canonical = {}
+        self._blocks = {}
+        self._admissions = {}
+        for (u, a, m), row_id in zip(map(tuple, canon.to_numpy()), row_ids):
+            self._canonical.setdefault((u, a, m), row_id)
+            self._blocks.setdefault((u, a), []).append((m, row_id))
+            self._admissions.setdefault(u, {})[a] = a
+        self.mapping = dict(mapping or {})
+
+    def match_one(self, key):
+        # 키 하나 -> (row_id 또는 None, 방법, 점수)
+        key = tuple(str(part) for part in key)
+        if key in self.mapping:
+            return self.mapping[key], MAPPING, 1.0
+        if key in self._exact:
+            return self._exact[key], EXACT, 1.0
+
+        u, a, m = (canonical(part) for part in key)
+        if (u, a, m) in self._canonical:
+            return self._canonical[(u, a, m)], CANONICAL, 1.0
+
+        failure = (None, UNMATCHED, 0.0)
+        if (u, a) in self._blocks:
+            row_id, score, method = best_match(m, self._blocks[(u, a)])
+            if row_id is not None:
+                return row_id, method, round(score, 3)
+            failure = (None, method, round(score, 3))
+
+        # 전형 블록이 없거나 그 안에 없으면, 이름이 비슷한 같은 대학 전형 블록들에서 모집단위를 찾는다
+        # (같은 전형명이 여러 전형명_key 로 나뉘어 있는 경우)
+        siblings = [(other, self._canonical[(u, other, m)]) for other in self._admissions.get(u, {})
+                    if other != a and (u, other, m) in self._canonical]
+        if siblings:
+            row_id, score, method = best_match(a, siblings, admission_similarity)
+            if row_id is not None or method == AMBIGUOUS:
+                return row_id, method, round(score, 3)
+        if (u, a) in self._blocks:
+            return failure
+
+        # 전형 블록이 없으면 가장 비슷한 전형 블록 안에서 모집단위를 유사 매칭한다
+        other, admission_score, method = best_match(a, self._admissions.get(u, {}).items(), admission_similarity)
+        if other is None:
+            return None, method, round(admission_score, 3)
+        row_id, score, method = best_match(m, self._blocks[(u, other)])
+        return row_id, method, round(min(score, admission_score), 3)
+
+    def match(self, incoming):
+        # incoming 의 키 컬럼 -> DataFrame(row_id, method, score), incoming 과 같은 index
+        results = [self.match_one(key) for key in incoming[self.key_columns].itertuples(index=False, name=None)]
+        row_id, method, score = zip(*results) if results else ((), (), ())
+        return pd.DataFrame({
+            'row_id': pd.array([np.nan if r is None else r for r in row_id], dtype='Int64'),
+            'method': list(method),
+            'score': list(score),
+        }, index=incoming.index)
+
+
+def mapping_path(store_dir):
+    return os.path.join(store_dir, MAPPING_FILE)
+
+
+def load_mapping(store_dir, key_columns, static_version=None):
+    # 저장된 매핑 (원문 키 -> row_id). 정적 속성이 다시 만들어져 row_id 가 바뀌었으면 쓰지 않는다.
+    path = mapping_path(store_dir)
+    if not os.path.exists(path):
+        return {}
+    table = pd.read_csv(path, dtype=str)
+    if static_version is not None and 'static_version' in table.columns:
+        table = table[table['static_version'] == str(static_version)]
+    return {tuple(key): int(row_id) for key, row_id in
+            zip(table[key_columns].to_numpy(), table['row_id'])}
+
+
+def save_mapping(store_dir, incoming, matches, key_columns, target_keys, static_version=None):
+    # 유사 매칭으로 새로 찾은 키를 매핑 표에 덧붙인다 (검토용으로 대상 행의 키와 점수도 남김)
+    found = matches['method'] == FUZZY
+    if not found.any():
+        return 0
+    rows = incoming.loc[found, key_columns].astype(str).reset_index(drop=True)
+    row_ids = matches.loc[found, 'row_id'].astype(int).to_numpy()
+    target = target_keys.loc[row_ids, key_columns].astype(str).reset_index(drop=True)
+    target.columns = [f'matched_{col}' for col in key_columns]
+    table = pd.concat([rows, target], axis=1)
+    table['row_id'] = row_ids
+    table['score'] = matches.loc[found, 'score'].to_numpy()
+    table['static_version'] = static_version
+    table = table.drop_duplicates(key_columns)
+
+    path = mapping_path(store_dir)
+    if os.path.exists(path):
+        existing = pd.read_csv(path, dtype=str)
+        table = pd.concat([existing, table.astype(str)], ignore_index=True).drop_duplicates(
+            key_columns + ['static_version'], keep='first')
+    table.to_csv(path, index=False, encoding='utf-8-sig')
+    return int(found.sum())
+
+
+def main():
+    from data_store import KEY_COLUMNS, STATIC_FILE, STORE_DIR, read_manifest
+
+    parser = argparse.ArgumentParser(description="스냅샷/과거 연도 표의 행을 저장소 행에 맞춰 본다 (저장하지 않음)")
+    parser.add_argument('incoming_csv', help="대학명, 전형명_key, 모집단위 컬럼이 있는 CSV")
+    parser.add_argument('--store', default=STORE_DIR)
+    args = parser.parse_args()
+
+    keys = pd.read_parquet(os.path.join(args.store, STATIC_FILE), columns=KEY_COLUMNS)
+    static_version = read_manifest(args.store).get('static_version')
+    matcher = RowMatcher(keys, KEY_COLUMNS, load_mapping(args.store, KEY_COLUMNS, static_version))
+    incoming = pd.read_csv(args.incoming_csv)
+    matches = matcher.match(incoming)
+    print(matches['method'].value_counts().to_string())
+    fuzzy = matches['method'] == FUZZY
+    if fuzzy.any():
+        report = incoming.loc[fuzzy, KEY_COLUMNS].copy()
+        report['→ 모집단위'] = keys.loc[matches.loc[fuzzy, 'row_id'].astype(int), '모집단위'].to_numpy()
+        report['score'] = matches.loc[fuzzy, 'score']
+        print(report.to_string(index=False))
+    failed = matches['method'].isin([UNMATCHED, AMBIGUOUS])
+    if failed.any():
+        print(incoming.loc[failed, KEY_COLUMNS].assign(사유=matches.loc[failed, 'method']).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from column_schema import VIEW_COUNT_DTYPE, compact, memory_report
+from data_index import DatasetIndex
+from projection import add_projection_columns
+
+# 프로세스 전체가 공유하는 읽기 전용 데이터셋
+# SharedDataset 과 그것으로 만든 뷰 모델(*View, GroupComparison, RateSeries)은 캐시되어 모든 세션이 같은 객체를 본다.
+# 만든 뒤에는 고치지 않고, 새 스냅샷이 들어오면 새 버전의 객체를 만든다 (copy-on-write 켬).
+# DatasetIndex 의 위치 배열은 정적 버전마다 한 번 만들어 스냅샷 버전끼리 공유한다.
+
+if int(pd.__version__.split('.')[0]) < 3:
+    # pandas 3 부터는 기본 동작
+    pd.set_option('mode.copy_on_write', True)
+
+# 이 시간 동안 재실행이 없으면 세션이 끝난 것으로 본다
+SESSION_TTL_SECONDS = 30 * 60
+
+# 정적 버전 -> (DatasetIndex, 대학 목록). 가장 최근 정적 버전 하나만 둔다
+_key_indexes = {}
+_key_indexes_lock = threading.Lock()
+
+
+def key_index(df, static_version):
+    # df 를 가리키는 DatasetIndex 와 대학 목록 (정적 버전이 같으면 위치 배열을 다시 만들지 않음)
+    if static_version is None:
+        index = DatasetIndex(df)
+        return index, index.universities()
+    with _key_indexes_lock:
+        cached = _key_indexes.get(static_version)
+        if cached is None:
+            index = DatasetIndex(df)
+            cached = (index, index.universities())
+            _key_indexes.clear()
+            _key_indexes[static_version] = cached
+    index, universities = cached
+    return (index if index.df is df else index.for_frame(df)), universities
+
+
+class SharedDataset:
+    def __init__(self, df, version, static_version=None, as_of=None):
+        self.df = df
+        self.version = version
+        self.static_version = static_version
+        # as_of: 이 스냅샷까지만 담은 과거 시점 데이터셋 (None 이면 최신)
+        self.as_of = as_of
+        self.index, self.universities = key_index(df, static_version)
+        self._memory_report = None
+
+    @classmethod
+    def from_store(cls, store, as_of=None):
+        # 예측 컬럼(예상최종(2025) 등)은 버전마다 새 스냅샷을 반영해 다시 계산한다.
+        # 과거 시점 데이터셋은 그 시점까지의 스냅샷만으로 예측하므로 이후 데이터가 섞이지 않는다.
+        # 예측 컬럼까지 붙인 뒤 column_schema 의 wide 뷰 dtype 으로 맞춘다 (예측값 float32, 예측근거 category).
+        # 저장소가 그 사이 갱신되어도 데이터와 버전이 같은 상태에서 나오도록 state 를 한 번만 읽는다
+        state = store.state
+        df = compact(add_projection_columns(state.to_wide(as_of)), VIEW_COUNT_DTYPE)
+        return cls(df, state.version, state.static_version, as_of)
+
+    @property
+    def cache_key(self):
+        # 페이지 캐시 키: 정적 버전 + 데이터 버전 + 기준 시점
+        # (저장소를 통째로 다시 만들어 version 이 처음부터 다시 세어져도 예전 캐시와 겹치지 않게 정적 버전을 넣는다)
+        key = f"{self.static_version}-{self.version}"
+        return key if self.as_of is None else f"{key}@{self.as_of}"
+
+    def memory_bytes(self):
+        return int(self.df.memory_usage(deep=True).sum()) + self.index.nbytes()
+
+    def memory_report(self):
+        # 컬럼 그룹별 메모리 (float64/object 로 두었을 때와 비교). 데이터셋이 바뀌지 않으므로 한 번만 만든다
+        if self._memory_report is None:
+            self._memory_report = memory_report(self.df)
+        return self._memory_report
+
+
+def estimate_bytes(obj):
+    # 세션 상태에 들어 있는 값의 대략적인 메모리 크기
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_bytes(k) + estimate_bytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class SessionRegistry:
+    # 세션별 메모리 오버헤드 기록 (서버 용량 산정용)
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def touch(self, session_id, session_bytes):
+        with self._lock:
+            self._sessions[session_id] = (time.time(), session_bytes)
+
+    def summary(self):
+        now = time.time()
+        with self._lock:
+            self._sessions = {session_id: entry for session_id, entry in self._sessions.items()
+                              if now - entry[0] < SESSION_TTL_SECONDS}
+            sizes = [session_bytes for _, session_bytes in self._sessions.values()]
+        return {
+            'active_sessions': len(sizes),
+            'total_session_bytes': sum(sizes),
+            'mean_session_bytes': int(np.mean(sizes)) if sizes else 0,
+        }
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from data_store import KEY_COLUMNS
+
+# 스냅샷 간 비교
+# 저장소 버전마다 한 번 (행 × 스냅샷) 경쟁률/지원인원 배열과 스냅샷별 대학 집계(지원인원 합계, 평균 경쟁률,
+# 모집단위 수)를 만들어 두고, 임의의 두 시점 비교는 배열 두 열의 차이(O(행))와 집계 표의 차이로 끝낸다.
+# 저장소를 다시 읽거나 wide 뷰를 다시 만들지 않는다.
+
+ROW_COLUMNS = KEY_COLUMNS + ['전형구분', '모집인원']
+
+
+class SnapshotHistory:
+    def __init__(self, store):
+        state = store.state
+        self.version = state.version
+        self.snapshots = list(state.snapshots)
+        self._position = {label: j for j, label in enumerate(self.snapshots)}
+        self.rows = state.static[ROW_COLUMNS].copy()
+        for col in KEY_COLUMNS + ['전형구분']:
+            self.rows[col] = self.rows[col].astype(str)
+        self.rates, self.applicants = state.snapshot_matrices()
+        self.aggregates = self._build_aggregates()
+
+    def _build_aggregates(self):
+        # 스냅샷 × 대학명 집계 (한 번의 groupby 로 모든 스냅샷 열을 함께 계산)
+        universities = self.rows['대학명'].to_numpy()
+        applicants = pd.DataFrame(self.applicants, columns=self.snapshots).groupby(universities)
+        rates = pd.DataFrame(self.rates, columns=self.snapshots).groupby(universities)
+        return {
+            '지원인원': applicants.sum(min_count=1),
+            '평균 경쟁률': rates.mean(),
+            '모집단위 수': rates.count(),
+        }
+
+    def column(self, label, values='경쟁률'):
+        matrix = self.rates if values == '경쟁률' else self.applicants
+        return matrix[:, self._position[label]]
+
+    def diff(self, before, after):
+        # 두 시점의 행별 경쟁률/지원인원과 변화량 (두 시점 중 한쪽에라도 값이 있는 행)
+        rate_before, rate_after = self.column(before), self.column(after)
+        applicants_before, applicants_after = self.column(before, '지원인원'), self.column(after, '지원인원')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(rate_before > 0, (rate_after - rate_before) / rate_before * 100, np.nan)
+
+        result = self.rows.copy()
+        result['이전 경쟁률'] = rate_before
+        result['경쟁률'] = rate_after
+        result['경쟁률 변화'] = (rate_after - rate_before).round(2)
+        result['변화율(%)'] = change.round(2)
+        result['이전 지원인원'] = applicants_before
+        result['지원인원'] = applicants_after
+        result['지원인원 증가'] = applicants_after - applicants_before
+        present = ~(np.isnan(rate_before) & np.isnan(rate_after))
+        return result[present]
+
+    def aggregate_diff(self, before, after):
+        # 대학별 집계 차이 (집계 표에서 두 열만 꺼내므로 대학 수에 비례)
+        applicants = self.aggregates['지원인원']
+        rates = self.aggregates['평균 경쟁률']
+        return pd.DataFrame({
+            '이전 지원인원': applicants[before],
+            '지원인원': applicants[after],
+            '지원인원 증가': applicants[after] - applicants[before],
+            '이전 평균 경쟁률': rates[before].round(2),
+            '평균 경쟁률': rates[after].round(2),
+            '평균 경쟁률 변화': (rates[after] - rates[before]).round(2),
+            '모집단위 수': self.aggregates['모집단위 수'][after],
+        }).rename_axis('대학명')
+
+    def totals(self):
+        # 스냅샷별 전체 지원인원 합계와 평균 경쟁률
+        return pd.DataFrame({
+            '지원인원': self.aggregates['지원인원'].sum(min_count=1),
+            '평균 경쟁률': pd.Series(np.nanmean(self.rates, axis=0), index=self.snapshots).round(2),
+        }).rename_axis('스냅샷')
@@ -0,0 +1,55 @@
+import streamlit as st
+
+from data_store import format_snapshot_label
+from snapshot_diff import SnapshotHistory
+
+# 행 단위 변화 표에 보여 줄 최대 행 수
+row_diff_limit = 200
+sort_options = ['지원인원 증가', '경쟁률 변화', '변화율(%)']
+
+
+# 스냅샷 배열과 집계는 데이터 버전(정적 버전 + 저장소 버전)당 한 번만 만든다.
+# 저장소 버전만으로 잡으면 스냅샷 버전을 유지한 채 정적 속성을 다시 만들었을 때 예전 row_id 의 결과가 남는다.
+@st.cache_resource(max_entries=2)
+def get_snapshot_history(_store, data_version):
+    return SnapshotHistory(_store)
+
+
+def snapshot_diff(store, data_version):
+    st.header("스냅샷 비교")
+
+    history = get_snapshot_history(store, data_version)
+    snapshots = history.snapshots
+    if len(snapshots) < 2:
+        st.info("비교할 스냅샷이 부족합니다.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        before = st.selectbox("이전 시점", snapshots, index=len(snapshots) - 2, format_func=format_snapshot_label,
+                              key="snapshot_diff_before")
+    with col2:
+        after = st.selectbox("이후 시점", snapshots, index=len(snapshots) - 1, format_func=format_snapshot_label,
+                             key="snapshot_diff_after")
+    if before == after:
+        st.warning("서로 다른 두 시점을 선택해주세요.")
+        return
+
+    st.markdown("### 🏫 대학별 변화")
+    aggregate = history.aggregate_diff(before, after).sort_values('지원인원 증가', ascending=False)
+    st.dataframe(aggregate, width=None)
+
+    st.markdown("### 📋 모집단위별 변화")
+    col1, col2 = st.columns(2)
+    with col1:
+        universities = st.multiselect("대학 (비워 두면 전체)", sorted(history.rows['대학명'].unique()),
+                                      key="snapshot_diff_universities")
+    with col2:
+        sort_by = st.radio("정렬 기준", sort_options, horizontal=True, key="snapshot_diff_sort")
+
+    rows = history.diff(before, after)
+    if universities:
+        rows = rows[rows['대학명'].isin(universities)]
+    rows = rows.sort_values(sort_by, ascending=False, na_position='last')
+    st.caption(f"전체 {len(rows)}개 모집단위 중 상위 {min(len(rows), row_diff_limit)}개")
+    st.dataframe(rows.head(row_diff_limit), hide_index=True, width=None)
@@ -0,0 +1,132 @@
+import contextlib
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+
+# 빠른 시작: 서버가 뜨는 동안 prewarm() 이 app.py 와 같은 캐시 키로 저장소, 데이터셋, 대시보드 집계를 채운다.
+# 단계별 시간과 첫 화면까지 걸린 시간은 report 에 남는다.
+# SUSI_LAZY_TABS 는 기본 1 (선택한 탭만 그림), SUSI_API_PORT 를 주면 경쟁률 API 도 같이 띄운다.
+#
+#     python startup.py --server.port 8501
+#     SUSI_API_PORT=8600 python startup.py --server.port 8501
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+PAGE_MODULES = ['dashboard_page', 'university_analysis_page', 'university_detail_analysis_page',
+                'filtering_search_page', 'report_page', 'snapshot_diff_page']
+PREWARM_THREAD = 'prewarm'
+API_PORT_ENV = 'SUSI_API_PORT'
+LAZY_TABS_ENV = 'SUSI_LAZY_TABS'
+
+# 이 모듈을 처음 가져온 시각 (startup.py 로 띄우면 프로세스 시작 직후)
+PROCESS_STARTED = time.time()
+
+
+class StartupReport:
+    def __init__(self):
+        self.steps = []  # [(단계, 초)]
+        self.prewarm_seconds = None
+        self.prewarm_error = None
+        # PROCESS_STARTED 부터 첫 스크립트 실행이 끝날 때까지 (초)
+        self.first_render_seconds = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.steps.append((name, time.perf_counter() - start))
+
+    def mark_first_render(self):
+        # 프로세스의 첫 화면만 기록한다
+        with self._lock:
+            if self.first_render_seconds is not None:
+                return False
+            self.first_render_seconds = time.time() - PROCESS_STARTED
+        print(f"[startup] 첫 화면까지 {self.first_render_seconds:.2f}s", file=sys.stderr)
+        return True
+
+
+report = StartupReport()
+
+
+def quiet_cache_warnings(thread_names):
+    # 스크립트 실행 밖에서 캐시 함수를 부르면 나오는 'missing ScriptRunContext' 경고는 이 스레드들에서만 끈다
+    # (서버가 뜨면서 로그 레벨을 다시 설정하므로 레벨 대신 필터를 쓴다)
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    logging.getLogger(get_script_run_ctx.__module__).addFilter(
+        lambda record: record.threadName not in thread_names)
+
+
+def prewarm():
+    # 첫 방문자가 기다릴 일을 미리 한다 (app.py 와 같은 캐시 함수를 같은 인자로 불러 캐시를 채움)
+    quiet_cache_warnings({PREWARM_THREAD})
+    start = time.perf_counter()
+    try:
+        with report.step("페이지 모듈 import"):
+            for module in PAGE_MODULES:
+                importlib.import_module(module)
+        from app_resources import get_store, load_data
+        from dashboard_page import get_dashboard_view
+        from university_analysis_page import get_university_analysis_view
+
+        with report.step("저장소 로드"):
+            store = get_store()
+        with report.step("데이터셋·인덱스 구성"):
+            # app.py 는 기준 시점(as_of)까지 넘기므로 '최신'(None) 을 그대로 넘겨야 같은 캐시 키가 된다
+            dataset = load_data(store, store.version, None)
+        with report.step("대시보드 집계"):
+            get_dashboard_view(dataset.df, dataset.cache_key)
+        with report.step("학교별 통합분석 (첫 대학)"):
+            if dataset.universities:
+                get_university_analysis_view(dataset.index, dataset.cache_key, dataset.universities[0], False)
+    except Exception as e:
+        # 미리 데우기가 실패해도 서버는 그대로 뜨고, 첫 방문 때 평소처럼 만든다
+        report.prewarm_error = repr(e)
+    report.prewarm_seconds = time.perf_counter() - start
+
+    for name, seconds in report.steps:
+        print(f"[startup] {name}: {seconds:.2f}s", file=sys.stderr)
+    if report.prewarm_error:
+        print(f"[startup] 미리 데우기 실패: {report.prewarm_error}", file=sys.stderr)
+    print(f"[startup] 미리 데우기 완료 {report.prewarm_seconds:.2f}s "
+          f"(시작 후 {time.time() - PROCESS_STARTED:.2f}s)", file=sys.stderr)
+
+
+def start_prewarm():
+    thread = threading.Thread(target=prewarm, name=PREWARM_THREAD, daemon=True)
+    thread.start()
+    return thread
+
+
+def start_api(port):
+    # 경쟁률 조회 API: app_resources 의 캐시 함수로 페이지와 같은 저장소·데이터셋을 받는다
+    from rate_api import API_PREFIX, API_THREAD, RateApi, RateApiServer, StreamlitDatasets
+
+    quiet_cache_warnings({API_THREAD})
+    server = RateApiServer(RateApi(StreamlitDatasets()), port=port).start()
+    print(f"[startup] 경쟁률 API {server.url}{API_PREFIX}", file=sys.stderr)
+    return server
+
+
+def main():
+    from streamlit.web import cli
+
+    os.environ.setdefault(LAZY_TABS_ENV, '1')
+    start_prewarm()
+    if os.environ.get(API_PORT_ENV):
+        start_api(int(os.environ[API_PORT_ENV]))
+    sys.argv = ['streamlit', 'run', APP_PATH] + sys.argv[1:]
+    sys.exit(cli.main())
+
+
+if __name__ == '__main__':
+    # 이 파일을 직접 실행해도 app.py 가 import 하는 startup 모듈과 같은 report 를 쓰도록 모듈로 다시 가져온다
+    import startup
+    startup.main()
@@ -0,0 +1,37 @@
+import html
+
+import numpy as np
+import pandas as pd
+
+# 페이지 공용 HTML 표 렌더러
+# 행 단위 반복(iterrows) 대신 컬럼마다 한 번에 문자열로 바꾸고, 컬럼 문자열 배열을 이어 붙여 행을 만든다.
+
+CELL_STYLE = "border:1px solid black; padding:5px;"
+DEFAULT_FLOAT_FORMAT = '%.2f'
+
+
+def format_column(values, fmt=None):
+    # 컬럼 하나 -> 문자열 배열. 실수 컬럼은 기본 소수점 둘째 자리, fmt 로 컬럼별 printf 형식을 지정할 수 있다.
+    if fmt is None and pd.api.types.is_float_dtype(values.dtype):
+        fmt = DEFAULT_FLOAT_FORMAT
+    if fmt is not None:
+        return np.char.mod(fmt, values.to_numpy(dtype=float, na_value=np.nan))
+    return values.astype(str).map(html.escape).to_numpy(dtype=str)
+
+
+def dataframe_to_html(df, title=None, font_size='0.8rem', formats=None, max_height=None):
+    formats = formats or {}
+    header = "".join(f"<th style='{CELL_STYLE}'>{html.escape(str(col))}</th>" for col in df.columns)
+
+    rows = np.full(len(df), "<tr>", dtype=object)
+    for col in df.columns:
+        cells = format_column(df[col], formats.get(col)).astype(object)
+        rows = rows + f"<td style='{CELL_STYLE}'>" + cells + "</td>"
+    body = "".join(rows + "</tr>")
+
+    table = (f"<table style='width:100%; font-size:{font_size}; border-collapse: collapse;'>"
+             f"<tr>{header}</tr>{body}</table>")
+    if max_height:
+        # 전체 순위처럼 긴 표는 스크롤 영역 안에 넣는다
+        table = f"<div style='max-height:{max_height}; overflow-y:auto;'>{table}</div>"
+    return (f"<h5>{title}</h5>" if title else "") + table
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# 저장소 루트의 모듈을 그대로 가져온다 (패키지가 아닌 평면 모듈 구조)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import synthetic_dataset  # noqa: E402
+from data_store import SnapshotStore  # noqa: E402
+
+# 테스트용 저장소: benchmark 의 합성 데이터(integrated_data.csv 와 같은 컬럼)를 CSV 로 쓰고 저장소를 만든다
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'integrated_data.csv'
+    synthetic_dataset(rows=240, snapshots=6, universities=6, seed=1).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def store_dir(tmp_path, csv_path):
+    path = str(tmp_path / 'store')
+    SnapshotStore.from_csv(csv_path).save(path)
+    return path
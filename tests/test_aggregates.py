@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from aggregates import build_aggregate_cube, cube_mean
+from data_store import RATE_PREFIX, SnapshotStore, snapshot_columns
+
+
+def test_cube_means_match_groupby_mean(store_dir):
+    df = SnapshotStore.load(store_dir).to_wide()
+    rate_columns = snapshot_columns(df, RATE_PREFIX)
+    cube = build_aggregate_cube(df)
+    rates = df[rate_columns].astype(float)
+
+    expected = rates.groupby(df['대학명'].astype(str)).mean()
+    pd.testing.assert_frame_equal(cube_mean(cube, ['대학명']).sort_index(), expected.sort_index(),
+                                  check_names=False, rtol=1e-6)
+
+    # 레벨 필터와 여러 레벨: 전형구분 = 종합 인 행만의 대학 × 추천전형 평균
+    rows = df['전형구분'] == '종합'
+    expected = rates[rows].groupby([df.loc[rows, '대학명'].astype(str), df.loc[rows, '추천전형']]).mean()
+    actual = cube_mean(cube, ['대학명', '추천전형'], where={'전형구분': '종합'})
+    pd.testing.assert_frame_equal(actual.sort_index(), expected.sort_index(), check_names=False, rtol=1e-6)
+
+
+def test_cube_counts_skip_missing_rates(store_dir):
+    df = SnapshotStore.load(store_dir).to_wide()
+    rate_columns = snapshot_columns(df, RATE_PREFIX)
+    cube = build_aggregate_cube(df)
+    counts = cube['count'].groupby(level='대학명').sum()
+    expected = df[rate_columns].notna().groupby(df['대학명'].astype(str)).sum()
+    np.testing.assert_array_equal(counts.sort_index().to_numpy(), expected.sort_index().to_numpy())
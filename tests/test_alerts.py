@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from alerts import DROP, MAD_SCALE, MEAN_AD_SCALE, SURGE, Z_THRESHOLD, alert_feed, detect_surges, robust_zscores
+
+LABELS = ['0911_1100', '0911_1500', '0912_1100']
+
+
+def frame(applicants):
+    # 한 대학·전형의 모집단위들 (행 × 스냅샷 지원인원)
+    n_rows = len(applicants)
+    df = pd.DataFrame({
+        '대학명': ['가대학교'] * n_rows,
+        '전형명_key': ['학생부종합'] * n_rows,
+        '모집단위': [f'학과{i}' for i in range(n_rows)],
+        '전형구분': ['종합'] * n_rows,
+    })
+    for j, label in enumerate(LABELS):
+        df[f'지원인원_{label}'] = [row[j] for row in applicants]
+    return df
+
+
+def test_planted_spike_is_flagged():
+    applicants = [[100, 110 + i, 121 + 2 * i] for i in range(8)]
+    applicants[3] = [100, 112, 480]
+    applicants[5] = [100, 114, 40]
+    alerts = detect_surges(frame(applicants))
+
+    flagged = alerts[alerts['flagged']]
+    assert flagged[['모집단위', '구간']].astype(str).values.tolist() == [['학과3', '0911_1500→0912_1100'],
+                                                                      ['학과5', '0911_1500→0912_1100']]
+    assert alert_feed(alerts, direction=SURGE)['모집단위'].tolist() == ['학과3']
+    assert alert_feed(alerts, direction=DROP)['모집단위'].tolist() == ['학과5']
+    # 첫 구간은 모두 비슷하게 늘었으므로 알림이 없다
+    assert alerts[alerts['구간'] == '0911_1100→0911_1500']['z'].abs().max() < Z_THRESHOLD
+
+
+def test_flat_series_is_not_flagged():
+    alerts = detect_surges(frame([[50, 50, 50]] * 8))
+    # 모두 같은 증가율이면 편차가 0 이라 z 를 정하지 않는다 (알림 없음)
+    assert alerts.empty or not alerts['flagged'].any()
+
+
+def test_zero_mad_falls_back_to_mean_absolute_deviation():
+    values = pd.Series([0.1] * 7 + [1.1])
+    keys = [np.zeros(8)]
+    z, median, count = robust_zscores(values, keys)
+
+    # 절반 이상이 같은 값이면 MAD 가 0 이므로 평균 절대편차로 나눈다
+    scale = (1.0 / 8) * MEAN_AD_SCALE
+    assert np.isfinite(z).all()
+    assert z.iloc[-1] == pytest.approx(1.0 / scale) and (z.iloc[:-1] == 0).all()
+    assert median.iloc[0] == 0.1 and count.iloc[0] == 8
+
+    spread = pd.Series([0.0, 1.0, 2.0, 3.0, 4.0])
+    z, _, _ = robust_zscores(spread, [np.zeros(5)])
+    assert np.allclose(z, (spread - 2.0) / (1.0 * MAD_SCALE))
+
+
+def test_small_counts_are_not_flagged():
+    applicants = [[2, 2 + (i % 2), 3] for i in range(8)]
+    applicants[0] = [2, 2, 9]  # 증가율은 크지만 지원인원이 MIN_APPLICANTS 미만
+    alerts = detect_surges(frame(applicants))
+    assert alerts['z'].max() >= Z_THRESHOLD
+    assert not alerts['flagged'].any()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_schema import (COUNTS, OTHER, RATES, STRINGS, column_group, compact, rate_threshold, rate_values, read_csv,
+                           to_counts)
+from data_store import SnapshotStore
+
+
+@pytest.mark.parametrize('column, group', [
+    ('경쟁률_0913_1500', RATES), ('D-0오전(2024)', RATES), ('최종(2023)', RATES), ('3개년평균', RATES),
+    ('예상최종(2025)', RATES), ('지원인원_0913_1500', COUNTS), ('모집인원', COUNTS), ('2024_모집인원', COUNTS),
+    ('최종지원인원(2025)', COUNTS), ('대학명', STRINGS), ('예측근거', STRINGS), ('추천전형', OTHER),
+])
+def test_column_groups(column, group):
+    assert column_group(column) == group
+
+
+def test_rate_threshold_keeps_boundary_rows():
+    rates = pd.Series([6.17, 6.18, np.nan], dtype='float32')
+    values = rates.to_numpy(dtype=float)  # 계산하는 쪽은 float64 로 올려 쓴다
+    assert (values <= 6.17).tolist() == [False, False, False]  # float64 상한과 그대로 비교하면 빠진다
+    assert (values <= rate_threshold(6.17)).tolist() == [True, False, False]
+    assert (rates <= rate_threshold(6.17)).tolist() == [True, False, False]
+    assert rate_threshold(None) is None
+    assert rate_values(rates.to_frame()).ravel()[0] == 6.17
+
+
+def test_counts_round_and_keep_missing():
+    counts = to_counts([1.0, 2.6, np.nan, '3'])
+    assert str(counts.dtype) == 'Int32'
+    assert counts.tolist()[:2] == [1, 3] and pd.isna(counts[2]) and counts[3] == 3
+
+
+def test_store_and_wide_dtypes_survive_save_and_load(store_dir, csv_path):
+    store = SnapshotStore.load(store_dir)
+    static, series = store.static, store.series
+    assert static['대학명'].dtype == 'category' and static['모집인원'].dtype == 'Int32'
+    assert static['최종(2024)'].dtype == 'float32'
+    assert series['경쟁률'].dtype == 'float32' and series['지원인원'].dtype == 'Int32'
+
+    wide = store.to_wide()
+    rate_columns = [col for col in wide.columns if column_group(col) == RATES]
+    count_columns = [col for col in wide.columns if column_group(col) == COUNTS]
+    assert (wide[rate_columns].dtypes == 'float32').all()
+    assert (wide[count_columns].dtypes == 'float32').all()  # wide 뷰에서는 인원도 float32
+    assert all(isinstance(wide[col].dtype, pd.CategoricalDtype) for col in wide.columns if column_group(col) == STRINGS)
+
+    # 원본 CSV 의 값과 결측 위치가 그대로다
+    raw = pd.read_csv(csv_path)
+    for col in rate_columns + count_columns:
+        expected = raw[col].to_numpy(dtype=float)
+        actual = wide[col].to_numpy(dtype=float)
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected), err_msg=col)
+        np.testing.assert_allclose(actual, expected, rtol=1e-6, equal_nan=True, err_msg=col)
+
+    # 읽은 CSV 를 스키마로 다시 맞춰도 복사하지 않는다
+    df = read_csv(csv_path)
+    assert compact(df) is df
@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import (APPLICANTS, KEY_COLUMNS, RATE, SnapshotStore, append_snapshot, load_store, read_manifest,
+                        rebuild_store)
+
+
+def snapshot_like(store, label, factor=1.2):
+    # 마지막 스냅샷 값에 factor 를 곱한 새 스냅샷 (대학명, 전형명_key, 모집단위, 경쟁률, 지원인원)
+    wide = store.to_wide()
+    frame = wide[KEY_COLUMNS].astype(str)
+    frame[RATE] = (wide['경쟁률_' + store.snapshots[-1]].to_numpy(dtype=float) * factor).round(2)
+    frame[APPLICANTS] = (wide['지원인원_' + store.snapshots[-1]].to_numpy(dtype=float) * factor).round()
+    return frame
+
+
+def test_save_and_load_round_trip(store_dir, csv_path):
+    built = SnapshotStore.from_csv(csv_path)
+    loaded = SnapshotStore.load(store_dir)
+    assert loaded.snapshots == built.snapshots
+    pd.testing.assert_frame_equal(loaded.to_wide(), built.to_wide())
+
+
+def test_append_snapshot_and_refresh(store_dir):
+    store = SnapshotStore.load(store_dir)
+    assert store.refresh(store_dir) == []
+
+    incoming = snapshot_like(store, '0914_1100')
+    unknown = pd.DataFrame([['없는대학교', '학생부종합', '철학과', 3.0, 30.0]], columns=incoming.columns)
+    label, unmatched = append_snapshot('2024-09-14 11:00', pd.concat([incoming, unknown]), store_dir)
+
+    assert label == '0914_1100'
+    assert unmatched[KEY_COLUMNS].values.tolist() == [['없는대학교', '학생부종합', '철학과']]
+    assert unmatched['사유'].tolist() == ['unmatched']
+
+    assert store.refresh(store_dir) == ['0914_1100']
+    assert store.version == 2 and store.snapshots[-1] == '0914_1100'
+    np.testing.assert_allclose(store.to_wide()['경쟁률_0914_1100'].to_numpy(dtype=float),
+                               incoming[RATE].to_numpy(), rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        append_snapshot('0914_1100', incoming, store_dir)
+
+
+def test_refresh_reloads_when_static_is_rebuilt(store_dir, csv_path):
+    store = SnapshotStore.load(store_dir)
+    rebuilt = rebuild_store(store_dir, csv_path)
+    rebuilt.save(store_dir)
+
+    assert store.refresh(store_dir) == store.snapshots
+    assert store.static_version == rebuilt.static_version
+    assert store.version == 2
+
+
+def test_rebuild_keeps_ingested_snapshots_and_version(store_dir, csv_path):
+    store = SnapshotStore.load(store_dir)
+    incoming = snapshot_like(store, '0914_1100')
+    append_snapshot('0914_1100', incoming, store_dir)
+
+    # CSV 가 다시 만들어지면 (행 순서가 바뀌어도) 수집한 스냅샷은 키로 다시 맞춰 붙는다
+    df = pd.read_csv(csv_path)
+    df.iloc[::-1].to_csv(csv_path, index=False)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    reloaded = load_store(store_dir, csv_path)
+    assert reloaded.snapshots[-1] == '0914_1100'
+    assert reloaded.version == read_manifest(store_dir)['version'] == 3
+
+    wide = reloaded.to_wide().set_index(KEY_COLUMNS)
+    expected = incoming.set_index(KEY_COLUMNS)[RATE]
+    np.testing.assert_allclose(wide.loc[expected.index, '경쟁률_0914_1100'].to_numpy(dtype=float),
+                               expected.to_numpy(), rtol=1e-6)
+
+
+def test_refresh_swaps_state_without_touching_the_old_one(store_dir):
+    store = SnapshotStore.load(store_dir)
+    before = store.state
+    snapshots, series = list(before.snapshots), before.series
+
+    append_snapshot('0914_1100', snapshot_like(store, '0914_1100'), store_dir)
+    store.refresh(store_dir)
+
+    # 갱신 전에 state 를 받아 간 쪽은 예전 상태를 그대로 본다
+    assert store.state is not before
+    assert before.snapshots == snapshots and before.series is series and before.version == 1
+    assert '경쟁률_0914_1100' not in before.to_wide().columns
+    assert store.state.version == 2 and store.state.snapshots[-1] == '0914_1100'
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import build_aggregate_cube
+from benchmark import synthetic_dataset
+from data_store import RATE_PREFIX, SnapshotStore, snapshot_columns
+from group_comparison import (ALL_TRACKS, MEAN, MEDIAN, WEIGHTED_MEAN, WEIGHTED_MEDIAN, GroupComparison, load_groups,
+                              save_groups)
+
+GROUPS = {
+    "서연고": ["서울대학교", "연세대학교", "고려대학교"],
+    "연고서성": ["연세대학교", "고려대학교", "서강대학교", "성균관대학교", "없는대학교"],  # 겹치는 대학, 없는 대학
+    "빈 그룹": [],
+}
+
+
+@pytest.fixture(scope='module')
+def df():
+    wide = SnapshotStore.from_wide(synthetic_dataset(rows=240, snapshots=6, universities=6, seed=1)).to_wide()
+    # 모집인원이 비어 있는 행은 가중 통계에서만 빠진다
+    wide.loc[wide.index[:5], '모집인원'] = np.nan
+    return wide
+
+
+def weighted_median(values, weights):
+    keep = ~np.isnan(values) & (weights > 0)
+    values, weights = values[keep], weights[keep]
+    if not len(values):
+        return np.nan
+    order = np.argsort(values, kind='stable')
+    cumulative = np.cumsum(weights[order])
+    return values[order][np.argmax(cumulative >= cumulative[-1] / 2)]
+
+
+def naive_stats(df, members):
+    # 원본 행에서 바로 구한 그룹 통계 (스냅샷별 Series)
+    rate_columns = snapshot_columns(df, RATE_PREFIX)
+    rows = df[df['대학명'].astype(str).isin(members)]
+    rates = rows[rate_columns].astype(float)
+    recruits = rows['모집인원'].astype(float)
+    weights = rates.notna().mul(recruits.fillna(0), axis=0)
+    weighted_sum = rates.fillna(0).mul(weights).groupby(rows['대학명'].astype(str)).sum()
+    weight = weights.groupby(rows['대학명'].astype(str)).sum()
+    university_weighted = weighted_sum / weight.where(weight > 0)
+    return {
+        MEAN: rates.mean(),
+        MEDIAN: rates.groupby(rows['대학명'].astype(str)).mean().median(),
+        WEIGHTED_MEAN: weighted_sum.sum() / weight.sum().where(weight.sum() > 0),
+        WEIGHTED_MEDIAN: pd.Series([weighted_median(university_weighted[col].to_numpy(), weight[col].to_numpy())
+                                    for col in rate_columns], index=rate_columns),
+    }
+
+
+@pytest.mark.parametrize('track', [ALL_TRACKS, '교과', '종합'])
+def test_group_stats_match_naive_pandas(df, track):
+    comparison = GroupComparison(build_aggregate_cube(df))
+    tables = comparison.compute(GROUPS, track)
+    rows = df if track == ALL_TRACKS else df[df['전형구분'] == track]
+
+    for name, members in GROUPS.items():
+        expected = naive_stats(rows, members)
+        for stat in [MEAN, MEDIAN, WEIGHTED_MEAN, WEIGHTED_MEDIAN]:
+            np.testing.assert_allclose(tables[stat].loc[name].to_numpy(dtype=float),
+                                       expected[stat].to_numpy(dtype=float), rtol=1e-6, err_msg=f"{name} {stat}")
+
+
+def test_membership_ignores_unknown_universities(df):
+    comparison = GroupComparison(build_aggregate_cube(df))
+    membership = comparison.membership(GROUPS)
+    assert membership.sum(axis=1).tolist() == [3, 4, 0]
+    assert set(comparison.tracks()) == {ALL_TRACKS, '교과', '종합'}
+    assert comparison.compute(GROUPS, '논술')[MEAN].isna().all().all()
+
+
+def test_groups_round_trip(tmp_path):
+    path = str(tmp_path / 'groups.json')
+    assert load_groups(path) == load_groups(str(tmp_path / 'missing.json'))  # 파일이 없으면 기본 그룹
+    save_groups(GROUPS, path)
+    assert load_groups(path) == GROUPS
+    assert list(load_groups(path)) == list(GROUPS)
+
+    (tmp_path / 'bad.json').write_text('["서울대학교"]', encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_groups(str(tmp_path / 'bad.json'))
@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingest_service
+from data_store import SnapshotStore, read_manifest
+from ingest_service import (HostRateLimiter, HtmlTableSource, IngestService, RateSource, SourceError, parse_number,
+                            rows_from_table, source_from_config, to_snapshot_rows)
+from mock_rate_server import MockRateServer, render_rate_page
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(ingest_service, 'RETRY_BASE_DELAY', 0.01)
+
+
+def mock_sources(server):
+    return [source_from_config(entry) for entry in server.sources()]
+
+
+class BrokenSource(RateSource):
+    # 가져오기와 파싱은 되지만 모집단위 컬럼이 없어 스키마 변환에서 실패하는 소스
+    def parse(self, text):
+        return pd.DataFrame({'경쟁률': [1.5]})
+
+
+def test_parse_number():
+    assert parse_number('12.34 : 1') == 12.34
+    assert parse_number('1,234명') == 1234.0
+    assert np.isnan(parse_number('-'))
+
+
+def test_rows_from_table_uses_header_aliases():
+    table = [['학과', '모집정원', '지원자수', '경쟁율'], ['간호학과', '30', '1,234', '41.13 : 1'], ['짧은 행']]
+    frame = rows_from_table(table)
+    assert list(frame['모집단위']) == ['간호학과']
+    assert frame.loc[0, '모집인원'] == 30 and frame.loc[0, '지원인원'] == 1234 and frame.loc[0, '경쟁률'] == 41.13
+    assert rows_from_table([['이름', '값'], ['a', '1']]) is None
+
+
+def test_html_table_source_parses_mock_page():
+    page = render_rate_page('가천대학교', [('학생부우수자', '간호학과', 30, 1234, 41.13),
+                                       ('학생부우수자', '경영학부', 25, 250, 10.0)])
+    frame = HtmlTableSource('가천대학교', 'http://localhost/rates').parse(page)
+    assert list(frame['모집단위']) == ['간호학과', '경영학부']
+    assert list(frame['지원인원']) == [1234, 250]
+    with pytest.raises(SourceError):
+        HtmlTableSource('가천대학교', 'http://localhost/rates').parse('<html><body>점검 중</body></html>')
+
+
+def test_to_snapshot_rows_fills_missing_rate_from_applicants():
+    source = HtmlTableSource('가천대학교', 'http://localhost/rates', admission_key='학생부우수자')
+    frame = pd.DataFrame({'모집단위': ['간호학과'], '모집인원': [20.0], '지원인원': [50.0]})
+    rows = to_snapshot_rows(source, frame, {})
+    assert rows.iloc[0].tolist() == ['가천대학교', '학생부우수자', '간호학과', 2.5, 50.0]
+
+
+def test_retries_on_503_and_appends_snapshot(store_dir):
+    with MockRateServer(store_dir, growth=1.1, fail_first=1) as server:
+        service = IngestService(mock_sources(server), store_dir, max_concurrency=4, host_interval=0)
+        summary = asyncio.run(service.run_once('0914_1100'))
+
+    assert summary['failures'] == []
+    assert summary['label'] == '0914_1100'
+    assert set(server.requests.values()) == {2}
+    assert summary['unmatched'].empty
+
+    store = SnapshotStore.load(store_dir)
+    assert store.snapshots[-1] == '0914_1100'
+    assert read_manifest(store_dir)['version'] == 2
+    wide = store.to_wide()
+    previous = wide['지원인원_' + store.snapshots[-2]].to_numpy(dtype=float)
+    ingested = wide['지원인원_0914_1100'].to_numpy(dtype=float)
+    present = ~np.isnan(previous)
+    np.testing.assert_array_equal(ingested[present], np.round(previous[present] * 1.1))
+
+
+def test_gives_up_after_max_retries(store_dir):
+    with MockRateServer(store_dir, fail_first=5) as server:
+        sources = mock_sources(server)[:2]
+        service = IngestService(sources, store_dir, host_interval=0, max_retries=1)
+        summary = asyncio.run(service.run_once('0914_1100'))
+
+    assert summary['label'] is None
+    assert len(summary['failures']) == 2
+    assert all('503' in error for _, _, error in summary['failures'])
+    assert sorted(server.requests.values()) == [2, 2]
+    assert read_manifest(store_dir)['version'] == 1
+
+
+def test_concurrency_is_bounded(store_dir):
+    with MockRateServer(store_dir, latency=0.05) as server:
+        service = IngestService(mock_sources(server), store_dir, max_concurrency=2, host_interval=0)
+        asyncio.run(service.collect({}))
+    assert server.max_active == 2
+
+
+def test_throttled_host_does_not_hold_a_concurrency_slot():
+    limiter = HostRateLimiter(0.2)
+    started = {}
+
+    async def request(name, host, semaphore):
+        async with limiter.slot(host, semaphore):
+            started[name] = time.monotonic()
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        semaphore = asyncio.Semaphore(1)
+        await asyncio.gather(request('a1', 'a', semaphore), request('a2', 'a', semaphore),
+                             request('b1', 'b', semaphore))
+
+    asyncio.run(scenario())
+    # a2 가 호스트 간격을 기다리는 동안 하나뿐인 자리는 b1 이 쓴다
+    assert sorted(started, key=started.get) == ['a1', 'b1', 'a2']
+    assert started['a2'] - started['a1'] >= 0.2
+    assert started['b1'] - started['a1'] < 0.1
+
+
+def test_failed_source_does_not_block_others(store_dir):
+    with MockRateServer(store_dir) as server:
+        sources = mock_sources(server)
+        broken = BrokenSource('가상대학교', sources[0].url)
+        service = IngestService(sources + [broken], store_dir, host_interval=0)
+        summary = asyncio.run(service.run_once('0914_1100'))
+
+    assert summary['label'] == '0914_1100'
+    assert [university for university, _, _ in summary['failures']] == ['가상대학교']
+    assert "'모집단위'" in summary['failures'][0][2]
+
+
+def test_run_scheduled_logs_failure_and_continues(store_dir, capsys):
+    service = IngestService([], store_dir, host_interval=0)
+
+    async def failing_run_once(timestamp=None):
+        raise OSError("저장소에 쓸 수 없습니다")
+
+    service.run_once = failing_run_once
+    assert asyncio.run(service.run_scheduled(pd.Timestamp('2024-09-14 11:00'))) is None
+    assert '수집 실패' in capsys.readouterr().out
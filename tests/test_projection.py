@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from projection import (PAST_YEARS, PROJECTION_BASIS_COLUMN, PROJECTION_COLUMN, PROJECTION_HIGH_COLUMN,
+                        PROJECTION_LOW_COLUMN, past_column, project_final_rates)
+
+DEADLINES = {'가대학교': '0913', '나대학교': '0911'}
+SNAPSHOTS = ['0910_1100', '0911_1500', '0912_1500']  # 가대학교 기준: D-2 이전, D-2, D-1 / 나대학교: 0912 는 마감 이후
+
+
+def past(d2, d1, final):
+    # 연도별 (D-2, D-1, 최종). D-0 체크포인트는 비워 둔다
+    return {'D-2': d2, 'D-1': d1, '최종': final}
+
+
+def fixture_frame():
+    # (대학명, 전형구분, 스냅샷 경쟁률, 2024/2023/2022 과거 값)
+    nan = np.nan
+    rows = [
+        ('가대학교', '교과', [0.5, 3.0, 6.0], [past(2, 4, 10), past(1, 2, 5), past(4, 8, 20)]),  # 과거 곡선과 같은 모양
+        ('가대학교', '교과', [0.5, 2.0, 4.0], [past(2, 4, 10), past(2, 4, 14), past(2, 4, 6)]),  # 해마다 최종이 다름
+        ('가대학교', '교과', [1.0, nan, nan], [past(2, 4, 10)] * 3),                           # D-2 이전 값만 있음
+        ('나대학교', '교과', [1.0, 5.0, 7.0], [past(nan, nan, nan)] * 3),                      # 마감
+        ('가대학교', '교과', [nan, nan, 4.0], [past(nan, nan, nan)] * 3),                      # 과거 자료 없음
+        ('가대학교', '교과', [0.0, 0.0, 0.0], [past(2, 4, 10)] * 3),                           # 아직 지원자 없음
+    ]
+    records = []
+    for university, track, rates, years in rows:
+        record = {'대학명': university, '전형구분': track}
+        record.update({f'경쟁률_{label}': rate for label, rate in zip(SNAPSHOTS, rates)})
+        for year, values in zip(PAST_YEARS, years):
+            record.update({past_column(checkpoint, year): value for checkpoint, value in values.items()})
+        records.append(record)
+    return pd.DataFrame(records)
+
+
+@pytest.fixture
+def projected():
+    return project_final_rates(fixture_frame(), DEADLINES)
+
+
+def test_history_projection_is_mean_of_scaled_finals(projected):
+    assert projected[PROJECTION_BASIS_COLUMN].tolist()[:2] == ['과거추이', '과거추이']
+    # 행 0: 해마다 배율 × 최종 = 15, 행 1: 10, 14, 6 의 평균
+    assert projected.loc[0, PROJECTION_COLUMN] == pytest.approx(15.0)
+    assert projected.loc[1, PROJECTION_COLUMN] == pytest.approx(10.0)
+
+
+def test_history_band_uses_backtest_residual_quantiles(projected):
+    # 같은 전형구분·마지막 체크포인트(D-1) 행들의 과거 연도 하나 빼고 예측한 잔차: 행 0 은 0, 행 1 은 0, log(14/8), log(6/12)
+    residuals = [0.0, 0.0, 0.0, 0.0, np.log(14 / 8), np.log(6 / 12)]
+    low, high = np.exp(np.quantile(residuals, [0.1, 0.9]))
+    assert projected.loc[0, PROJECTION_LOW_COLUMN] == pytest.approx(round(15 * low, 2))
+    assert projected.loc[0, PROJECTION_HIGH_COLUMN] == pytest.approx(round(15 * high, 2))
+    # 구간이 관측값(4.0) 아래로 내려가지 않는다
+    assert projected.loc[1, PROJECTION_LOW_COLUMN] == pytest.approx(round(max(10 * low, 4.0), 2))
+
+
+def test_peer_projection_uses_track_ratio_quantiles(projected):
+    # 교과 D-1 의 최종/D-1 배율: 2.5, 2.5, 2.5, 2.5, 3.5, 1.5 (행 2, 5 는 과거 값이 있지만 같은 곡선)
+    ratios = [2.5] * 3 + [2.5, 3.5, 1.5] + [2.5] * 6
+    assert projected.loc[4, PROJECTION_BASIS_COLUMN] == '유사전형'
+    assert projected.loc[4, PROJECTION_COLUMN] == pytest.approx(4.0 * np.median(ratios))
+    assert projected.loc[4, PROJECTION_LOW_COLUMN] == pytest.approx(round(4.0 * np.quantile(ratios, 0.1), 2))
+    assert projected.loc[4, PROJECTION_HIGH_COLUMN] == pytest.approx(round(4.0 * np.quantile(ratios, 0.9), 2))
+
+
+def test_rows_outside_the_window_are_not_projected(projected):
+    # 체크포인트 구간 전 값이나 0 만 있는 행은 현재 값을 최종처럼 내놓지 않고 비워 둔다
+    for row in [2, 5]:
+        assert np.isnan(projected.loc[row, [PROJECTION_COLUMN, PROJECTION_LOW_COLUMN,
+                                            PROJECTION_HIGH_COLUMN]].to_numpy(dtype=float)).all()
+        assert projected.loc[row, PROJECTION_BASIS_COLUMN] == ''
+
+
+def test_closed_rows_report_their_final(projected):
+    assert projected.loc[3, PROJECTION_BASIS_COLUMN] == '마감'
+    assert projected.loc[3, [PROJECTION_COLUMN, PROJECTION_LOW_COLUMN, PROJECTION_HIGH_COLUMN]].tolist() == [7.0] * 3
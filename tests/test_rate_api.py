@@ -0,0 +1,120 @@
+import gzip
+import http.client
+import json
+from urllib.parse import quote, urlsplit
+
+import pytest
+
+from benchmark import synthetic_dataset
+from data_store import SnapshotStore, append_snapshot
+from rate_api import API_PREFIX, GZIP_MIN_BYTES, RateApi, RateApiServer, StoreDatasets
+from test_data_store import snapshot_like
+
+SLASH_MAJOR = '경영학부/경제학부'
+
+
+@pytest.fixture
+def api_store(tmp_path, monkeypatch):
+    # 모집단위 하나에 '/' 가 들어간 저장소. StoreDatasets 가 기본 CSV 경로로 찾도록 tmp_path 에서 실행한다
+    df = synthetic_dataset(rows=240, snapshots=6, universities=6, seed=1)
+    df.loc[0, '모집단위'] = SLASH_MAJOR
+    df.to_csv(tmp_path / 'integrated_data.csv', index=False)
+    monkeypatch.chdir(tmp_path)
+    SnapshotStore.from_csv('integrated_data.csv').save('store')
+    return 'store'
+
+
+@pytest.fixture
+def api(api_store):
+    return RateApi(StoreDatasets(api_store), refresh_interval=0)
+
+
+@pytest.fixture
+def get(api):
+    with RateApiServer(api) as server:
+        def request(path, **headers):
+            connection = http.client.HTTPConnection(urlsplit(server.url).netloc, timeout=10)
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+            connection.close()
+            return response, body
+        yield request
+
+
+def slash_key(api):
+    # '/' 가 들어간 모집단위의 (대학명, 전형명_key)
+    df = api.current().dataset.df
+    first = df[df['모집단위'] == SLASH_MAJOR].iloc[0]
+    return str(first['대학명']), str(first['전형명_key'])
+
+
+def test_etag_and_not_modified(get):
+    response, body = get(f'{API_PREFIX}/meta')
+    assert response.status == 200
+    assert response.getheader('Content-Type') == 'application/json; charset=utf-8'
+    etag = response.getheader('ETag')
+    assert etag == f'"{json.loads(body)["static_version"]}-{json.loads(body)["version"]}"'
+
+    response, body = get(f'{API_PREFIX}/meta', **{'If-None-Match': etag})
+    assert response.status == 304 and body == b'' and response.getheader('ETag') == etag
+    response, _ = get(f'{API_PREFIX}/meta', **{'If-None-Match': f'"other", {etag}'})
+    assert response.status == 304
+    response, _ = get(f'{API_PREFIX}/meta', **{'If-None-Match': '"other"'})
+    assert response.status == 200
+
+
+def test_gzip_negotiation(get):
+    path = f'{API_PREFIX}/universities'
+    plain_response, plain = get(path)
+    gzip_response, compressed = get(path, **{'Accept-Encoding': 'gzip, deflate'})
+    assert len(plain) >= GZIP_MIN_BYTES
+    assert plain_response.getheader('Content-Encoding') is None
+    assert gzip_response.getheader('Content-Encoding') == 'gzip'
+    assert gzip_response.getheader('Vary') == 'Accept-Encoding'
+    assert gzip.decompress(compressed) == plain
+    assert int(gzip_response.getheader('Content-Length')) == len(compressed)
+
+    # 작은 본문은 gzip 을 요청해도 그대로 준다
+    response, body = get(f'{API_PREFIX}/meta', **{'Accept-Encoding': 'gzip'})
+    assert response.getheader('Content-Encoding') is None and json.loads(body)['snapshots']
+
+
+def test_not_found_routes(get):
+    for path in ['/', '/other', f'{API_PREFIX}/nope', f'{API_PREFIX}/series', f'{API_PREFIX}/meta/extra',
+                 f'{API_PREFIX}/series/' + quote('없는대학교', safe=''), f'{API_PREFIX}/latest/a/b/c/d']:
+        response, body = get(path, **{'If-None-Match': '*'})
+        assert response.status == 404, path
+        assert 'error' in json.loads(body) and response.getheader('ETag') is None
+
+
+def test_keys_containing_slash(api, get):
+    university, admission = slash_key(api)
+    prefix = f'{API_PREFIX}/latest/' + '/'.join(quote(part, safe='') for part in [university, admission])
+
+    response, body = get(prefix + '/' + quote(SLASH_MAJOR, safe=''))
+    assert response.status == 200
+    payload = json.loads(body)
+    assert payload['major'] == SLASH_MAJOR and [unit['major'] for unit in payload['units']] == [SLASH_MAJOR]
+
+    # 인코딩하지 않은 '/' 는 경로 조각을 나누므로 없는 항목이 된다
+    response, _ = get(prefix + '/' + quote(SLASH_MAJOR, safe='/'))
+    assert response.status == 404
+
+    series = json.loads(get(f'{API_PREFIX}/series/' + '/'.join(quote(part, safe='')
+                                                                 for part in [university, admission]))[1])
+    assert SLASH_MAJOR in series['children']
+
+
+def test_response_cache_follows_the_data_version(api, api_store, get):
+    path = f'{API_PREFIX}/universities'
+    first = api.response(path)
+    assert api.response(path)[2] is first[2]  # 같은 버전에서는 만든 본문을 그대로 쓴다
+
+    store = SnapshotStore.load(api_store)
+    append_snapshot('0914_1100', snapshot_like(store, '0914_1100'), api_store)
+
+    response, body = get(f'{API_PREFIX}/meta', **{'If-None-Match': first[1]})
+    assert response.status == 200 and response.getheader('ETag') != first[1]
+    assert json.loads(body)['latest'] == '0914_1100'
+    assert api.response(path)[2] is not first[2]
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_schema import to_rates
+from projection import PROJECTION_BASIS_COLUMN, PROJECTION_COLUMN
+from recommendation import NEUTRAL_SCORE, RecommendationIndex
+
+
+@pytest.fixture
+def index():
+    df = pd.DataFrame({
+        '대학명': ['가', '가', '나', '나', '다', '다'],
+        '계열': ['인문', '자연', '인문', '자연', '인문', '자연'],
+        '전형구분': ['교과', '교과', '종합', '종합', '교과', '종합'],
+        '추천전형': [1, 0, 1, 0, 0, 1],
+        '모집인원': [10, 20, 5, 40, 10, 8],
+        '3개년평균': [5.0, 8.0, np.nan, 3.0, 9.0, 4.0],
+        '경쟁률_0913_1500': to_rates([6.17, 3.0, 3.0, 12.0, 2.0, 7.5]),
+        PROJECTION_COLUMN: to_rates([8.0, 4.0, 5.0, 12.0, 6.0, 9.0]),
+        PROJECTION_BASIS_COLUMN: ['과거추이', '과거추이', '유사전형', '마감', '과거추이', '과거추이'],
+    })
+    return RecommendationIndex(df)
+
+
+def test_scores_are_percentile_ranks(index):
+    latest = index.scores[:, 0]
+    # 낮은 경쟁률일수록 높은 점수, 같은 값은 평균 순위
+    np.testing.assert_allclose(latest, 1 - pd.Series([6.17, 3.0, 3.0, 12.0, 2.0, 7.5]).rank(pct=True))
+    # 값이 없는 신호는 중간 점수
+    assert index.scores[2, 2] == NEUTRAL_SCORE
+
+
+def test_ranking_order_with_ties(index):
+    rows, scores = index.query(weights={'최신 경쟁률': 1.0}, exclude_closed=False)
+    # 행 1, 2 는 경쟁률이 같아 점수가 같고, 원래 순서를 유지한다
+    assert rows.tolist() == [4, 1, 2, 0, 5, 3]
+    assert scores[1] == scores[2]
+    assert np.all(np.diff(scores) <= 0)
+
+    rows, _ = index.query(weights={'최신 경쟁률': 1.0}, exclude_closed=False, k=2)
+    assert rows.tolist() == [4, 1]
+
+
+def test_weighted_sum_breaks_ties(index):
+    rows, scores = index.query(weights={'최신 경쟁률': 1.0, '예상 최종': 1.0}, exclude_closed=False)
+    expected = index.scores[:, :2].mean(axis=1)
+    np.testing.assert_allclose(scores, expected[rows])
+    assert rows.tolist()[:3] == [1, 4, 2]
+
+
+def test_thresholds_include_the_limit(index):
+    # float32 로 저장된 6.17 도 상한 6.17 에 포함된다
+    rows, _ = index.query(max_latest=6.17, exclude_closed=False)
+    assert sorted(rows.tolist()) == [0, 1, 2, 4]
+    rows, _ = index.query(max_latest=6.17, max_projected=5.0, exclude_closed=False)
+    assert sorted(rows.tolist()) == [1, 2]
+
+
+def test_filters(index):
+    assert index.query(max_latest=12.0)[0].tolist().count(3) == 0  # 마감 행은 기본으로 뺀다
+    assert sorted(index.query(series='인문')[0].tolist()) == [0, 2, 4]
+    assert sorted(index.query(tracks=['종합'], exclude_closed=False)[0].tolist()) == [2, 3, 5]
+    assert sorted(index.query(only_recommended=True)[0].tolist()) == [0, 2, 5]
+    assert sorted(index.query(min_recruits=10)[0].tolist()) == [0, 1, 4]
+
+
+def test_no_candidates(index):
+    for kwargs in [{'max_latest': 1.0}, {'series': '예체능'}, {'tracks': ['논술']},
+                   {'max_latest': 3.0, 'only_recommended': True, 'tracks': ['교과']}]:
+        rows, scores = index.query(**kwargs)
+        assert len(rows) == 0 and len(scores) == 0
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from row_matching import (AMBIGUOUS, CANONICAL, EXACT, FUZZY, MAPPING, UNMATCHED, RowMatcher, canonical,
+                          load_mapping, save_mapping)
+
+KEYS = ['대학명', '전형명_key', '모집단위']
+
+
+def store_keys():
+    return pd.DataFrame([
+        ['가천대학교', '학생부우수자', '컴퓨터AI학부'],
+        ['가천대학교', '학생부우수자', '경영학과'],
+        ['가천대학교', '학생부우수자', '간호학과'],
+        ['가천대학교', '학생부교과(지역균형전형)', '수학과'],
+        ['가천대학교', '가천바람개비', '경제학부1'],
+        ['가천대학교', '가천바람개비', '경제학부2'],
+    ], columns=KEYS)
+
+
+def test_canonical():
+    assert canonical('컴퓨터  AI학부') == canonical('컴퓨터·AI 학부') == '컴퓨터ai학부'
+    assert canonical('학생부교과[지역균형]') == '학생부교과(지역균형)'
+    assert canonical(None) == ''
+
+
+def test_match_stages():
+    matcher = RowMatcher(store_keys(), KEYS, mapping={('가천대학교', '학생부우수자', '간호'): 2})
+    incoming = pd.DataFrame([
+        ['가천대학교', '학생부우수자', '경영학과'],        # 원문 그대로
+        ['가천대학교', '학생부우수자', '컴퓨터 AI 학부'],   # 정규화 키
+        ['가천대학교', '학생부우수자', '경영학과(주간)'],    # 같은 블록 안 유사 매칭
+        ['가천대학교', '학생부우수자', '간호'],            # 매핑 표
+        ['가천대학교', '지역균형', '수학과'],              # 이름이 비슷한 다른 전형 블록
+        ['가천대학교', '가천바람개비', '경제학부3'],       # 후보 두 개가 같은 점수
+        ['가천대학교', '학생부우수자', '철학과'],          # 비슷한 것이 없음
+    ], columns=KEYS)
+    matches = matcher.match(incoming)
+
+    assert matches['method'].tolist() == [EXACT, CANONICAL, FUZZY, MAPPING, FUZZY, AMBIGUOUS, UNMATCHED]
+    assert matches['row_id'].tolist()[:5] == [1, 0, 1, 2, 3]
+    assert matches['row_id'].isna().tolist()[5:] == [True, True]
+
+
+def test_mapping_round_trip_is_scoped_to_static_version(tmp_path):
+    keys = store_keys()
+    incoming = pd.DataFrame([['가천대학교', '학생부우수자', '경영학과(주간)']], columns=KEYS)
+    matches = RowMatcher(keys, KEYS).match(incoming)
+    assert save_mapping(str(tmp_path), incoming, matches, KEYS, keys, static_version='v1') == 1
+
+    assert load_mapping(str(tmp_path), KEYS, 'v1') == {('가천대학교', '학생부우수자', '경영학과(주간)'): 1}
+    assert load_mapping(str(tmp_path), KEYS, 'v2') == {}
+    assert RowMatcher(keys, KEYS, load_mapping(str(tmp_path), KEYS, 'v1')).match(incoming)['method'].tolist() == [MAPPING]
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import SnapshotStore
+from snapshot_diff import SnapshotHistory
+
+
+@pytest.fixture
+def history():
+    nan = np.nan
+    df = pd.DataFrame({
+        '대학명': ['가대학교', '가대학교', '가대학교', '나대학교', '나대학교'],
+        '전형명_key': ['교과', '교과', '종합', '종합', '종합'],
+        '모집단위': ['국어교육과', '수학과', '경영학과', '물리학과', '화학과'],
+        '전형구분': ['교과', '교과', '종합', '종합', '종합'],
+        '모집인원': [10, 20, 5, 4, 8],
+        '경쟁률_0910_1100': [2.0, nan, 3.0, 1.0, nan],
+        '경쟁률_0911_1100': [3.0, 1.5, nan, 1.0, nan],
+        '지원인원_0910_1100': [20, nan, 15, 4, nan],
+        '지원인원_0911_1100': [30, 30, nan, 4, nan],
+    })
+    return SnapshotHistory(SnapshotStore.from_wide(df))
+
+
+def test_diff_reports_changed_added_and_removed_rows(history):
+    diff = history.diff('0910_1100', '0911_1100').set_index('모집단위')
+
+    # 두 시점 모두 값이 없는 행(화학과)은 빠진다
+    assert list(diff.index) == ['국어교육과', '수학과', '경영학과', '물리학과']
+
+    changed = diff.loc['국어교육과']
+    assert (changed['이전 경쟁률'], changed['경쟁률'], changed['경쟁률 변화']) == (2.0, 3.0, 1.0)
+    assert changed['변화율(%)'] == 50.0 and changed['지원인원 증가'] == 10
+
+    added, removed = diff.loc['수학과'], diff.loc['경영학과']
+    assert np.isnan(added['이전 경쟁률']) and added['경쟁률'] == 1.5 and np.isnan(added['경쟁률 변화'])
+    assert removed['이전 경쟁률'] == 3.0 and np.isnan(removed['경쟁률']) and np.isnan(removed['지원인원 증가'])
+
+    unchanged = diff.loc['물리학과']
+    assert unchanged['경쟁률 변화'] == 0 and unchanged['변화율(%)'] == 0 and unchanged['지원인원 증가'] == 0
+
+
+def test_aggregate_diff_and_totals(history):
+    aggregate = history.aggregate_diff('0910_1100', '0911_1100')
+    assert aggregate.loc['가대학교', '이전 지원인원'] == 35 and aggregate.loc['가대학교', '지원인원'] == 60
+    assert aggregate.loc['가대학교', '지원인원 증가'] == 25
+    assert aggregate.loc['가대학교', '평균 경쟁률 변화'] == pytest.approx(2.25 - 2.5)
+    assert aggregate.loc['나대학교', '모집단위 수'] == 1
+
+    totals = history.totals()
+    assert totals['지원인원'].tolist() == [39, 64]
+    assert totals['평균 경쟁률'].tolist() == [2.0, 1.83]
@@ -0,0 +1,172 @@
+import random
+
+import numpy as np
+import plotly.graph_objects as go
+
+from column_schema import rate_values
+from profiling import profiled
+
+# 학교별 통합분석 계산 층 (Streamlit 없음)
+# 대학 하나를 고르면 보이는 화면 전체(전형별 추이 차트, TOP/LOW 5 표 또는 전체 순위 표)를 UniversityAnalysisView 로 만든다.
+# 페이지는 (데이터 버전, 대학, 전체 순위 여부) 로 이 객체를 캐시해 두고 그리기만 하며, 보고서는 같은 빌더를 직접 쓴다.
+
+# TOP/LOW 표 컬럼 형식 (나머지 실수 컬럼은 소수점 둘째 자리)
+rate_table_formats = {'모집인원': '%.0f'}
+
+
+def get_emoji_for_admission(admission_key):
+    emoji_dict = {
+        "학생부교과": "📚", "학생부종합": "🎓", "논술": "✍️", "실기/실적": "🎭",
+        "수능": "📝", "학생부교과(지역인재)": "🏠", "학생부종합(지역인재)": "🌄"
+    }
+    return emoji_dict.get(admission_key, "📊")  # 기본 이모티콘은 📊
+
+
+def generate_distinct_colors(n):
+    colors = []
+    for i in range(n):
+        r = random.randint(0, 255)
+        g = random.randint(0, 255)
+        b = random.randint(0, 255)
+        colors.append(f'rgb({r},{g},{b})')
+    return colors
+
+
+def build_rate_table(data, latest_competition_rate, previous_competition_rate):
+    # 모집단위, 모집인원, 현재 경쟁률, 변화율(%) 표
+    columns_to_select = ['모집단위', '모집인원', latest_competition_rate]
+    if previous_competition_rate:
+        columns_to_select.append(previous_competition_rate)
+
+    table_df = data[columns_to_select].rename(columns={latest_competition_rate: '현재 경쟁률'})
+
+    if previous_competition_rate:
+        table_df = table_df.rename(columns={previous_competition_rate: '이전 경쟁률'})
+        table_df['변화율(%)'] = (
+                    (table_df['현재 경쟁률'] - table_df['이전 경쟁률']) / table_df['이전 경쟁률'] * 100).round(2)
+    else:
+        table_df['변화율(%)'] = 0.0
+
+    # 컬럼 순서 조정 및 포맷팅
+    table_df = table_df[['모집단위', '모집인원', '현재 경쟁률', '변화율(%)']]
+    table_df['현재 경쟁률'] = table_df['현재 경쟁률'].round(2)
+    return table_df
+
+
+def build_top_bottom_tables(admission_data, latest_competition_rate, previous_competition_rate, n=5):
+    top_df = build_rate_table(admission_data.nlargest(n, latest_competition_rate),
+                              latest_competition_rate, previous_competition_rate)
+    bottom_df = build_rate_table(admission_data.nsmallest(n, latest_competition_rate),
+                                 latest_competition_rate, previous_competition_rate)
+    return top_df, bottom_df
+
+
+@profiled()
+def build_admission_trend_figure(index, university, admission_key, competition_rate_columns, majors=None):
+    # 한 전형의 모집단위별 경쟁률 추이 (상위 5개 모집단위는 오른쪽에 값 표시). majors 가 주어지면 그 모집단위만
+    # 모집단위마다 전체 컬럼을 슬라이스하지 않고, 전형 슬라이스의 경쟁률 행렬에서 모집단위의 첫 행을 골라 쓴다
+    admission_rows = index.rows(university, admission_key)
+    admission_data = index.df.iloc[admission_rows]
+    latest_competition_rate = competition_rate_columns[-1]
+    labels = [col.split('_', 1)[1] for col in competition_rate_columns]
+    rates = rate_values(admission_data[competition_rate_columns])
+    if majors is None:
+        majors = index.majors(university, admission_key)
+    else:
+        # 상위 5개는 고른 모집단위 안에서만 (경쟁률 행렬은 전형 전체 행 순서 그대로 둔다)
+        admission_data = admission_data[admission_data['모집단위'].isin(majors).to_numpy()]
+
+    fig = go.Figure()
+
+    top_5 = admission_data.nlargest(5, latest_competition_rate)['모집단위'].tolist()
+
+    # 색상 생성
+    colors = generate_distinct_colors(len(majors))
+
+    annotations = []
+    for i, major in enumerate(majors):
+        values = rates[np.searchsorted(admission_rows, index.rows(university, admission_key, major)[0])]
+        present = ~np.isnan(values)
+        x = [label for label, has_value in zip(labels, present) if has_value]
+        y = values[present].tolist()
+
+        fig.add_trace(go.Scatter(
+            x=x,
+            y=y,
+            mode='lines+markers',
+            name=major,
+            hovertemplate='%{y:.2f}<extra></extra>',
+            line=dict(color=colors[i])
+        ))
+
+        # 상위 5개 모집단위에 대해 주석 추가 (오른쪽에 한 번만)
+        if major in top_5:
+            last_y = y[-1]
+            annotations.append(dict(
+                x=1.02, y=last_y,
+                xref='paper', yref='y',
+                text=f'{major} ({last_y:.2f})',
+                font=dict(size=8),
+                showarrow=False,
+                xanchor='left',
+                yanchor='middle'
+            ))
+
+    fig.update_layout(
+        title=f"{admission_key} 전형 경쟁률 추이",
+        xaxis_title="기준일",
+        yaxis_title="경쟁률",
+        height=700,
+        margin=dict(l=50, r=120, t=100, b=200),  # 오른쪽 여백 증가
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.15,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=6),
+            itemsizing='constant',
+            itemwidth=30,
+            tracegroupgap=2
+        ),
+        hovermode="x unified",
+        annotations=annotations,
+        xaxis=dict(domain=[0, 0.9])  # x축 영역을 줄여 오른쪽에 공간 확보
+    )
+
+    return fig
+
+
+class AdmissionView:
+    # 전형 하나의 화면: 제목 이모지, 추이 차트, TOP/LOW 5 표 또는 전체 순위 표
+    def __init__(self, admission_key, emoji, figure, top, bottom, ranking):
+        self.admission_key = admission_key
+        self.emoji = emoji
+        self.figure = figure
+        self.top = top
+        self.bottom = bottom
+        self.ranking = ranking
+
+
+class UniversityAnalysisView:
+    def __init__(self, index, university, full_ranking=False):
+        self.university = university
+        self.full_ranking = full_ranking
+        competition_rate_columns = [col for col in index.df.columns if col.startswith('경쟁률_')]
+        latest_competition_rate = competition_rate_columns[-1]
+        previous_competition_rate = competition_rate_columns[-2] if len(competition_rate_columns) > 1 else None
+
+        self.admissions = []
+        for admission_key in index.admission_keys(university):
+            admission_data = index.slice(university, admission_key)
+            figure = build_admission_trend_figure(index, university, admission_key, competition_rate_columns)
+            top = bottom = ranking = None
+            if full_ranking:
+                ranking = build_rate_table(
+                    admission_data.sort_values(latest_competition_rate, ascending=False, kind='stable'),
+                    latest_competition_rate, previous_competition_rate)
+            else:
+                top, bottom = build_top_bottom_tables(admission_data, latest_competition_rate,
+                                                      previous_competition_rate)
+            self.admissions.append(AdmissionView(admission_key, get_emoji_for_admission(admission_key), figure,
+                                                 top, bottom, ranking))
@@ -1,93 +1,79 @@
+import math
+
 import streamlit as st
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
+from profiling import plotly_chart
+from university_detail_model import UniversityDetailView, admission_grid_figure, major_figure
+
+# 한 페이지에 그릴 모집단위 차트 수
+page_size_options = [5, 10, 20, 50]
+
+# 차트 방식: 모집단위마다 차트 하나 / 전형마다 모집단위를 격자로 묶은 차트 하나
+chart_modes = ["모집단위별 차트", "전형별 묶음 차트"]
+
+
+# 같은 입력의 차트는 다시 만들지 않는다 (페이지를 앞뒤로 넘겨도 재계산 없음).
+# 캐시된 Figure 는 여러 세션이 공유하므로 꺼내 쓴 뒤 수정하지 않는다.
+# 캐시되는 것은 Figure 구성(데이터 조회, trace 생성)까지다. st.plotly_chart 는 Figure 만 받고 매번 JSON 으로 직렬화하므로
+# (dict/JSON 을 넘기면 오히려 Figure 를 다시 만들어 검증한다) 직렬화는 재실행마다 다시 한다.
+# 직렬화는 모집단위 차트 하나에 1-2ms, 43개 묶음 차트에 10ms 남짓으로 구성 비용(100ms 이상)보다 훨씬 작다.
+# 측정 모드(profiling)의 chart 기록에 차트별 직렬화 시간(serialize_seconds)이 남는다.
+@st.cache_resource(max_entries=1000)
+def get_major_figure(_index, data_version, university, admission_key, major):
+    return major_figure(_index, university, admission_key, major)
+
+
+@st.cache_resource(max_entries=200)
+def get_admission_grid_figure(_index, data_version, university, admission_key, majors):
+    return admission_grid_figure(_index, university, admission_key, majors)
+
+
+@st.cache_resource(max_entries=100)
+def get_university_detail_view(_index, data_version, university):
+    return UniversityDetailView(_index, university)
+
+
+def visible_majors(majors, page_size, render_all, page_key):
+    # 현재 페이지에 보이는 모집단위만 돌려준다
+    if render_all or len(majors) <= page_size:
+        return majors
+
+    n_pages = math.ceil(len(majors) / page_size)
+    page = st.number_input(f"페이지 (1-{n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=page_key)
+    start = (page - 1) * page_size
+    end = min(start + page_size, len(majors))
+    st.caption(f"전체 {len(majors)}개 모집단위 중 {start + 1}-{end}")
+    return majors[start:end]
 
 
-def university_detail_analysis(df):
+def university_detail_analysis(df, index, data_version):
     st.title("학교별 세부분석")
 
-    universities = sorted(df['대학명'].unique())
+    universities = index.universities()
     selected_university = st.selectbox("대학을 선택하세요", universities, key="university_detail_selectbox")
 
-    uni_data = df[df['대학명'] == selected_university]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        chart_mode = st.radio("차트 방식", chart_modes, key="university_detail_chart_mode")
+    with col2:
+        page_size = st.selectbox("페이지당 차트 수", page_size_options, index=1, key="university_detail_page_size")
+    with col3:
+        render_all = st.checkbox("전체 차트 한 번에 보기", key="university_detail_render_all")
 
-    for i, admission_key in enumerate(uni_data['전형명_key'].unique()):
+    view = get_university_detail_view(index, data_version, selected_university)
+    for i, (admission_key, majors) in enumerate(view.admissions):
         if i > 0:
             st.markdown("---")
 
         st.markdown(f"## 📊 {admission_key} 전형")
 
-        admission_data = uni_data[uni_data['전형명_key'] == admission_key]
-
-        competition_rate_columns = [col for col in admission_data.columns if col.startswith('경쟁률_')]
-        past_data_columns = ['D-2(2024)', 'D-1(2024)', 'D-0오전(2024)', 'D-0오후(2024)', '최종(2024)', '3개년평균']
-
-        for major in admission_data['모집단위'].unique():
-            major_data = admission_data[admission_data['모집단위'] == major]
-
-            fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-            # 현재 경쟁률 데이터
-            x = [col.split('_', 1)[1] for col in competition_rate_columns]
-            y = major_data[competition_rate_columns].values[0]
-            fig.add_trace(go.Scatter(x=x, y=y, mode='lines+markers+text', name='현재 경쟁률',
-                                     line=dict(color='blue', width=3),
-                                     text=[f'{val:.2f}' for val in y],
-                                     textposition='top center'), secondary_y=False)
-
-            # 과거 데이터
-            colors = ['gray', 'gray', 'gray', 'gray', 'red', 'orange']
-            past_y_values = []
-            for col, color in zip(past_data_columns, colors):
-                if col in major_data.columns and not pd.isna(major_data[col].values[0]):
-                    value = major_data[col].values[0]
-                    past_y_values.append(value)
-                    fig.add_trace(go.Scatter(x=[x[0], x[-1]], y=[value, value], mode='lines', name=col,
-                                             line=dict(color=color, width=1, dash='dot'),
-                                             opacity=0.5, showlegend=False), secondary_y=True)
-
-            # 경쟁률 6.00 기준선 추가
-            fig.add_trace(go.Scatter(x=[x[0], x[-1]], y=[6, 6], mode='lines', name='경쟁률 6.00',
-                                     line=dict(color='green', width=2, dash='dot'),
-                                     showlegend=False))
-
-            fig.update_layout(
-                title=f"{major} - {admission_key} 전형 경쟁률 추이",
-                xaxis_title="기준일",
-                yaxis_title="현재 경쟁률",
-                yaxis2_title="과거 경쟁률",
-                height=600,
-                width=1000,
-                showlegend=False,  # 범례 제거
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(color="rgba(0,0,0,1)"),
-            )
-
-            # y축 범위 설정
-            all_y_values = list(y) + past_y_values + [6]  # 6.00 포함
-            y_min, y_max = min(all_y_values), max(all_y_values)
-            y_range = [max(0, y_min - 0.5), y_max + 0.5]
-
-            # 과거 데이터 텍스트 및 경쟁률 6.00 텍스트 준비
-            past_data_text = [f"<span style='color:{colors[i]}'>{col}: {major_data[col].values[0]:.2f}</span>"
-                              for i, col in enumerate(past_data_columns)
-                              if col in major_data.columns and not pd.isna(major_data[col].values[0])]
-            past_data_vals = [major_data[col].values[0] for col in past_data_columns
-                              if col in major_data.columns and not pd.isna(major_data[col].values[0])]
-
-            # 경쟁률 6.00 텍스트 항상 추가
-            all_text = past_data_text + [f"<span style='color:green'>경쟁률 6.00</span>"]
-            all_vals = past_data_vals + [6]
-
-            fig.update_yaxes(range=y_range, secondary_y=False, showgrid=False)
-            fig.update_yaxes(range=y_range, secondary_y=True, showgrid=True,
-                             ticktext=all_text,
-                             tickvals=all_vals,
-                             tickfont=dict(color="black"))
-            fig.update_layout(yaxis_range=y_range, yaxis2_range=y_range)
-
-            fig.update_xaxes(showgrid=False)
-
-            st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        page_key = f"university_detail_page_{selected_university}_{admission_key}"
+        page_majors = visible_majors(majors, page_size, render_all, page_key)
+
+        if chart_mode == chart_modes[1]:
+            fig = get_admission_grid_figure(index, data_version, selected_university, admission_key,
+                                            tuple(page_majors))
+            plotly_chart(fig, use_container_width=True)
+        else:
+            for major in page_majors:
+                fig = get_major_figure(index, data_version, selected_university, admission_key, major)
+                plotly_chart(fig, use_container_width=True)
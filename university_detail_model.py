@@ -0,0 +1,219 @@
+import math
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from column_schema import rate_values
+from profiling import profiled
+from projection import PROJECTION_COLUMN, PROJECTION_LOW_COLUMN, PROJECTION_HIGH_COLUMN
+
+# 학교별 세부분석 계산 층 (Streamlit 없음)
+# 모집단위별 차트와 전형별 묶음(격자) 차트를 만든다. 화면에 보이는 모집단위가 페이지마다 다르므로
+# 뷰모델은 차트 단위로 두고, 페이지는 (데이터 버전, 대학, 전형, 모집단위) 로 차트를 캐시한다.
+
+past_data_columns = ['D-2(2024)', 'D-1(2024)', 'D-0오전(2024)', 'D-0오후(2024)', '최종(2024)', '3개년평균']
+past_data_colors = ['gray', 'gray', 'gray', 'gray', 'red', 'orange']
+
+# 예상 최종 경쟁률 (projection.py) 을 마지막 스냅샷 오른쪽에 구간과 함께 표시
+projection_columns = [PROJECTION_COLUMN, PROJECTION_LOW_COLUMN, PROJECTION_HIGH_COLUMN]
+projection_label = '예상 최종'
+projection_color = 'purple'
+
+# 묶음 차트 격자
+grid_columns = 2
+grid_row_height = 320
+
+
+@profiled()
+def build_major_figure(major_data, admission_key, major, competition_rate_columns):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    # 현재 경쟁률 데이터
+    x = [col.split('_', 1)[1] for col in competition_rate_columns]
+    y = rate_values(major_data[competition_rate_columns])[0]
+    fig.add_trace(go.Scatter(x=x, y=y, mode='lines+markers+text', name='현재 경쟁률',
+                             line=dict(color='blue', width=3),
+                             text=[f'{val:.2f}' for val in y],
+                             textposition='top center'), secondary_y=False)
+
+    # 예상 최종 경쟁률
+    projection = rate_values(major_data.reindex(columns=projection_columns))[0]
+    x_end = x[-1]
+    if not np.isnan(projection[0]):
+        x_end = projection_label
+        fig.add_trace(projection_trace(x, y, projection), secondary_y=False)
+
+    # 과거 데이터
+    colors = past_data_colors
+    past = rate_values(major_data.reindex(columns=past_data_columns))[0]
+    past_y_values = []
+    for col, color, value in zip(past_data_columns, colors, past):
+        if not np.isnan(value):
+            past_y_values.append(value)
+            fig.add_trace(go.Scatter(x=[x[0], x_end], y=[value, value], mode='lines', name=col,
+                                     line=dict(color=color, width=1, dash='dot'),
+                                     opacity=0.5, showlegend=False), secondary_y=True)
+
+    # 경쟁률 6.00 기준선 추가
+    fig.add_trace(go.Scatter(x=[x[0], x_end], y=[6, 6], mode='lines', name='경쟁률 6.00',
+                             line=dict(color='green', width=2, dash='dot'),
+                             showlegend=False))
+
+    fig.update_layout(
+        title=f"{major} - {admission_key} 전형 경쟁률 추이",
+        xaxis_title="기준일",
+        yaxis_title="현재 경쟁률",
+        yaxis2_title="과거 경쟁률",
+        height=600,
+        width=1000,
+        showlegend=False,  # 범례 제거
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color="rgba(0,0,0,1)"),
+    )
+
+    # y축 범위 설정
+    all_y_values = list(y) + past_y_values + [6] + list(projection[~np.isnan(projection)])  # 6.00 포함
+    y_min, y_max = np.nanmin(all_y_values), np.nanmax(all_y_values)
+    y_range = [max(0, y_min - 0.5), y_max + 0.5]
+
+    # 과거 데이터 텍스트 및 경쟁률 6.00 텍스트 준비
+    past_data_text = [f"<span style='color:{colors[i]}'>{col}: {past[i]:.2f}</span>"
+                      for i, col in enumerate(past_data_columns) if not np.isnan(past[i])]
+    past_data_vals = past_y_values
+
+    # 경쟁률 6.00 텍스트 항상 추가
+    all_text = past_data_text + [f"<span style='color:green'>경쟁률 6.00</span>"]
+    all_vals = past_data_vals + [6]
+
+    fig.update_yaxes(range=y_range, secondary_y=False, showgrid=False)
+    fig.update_yaxes(range=y_range, secondary_y=True, showgrid=True,
+                     ticktext=all_text,
+                     tickvals=all_vals,
+                     tickfont=dict(color="black"))
+    fig.update_layout(yaxis_range=y_range, yaxis2_range=y_range)
+
+    fig.update_xaxes(showgrid=False)
+    return fig
+
+
+def projection_trace(x, y, projection, **kwargs):
+    # 마지막 관측값에서 예상 최종값까지 점선, 끝점에 하한/상한 오차 막대
+    projected, low, high = projection
+    last = np.flatnonzero(~np.isnan(np.asarray(y, dtype=float)))
+    x_from, y_from = (x[last[-1]], y[last[-1]]) if len(last) else (projection_label, projected)
+    return go.Scatter(x=[x_from, projection_label], y=[y_from, projected], mode='lines+markers+text',
+                      name=projection_label, line=dict(color=projection_color, width=2, dash='dash'),
+                      marker=dict(size=[0, 8]), text=['', f'{projected:.2f}'], textposition='middle right',
+                      error_y=dict(type='data', symmetric=False, array=[0, high - projected],
+                                   arrayminus=[0, projected - low], color=projection_color),
+                      hovertemplate=f'{projection_label} %{{y:.2f}} ({low:.2f}-{high:.2f})<extra></extra>', **kwargs)
+
+
+def _axis_id(prefix, n):
+    # 1 -> 'x', 2 -> 'x2' (layout 키는 'xaxis', 'xaxis2')
+    return prefix if n == 1 else f"{prefix}{n}"
+
+
+@profiled()
+def build_admission_grid_figure(admission_data, admission_key, competition_rate_columns):
+    # 한 전형의 모집단위들을 격자 하나에 그린다. 값 계산은 슬라이스 전체에 대한 배열 연산 한 번으로 끝내고,
+    # 같은 색의 기준선(과거 경쟁률, 6.00)은 칸마다 trace 하나로 합쳐 trace 수를 줄인다.
+    majors = admission_data['모집단위'].tolist()
+    n = len(majors)
+    rows = max(1, math.ceil(n / grid_columns))
+    x = [col.split('_', 1)[1] for col in competition_rate_columns]
+
+    rates = rate_values(admission_data[competition_rate_columns])
+    past = rate_values(admission_data.reindex(columns=past_data_columns))
+    rate_text = np.char.mod('%.2f', rates)
+    past_text = np.char.mod('%.2f', past)
+    projections = rate_values(admission_data.reindex(columns=projection_columns))
+    has_projection = ~np.isnan(projections[:, 0])
+    x_end = projection_label if has_projection.any() else x[-1]
+
+    all_values = np.concatenate([rates, past, np.full((n, 1), 6.0), projections], axis=1)
+    y_low = np.maximum(0, np.nanmin(all_values, axis=1) - 0.5)
+    y_high = np.nanmax(all_values, axis=1) + 0.5
+
+    traces = []
+    layout = dict(
+        title=f"{admission_key} 전형 모집단위별 경쟁률 추이",
+        height=rows * grid_row_height + 100,
+        showlegend=False,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color="rgba(0,0,0,1)"),
+        margin=dict(t=100),
+        annotations=[],
+    )
+    x_gap, y_gap = 0.08, 0.25 / rows
+
+    for k, major in enumerate(majors):
+        row, col = divmod(k, grid_columns)
+        xref = _axis_id('x', k + 1)
+        y1, y2 = _axis_id('y', 2 * k + 1), _axis_id('y', 2 * k + 2)
+        x_domain = [col / grid_columns, (col + 1) / grid_columns - x_gap]
+        y_domain = [1 - (row + 1) / rows, 1 - row / rows - y_gap]
+        y_range = [y_low[k], y_high[k]]
+
+        traces.append(go.Scattergl(x=x, y=rates[k], mode='lines+markers+text', name=major,
+                                   line=dict(color='blue', width=2), text=rate_text[k],
+                                   textposition='top center', textfont=dict(size=8),
+                                   xaxis=xref, yaxis=y1))
+        if has_projection[k]:
+            traces.append(projection_trace(x, rates[k], projections[k], textfont=dict(size=8),
+                                           xaxis=xref, yaxis=y1))
+
+        # 과거 데이터 기준선 (색별로 None 으로 끊어서 한 trace 로)
+        has_past = ~np.isnan(past[k])
+        for color in dict.fromkeys(past_data_colors):
+            values = past[k][has_past & (np.array(past_data_colors) == color)]
+            if len(values):
+                traces.append(go.Scatter(x=[x[0], x_end, None] * len(values),
+                                         y=[v for value in values for v in (value, value, None)],
+                                         mode='lines', line=dict(color=color, width=1, dash='dot'),
+                                         opacity=0.5, hoverinfo='skip', xaxis=xref, yaxis=y2))
+        # 경쟁률 6.00 기준선
+        traces.append(go.Scatter(x=[x[0], x_end], y=[6, 6], mode='lines',
+                                 line=dict(color='green', width=2, dash='dot'),
+                                 hoverinfo='skip', xaxis=xref, yaxis=y1))
+
+        tick_text = [f"<span style='color:{past_data_colors[i]}'>{past_data_columns[i]}: {past_text[k][i]}</span>"
+                     for i in np.flatnonzero(has_past)] + ["<span style='color:green'>경쟁률 6.00</span>"]
+        tick_vals = past[k][has_past].tolist() + [6]
+
+        layout[_axis_id('xaxis', k + 1)] = dict(domain=x_domain, anchor=y1, showgrid=False,
+                                                tickfont=dict(size=8))
+        layout[_axis_id('yaxis', 2 * k + 1)] = dict(domain=y_domain, anchor=xref, range=y_range,
+                                                    showgrid=False)
+        layout[_axis_id('yaxis', 2 * k + 2)] = dict(overlaying=y1, anchor=xref, side='right', range=y_range,
+                                                    showgrid=True, ticktext=tick_text, tickvals=tick_vals,
+                                                    tickfont=dict(size=8, color="black"))
+        layout['annotations'].append(dict(text=f"<b>{major}</b>", x=sum(x_domain) / 2, y=y_domain[1],
+                                          xref='paper', yref='paper', xanchor='center', yanchor='bottom',
+                                          showarrow=False, font=dict(size=11)))
+
+    return go.Figure(data=traces, layout=layout)
+
+
+def major_figure(index, university, admission_key, major):
+    major_data = index.slice(university, admission_key, major)
+    competition_rate_columns = [col for col in major_data.columns if col.startswith('경쟁률_')]
+    return build_major_figure(major_data, admission_key, major, competition_rate_columns)
+
+
+def admission_grid_figure(index, university, admission_key, majors):
+    rows = np.concatenate([index.rows(university, admission_key, major) for major in majors])
+    admission_data = index.df.iloc[rows]
+    competition_rate_columns = [col for col in admission_data.columns if col.startswith('경쟁률_')]
+    return build_admission_grid_figure(admission_data, admission_key, competition_rate_columns)
+
+
+class UniversityDetailView:
+    # 대학 하나의 전형 목록과 전형별 모집단위 목록 (차트는 보이는 페이지 것만 따로 만든다)
+    def __init__(self, index, university):
+        self.university = university
+        self.admissions = [(admission_key, list(index.majors(university, admission_key)))
+                           for admission_key in index.admission_keys(university)]